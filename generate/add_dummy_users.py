@@ -1,364 +1,329 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-import time
+from firebase_admin import firestore
+import argparse
+import datetime
+import functools
+import os
 import random
+import time
 from collections import defaultdict
 
-SAMPLE_NAMES = [
-    "Alice Johnson", "Bob Smith", "Carol Williams", "David Brown", "Eva Davis",
-    "Frank Miller", "Grace Wilson", "Hank Moore", "Ivy Taylor", "Jack Anderson",
-    "Kara Thomas", "Liam Jackson", "Mia White", "Noah Harris", "Olivia Martin",
-    "Paul Thompson", "Quinn Garcia", "Rachel Martinez", "Sam Robinson", "Tina Clark",
-    "Uma Rodriguez", "Victor Lewis", "Wendy Lee", "Xander Walker", "Yara Hall",
-    "Zane Allen", "Amy Young", "Ben King", "Cathy Wright", "Derek Scott",
-    "Ella Green", "Fred Adams", "Gina Baker", "Harry Nelson", "Isla Carter",
-    "Jake Mitchell", "Kylie Perez", "Leo Roberts", "Maya Turner", "Nate Phillips",
-    "Opal Campbell", "Pete Parker", "Queen Simmons", "Ray Evans", "Sara Edwards",
-    "Tom Collins", "Ursula Stewart", "Vince Morris", "Will Rogers", "Xenia Reed",
-    "Yusuf Cook", "Zara Morgan", "Aaron Bell", "Bella Murphy", "Caleb Bailey",
-    "Diana Rivera", "Ethan Cooper", "Fiona Richardson", "Gabe Cox", "Holly Howard",
-    "Ian Ward", "Jade Brooks", "Kyle Bennett", "Lara Gray", "Mark James",
-    "Nina Watson", "Owen Brooks", "Penny Kelly", "Quincy Sanders", "Rose Price"
-]
-
-TECH_PROJECTS = [
-    ("AI-Powered Medical Diagnosis System", "Develop an AI/ML system that analyzes medical images and patient data to assist doctors in diagnosing diseases with high accuracy, leveraging deep learning and computer vision techniques."),
-    ("Smart Home Automation with Embedded Systems", "Design an embedded system-based smart home automation platform that integrates sensors and actuators to enable energy-efficient control and monitoring of household devices."),
-    ("Real-Time Traffic Prediction using Machine Learning", "Implement a software solution that collects and analyzes traffic data in real-time to predict congestion patterns, optimizing routing and reducing commute times."),
-    ("Low-Power IoT Sensor Network", "Create an embedded IoT sensor network optimized for low power consumption, capable of long-term environmental monitoring and data transmission using wireless protocols."),
-    ("Electrical Vehicle Battery Management System", "Develop an electrical engineering project focusing on the design and implementation of a battery management system to monitor and optimize EV battery performance and safety."),
-    ("Natural Language Processing Chatbot", "Build an AI-driven chatbot utilizing advanced NLP techniques to understand and respond to user queries in natural language, enhancing user interaction."),
-    ("Autonomous Drone Navigation", "Design and implement embedded software and control algorithms for autonomous drone navigation, including obstacle detection and path planning."),
-    ("Renewable Energy Grid Integration", "Engineer a system to integrate renewable energy sources into the electrical grid, managing load balancing and energy storage using smart grid technologies."),
-    ("Computer Vision-Based Quality Inspection", "Develop a computer vision system for automated quality inspection in manufacturing, detecting defects and ensuring product standards."),
-    ("Wearable Health Monitoring Device", "Create an embedded system wearable device that continuously monitors vital health parameters and provides real-time feedback to users and healthcare providers."),
-    ("Blockchain-Based Voting System", "Develop a secure and transparent blockchain voting platform to enhance election integrity and voter trust."),
-    ("Augmented Reality Educational App", "Design an AR app that enhances learning experiences by overlaying interactive 3D models onto real-world environments."),
-    ("Cybersecurity Threat Detection", "Implement a machine learning system to detect and respond to cybersecurity threats in real-time."),
-    ("Smart Agriculture Monitoring System", "Create an IoT-based system to monitor soil moisture, temperature, and crop health for precision farming."),
-    ("Autonomous Vehicle Control Algorithms", "Develop control algorithms for self-driving cars focusing on safety and efficiency."),
-    ("Cloud-Based Data Analytics Platform", "Build a scalable cloud platform for big data processing and visualization."),
-    ("3D Printing Optimization Software", "Design software to optimize 3D printing parameters for improved quality and speed."),
-    ("Energy Harvesting Wearable Device", "Develop a wearable device that harvests energy from body movements to power sensors."),
-    ("AI-Powered Financial Advisor", "Create an AI system that provides personalized financial advice based on user data."),
-    ("Smart Traffic Light Control System", "Implement an adaptive traffic light system that optimizes flow based on real-time data."),
-    ("Virtual Reality Therapy Platform", "Develop a VR platform for therapeutic applications such as phobia treatment and rehabilitation."),
-    ("IoT-Based Smart Parking System", "Design a system that detects available parking spots and guides drivers accordingly."),
-    ("Machine Learning for Predictive Maintenance", "Implement ML models to predict equipment failures and schedule maintenance."),
-    ("Robotic Arm Control System", "Develop control software for a robotic arm for manufacturing automation."),
-    ("AI-Driven Content Recommendation Engine", "Build a recommendation system that personalizes content based on user preferences."),
-    ("Embedded System for Wearable Fitness Tracker", "Create firmware for a fitness tracker that monitors physical activity and health metrics."),
-    ("Smart Energy Meter with Blockchain", "Design a blockchain-enabled smart meter for secure energy transactions."),
-    ("AI-Based Language Translation Device", "Develop a portable device that provides real-time language translation."),
-    ("IoT-Enabled Disaster Management System", "Build a system that uses IoT sensors to detect and respond to natural disasters."),
-    ("Autonomous Underwater Vehicle Navigation", "Design navigation algorithms for underwater drones."),
-    ("Smart Waste Management System", "Implement sensors and software to optimize waste collection routes."),
-    ("AI-Powered Resume Screening Tool", "Create a tool that automates the screening of job applications."),
-    ("Embedded System for Smart Glasses", "Develop software for smart glasses that provide augmented information."),
-    ("Cloud-Based Collaborative Coding Platform", "Build a platform that enables real-time collaborative coding."),
-    ("AI-Driven Personalized Learning Platform", "Design a platform that adapts educational content to individual learners."),
-    ("Smart Grid Demand Response System", "Implement a system to manage electricity demand in smart grids."),
-    ("IoT-Based Air Quality Monitoring", "Create a network of sensors to monitor and report air quality."),
-    ("AI-Powered Fraud Detection System", "Develop models to detect fraudulent transactions in financial systems."),
-    ("Embedded System for Autonomous Robots", "Design control software for robots performing autonomous tasks."),
-    ("Smart Inventory Management System", "Build a system that tracks inventory levels using IoT devices."),
-    ("AI-Based Traffic Sign Recognition", "Implement a computer vision system to recognize traffic signs for autonomous vehicles."),
-    ("Wearable Device for Sleep Monitoring", "Create a device that tracks sleep patterns and provides insights."),
-    ("Blockchain-Based Supply Chain Management", "Develop a blockchain solution to enhance supply chain transparency."),
-    ("AI-Powered Customer Support Chatbot", "Build a chatbot that handles customer queries with natural language understanding."),
-    ("Embedded System for Smart Thermostat", "Design firmware for a thermostat that learns user preferences."),
-    ("Machine Learning for Healthcare Diagnostics", "Implement ML models to assist in medical diagnosis."),
-    ("IoT-Enabled Smart Lighting System", "Create a lighting system that adjusts based on occupancy and daylight."),
-    ("AI-Based Image Captioning System", "Develop a system that generates captions for images automatically."),
-    ("Embedded System for Drone Delivery", "Design control software for drones delivering packages."),
-    ("Smart Water Management System", "Implement sensors and software to optimize water usage in agriculture."),
-    ("AI-Powered Social Media Analytics", "Build tools to analyze social media trends and sentiment."),
-    ("Embedded System for Industrial Automation", "Develop software for automating industrial processes."),
-    ("AI-Based Personalized Marketing Platform", "Create a platform that personalizes marketing campaigns."),
-    ("IoT-Enabled Smart Refrigerator", "Design a refrigerator that monitors contents and suggests shopping lists."),
-    ("Autonomous Lawn Mower Robot", "Develop control algorithms for a robot that mows lawns automatically."),
-    ("AI-Powered Speech Recognition System", "Implement a system that transcribes speech to text accurately."),
-    ("Embedded System for Smart Locks", "Create firmware for locks controlled via smartphones."),
-    ("Machine Learning for Stock Market Prediction", "Build models to predict stock price movements."),
-    ("IoT-Based Elderly Care System", "Design a system to monitor and assist elderly individuals at home."),
-    ("AI-Powered Video Surveillance", "Develop a system that detects suspicious activities in video feeds."),
-    ("Embedded System for Smart Bicycle", "Create software for a bicycle that tracks usage and location."),
-    ("Smart Retail Checkout System", "Implement a checkout system using computer vision and AI."),
-    ("AI-Based Disaster Response Coordination", "Build a platform to coordinate disaster response efforts."),
-    ("IoT-Enabled Smart Gym Equipment", "Design gym equipment that tracks workouts and provides feedback."),
-    ("Embedded System for Smart Agriculture Drone", "Develop control software for drones used in agriculture."),
-    ("AI-Powered Legal Document Analysis", "Create tools that analyze legal documents for key information."),
-    ("Smart City Traffic Management System", "Implement a system to optimize traffic flow in urban areas."),
-    ("AI-Based Personalized Nutrition App", "Build an app that provides nutrition advice based on user data."),
-    ("Embedded System for Smart Parking Meters", "Design firmware for parking meters that accept digital payments."),
-    ("IoT-Enabled Environmental Monitoring", "Create a sensor network to monitor environmental conditions."),
-    ("AI-Powered Music Recommendation System", "Develop a system that recommends music based on listening habits."),
-    ("Embedded System for Smart Alarm System", "Build software for an alarm system with remote monitoring."),
-    ("AI-Based Automated Essay Scoring", "Implement models that score essays automatically."),
-    ("IoT-Enabled Smart Trash Bins", "Design bins that monitor fill levels and optimize collection."),
-    ("AI-Powered Virtual Personal Trainer", "Create a virtual trainer that provides workout guidance."),
-    ("Embedded System for Smart Traffic Cameras", "Develop software for cameras that monitor traffic conditions.")
-]
-
-INTEREST_TOPICS = [
-    "AI", "Machine Learning", "Data Science", "Computer Vision", "Robotics",
-    "Natural Language Processing", "Cybersecurity", "Embedded Systems", "IoT",
-    "Cloud Computing", "AR/VR", "Mobile Apps", "Web Development", "Backend Systems",
-    "Frontend/UI", "Product Management", "Entrepreneurship", "Open Source",
-    "Education Tech", "Healthcare Tech", "Fintech", "Gaming", "Sustainability",
-    "Blockchain", "3D Printing"
-]
-
-WL_LOCATIONS = [
-    {"label": "Purdue Memorial Union", "latitude": 40.4236, "longitude": -86.9113},
-    {"label": "Engineering Fountain", "latitude": 40.4282, "longitude": -86.9136},
-    {"label": "France A. Cordova Recreational Sports Center (CoRec)", "latitude": 40.4276, "longitude": -86.9212},
-    {"label": "McCutcheon Hall", "latitude": 40.4248, "longitude": -86.9282},
-    {"label": "Cary Quadrangle", "latitude": 40.4287, "longitude": -86.9148},
-    {"label": "Earhart Hall", "latitude": 40.4302, "longitude": -86.9179},
-    {"label": "Windsor Halls", "latitude": 40.4241, "longitude": -86.9190},
-    {"label": "Hillenbrand Hall", "latitude": 40.4231, "longitude": -86.9280},
-    {"label": "First Street Towers", "latitude": 40.4210, "longitude": -86.9232},
-    {"label": "Honors College and Residences", "latitude": 40.4245, "longitude": -86.9215},
-    {"label": "Discovery Park", "latitude": 40.4189, "longitude": -86.9363},
-    {"label": "Neil Armstrong Hall of Engineering", "latitude": 40.4270, "longitude": -86.9147},
-    {"label": "Ross–Ade Stadium", "latitude": 40.4347, "longitude": -86.9165},
-    {"label": "Mackey Arena", "latitude": 40.4340, "longitude": -86.9160},
-    {"label": "Purdue University Airport", "latitude": 40.4123, "longitude": -86.9369},
-    {"label": "Tapawingo Park", "latitude": 40.4177, "longitude": -86.9023},
-    {"label": "Wabash Landing", "latitude": 40.4185, "longitude": -86.9054},
-    {"label": "Celery Bog Nature Area", "latitude": 40.4660, "longitude": -86.9365},
-    {"label": "Happy Hollow Park", "latitude": 40.4468, "longitude": -86.9111},
-    {"label": "Chauncey Village", "latitude": 40.4247, "longitude": -86.9086},
-    {"label": "Northwestern Ave & Stadium Ave", "latitude": 40.4315, "longitude": -86.9145},
-    {"label": "Village West Apartments", "latitude": 40.4309, "longitude": -86.9315},
-]
-
-def _jitter(lat, lon, max_delta=0.0008):
-    return lat + random.uniform(-max_delta, max_delta), lon + random.uniform(-max_delta, max_delta)
-
-def _random_from_pool(pool):
-    base = random.choice(pool)
-    lat, lon = _jitter(base["latitude"], base["longitude"])
-    return {"label": base["label"], "latitude": lat, "longitude": lon}
-
-def random_wl_location():
-    """Pick a random WL location and add slight jitter so points vary naturally."""
-    return _random_from_pool(WL_LOCATIONS)
-
-UIUC_LOCATIONS = [
-    {"label": "Grainger Engineering Library (UIUC)", "latitude": 40.1120, "longitude": -88.2262},
-    {"label": "Illini Union (UIUC)", "latitude": 40.1098, "longitude": -88.2272},
-    {"label": "Siebel Center for CS (UIUC)", "latitude": 40.1138, "longitude": -88.2249},
-]
-
-UMICH_LOCATIONS = [
-    {"label": "Michigan Union (UMich)", "latitude": 42.2767, "longitude": -83.7413},
-    {"label": "EECS Building (UMich)", "latitude": 42.2931, "longitude": -83.7133},
-]
-
-NORTHWESTERN_LOCATIONS = [
-    {"label": "Technological Institute (Northwestern)", "latitude": 42.0586, "longitude": -87.6751},
-    {"label": "Norris University Center (Northwestern)", "latitude": 42.0536, "longitude": -87.6773},
-]
-
-UCHICAGO_LOCATIONS = [
-    {"label": "Regenstein Library (UChicago)", "latitude": 41.7897, "longitude": -87.5997},
-    {"label": "Saieh Hall (UChicago)", "latitude": 41.7907, "longitude": -87.5988},
-]
-
-def build_assigned_locations(num_users):
-    """Assign locations so markers are spread out and mostly unique.
-
-    - First 2 users: UIUC
-    - Next 1: UMich
-    - Next 1: Northwestern
-    - Next 1: UChicago
-    - Remaining: sample WL locations without replacement when possible
-    """
-    assigned = []
-    for _ in range(min(2, num_users)):
-        assigned.append(_random_from_pool(UIUC_LOCATIONS))
-    if len(assigned) < num_users:
-        assigned.append(_random_from_pool(UMICH_LOCATIONS))
-    if len(assigned) < num_users:
-        assigned.append(_random_from_pool(NORTHWESTERN_LOCATIONS))
-    if len(assigned) < num_users:
-        assigned.append(_random_from_pool(UCHICAGO_LOCATIONS))
-
-    remaining = max(0, num_users - len(assigned))
-    if remaining > 0:
-        base_choices = WL_LOCATIONS.copy()
-        random.shuffle(base_choices)
-        chosen = base_choices[:min(remaining, len(base_choices))]
-        while len(chosen) < remaining:
-            chosen.append(random.choice(WL_LOCATIONS))
-        for base in chosen:
-            lat, lon = _jitter(base["latitude"], base["longitude"])
-            assigned.append({"label": base["label"], "latitude": lat, "longitude": lon})
-
-    return assigned[:num_users]
-
-SERVICE_ACCOUNT_KEY = "serviceAccountKey.json"
+import numpy as np
+
+from batch_writer import BatchWriter
+from connection_graph import ConnectionGraph, connection_fields
+from firestore_client import add_client_arguments, client_from_args, get_client
+from geohash import geohash_fields
+from instrumentation import InstrumentedClient, Metrics, Progress
+from population import (LOCATION_DISTRIBUTIONS, event_id_for, generate_events, generate_population, identity_for,
+                        post_id_for)
+from seed_run import SeedCheckpoint, run_id, write_manifest
+from snapshot import SnapshotWriter
+
 NUM_USERS = 15
 POSTS_PER_USER = 1
-
-cred = credentials.Certificate(SERVICE_ACCOUNT_KEY)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
-
-def add_dummy_users_and_posts():
-    user_ids = []
-    post_ids = []
-    post_author = {}
-    user_posts_map = {}
-
-    assigned_locations = build_assigned_locations(NUM_USERS)
-
-    # Step 1: Create users
-    for i in range(NUM_USERS):
-        name = SAMPLE_NAMES[i]
-        project = TECH_PROJECTS[i]
-        user_id = name.lower().replace(" ", "_")
-        looking_for_cofounder = random.choice([True, False])
-        num_people_needed = random.randint(1, 5)
-        skills_needed = random.sample(
-            ["AI/ML", "Embedded Systems", "Electrical Engineering", "Full-Stack Development", "Data Science", "Computer Vision", "Cybersecurity", "Cloud Computing"],
-            k=random.randint(1, 3)
-        )
-        assigned_loc = assigned_locations[i]
-        assigned_geo = firestore.GeoPoint(assigned_loc["latitude"], assigned_loc["longitude"])
-        interests = random.sample(INTEREST_TOPICS, k=random.randint(2, 4))
-        user_data = {
-            "displayName": name,
-            "email": f"{name}@purdue.edu",
-            "createdAt": int(time.time() * 1000),
-            "ideaTitle": project[0],
-            "ideaDescription": project[1],
-            "likedPosts": [],
-            "passedPosts": [],
-            "lookingForCofounder": looking_for_cofounder,
-            "numPeopleNeeded": num_people_needed,
-            "skillsNeeded": skills_needed,
-            "connections": [], 
-            "location": assigned_loc,
-            "locationGeo": assigned_geo,
-            "interests": interests,
-        }
-        db.collection("users").document(user_id).set(user_data)
-        user_ids.append(user_id)
-        user_posts_map[user_id] = []
-        print(f"Added user {user_id}")
-
-    for i, user_id in enumerate(user_ids):
-        name = SAMPLE_NAMES[i]
-        project = TECH_PROJECTS[i]
-        user_doc = db.collection("users").document(user_id).get().to_dict()
-        looking_for_cofounder = user_doc.get("lookingForCofounder")
-        num_people_needed = user_doc.get("numPeopleNeeded")
-        skills_needed = user_doc.get("skillsNeeded")
-        assigned_loc = user_doc.get("location") or assigned_locations[i]
-        assigned_geo = firestore.GeoPoint(assigned_loc["latitude"], assigned_loc["longitude"])
-
-        for j in range(POSTS_PER_USER):
-            post_data = {
-                "authorId": user_id,
-                "createdAt": firestore.SERVER_TIMESTAMP,
-                "title": project[0],
-                "description": project[1],
-                "peopleNeeded": num_people_needed,
-                "lookingForCofounder": looking_for_cofounder,
-                "skillsNeeded": skills_needed,
-                "location": assigned_loc,
-                "locationGeo": assigned_geo,
-                "personType": random.choice(["Dev", "Designer", "PM"])
-            }
-            post_ref = db.collection("posts").add(post_data)[1]
-            post_ids.append(post_ref.id)
-            post_author[post_ref.id] = user_id
-            user_posts_map[user_id].append(post_ref.id)
-        print(f"📝 Added {POSTS_PER_USER} posts for {user_id}")
-
-    post_liked_by = defaultdict(list)
-    post_passed_by = defaultdict(list)
-    likes_by_user = {}
-    passes_by_user = {}
-    direct_by_user = {uid: set() for uid in user_ids}
-
-    for user_id in user_ids:
-        candidates = [pid for pid in post_ids if post_author[pid] != user_id]
-        if not candidates:
-            liked = []
-            passed = []
-        else:
-            like_k = random.randint(1, min(5, len(candidates)))
-            liked = random.sample(candidates, k=like_k)
-            remaining = [pid for pid in candidates if pid not in liked]
-            pass_k = random.randint(1, min(5, len(remaining))) if remaining else 0
-            passed = random.sample(remaining, k=pass_k) if pass_k > 0 else []
-
-        likes_by_user[user_id] = liked
-        passes_by_user[user_id] = passed
-
-        liked_users = list({post_author[pid] for pid in liked})
-        passed_users = list({post_author[pid] for pid in passed})
-        db.collection("users").document(user_id).update({
-            "likedPosts": liked,
-            "passedPosts": passed,
-            "dismissedPosts": passed,  
-            "likedUsers": liked_users,
-            "passedUsers": passed_users,
-            "liked": liked_users, 
-        })
-
-        direct_by_user[user_id].update(liked_users)
-        direct_by_user[user_id].update(passed_users)
-
-        for pid in liked:
-            post_liked_by[pid].append(user_id)
-        for pid in passed:
-            post_passed_by[pid].append(user_id)
-
-        print(f"Updated {user_id} with {len(liked)} liked & {len(passed)} passed posts")
-
-    conn_by_user = {uid: set() for uid in user_ids}
-    for u in user_ids:
-        for v in direct_by_user[u]:
-            if u == v:
+MAX_LIKES_PER_USER = 5
+MAX_PASSES_PER_USER = 5
+LOCATION_DISTRIBUTION = "campus"
+MAX_EXTENDED_CONNECTIONS = None  # cap on extendedConnections per user (None = unbounded)
+CHECKPOINT_CHUNK = 10_000        # users (or posts) per committed checkpoint chunk with --resumable
+SHARD_SIZE = 5_000               # users per independently seeded interaction stream (and per --workers task)
+SEED_PHASES = ("users", "interactions", "connections", "posts", "events")
+
+def sample_interactions(num_users, posts_per_user, rng,
+                        max_likes=MAX_LIKES_PER_USER, max_passes=MAX_PASSES_PER_USER, start=0, stop=None):
+    """Draw liked and passed posts for users start..stop-1 (default: all) in one vectorized pass.
+
+    Posts are laid out author-major (user i owns post indices
+    i*posts_per_user .. (i+1)*posts_per_user - 1), so a user's candidates
+    are every other index. Returns (picks, like_k, pass_k) where
+    picks[r, :like_k[r]] are the liked post indices of user start + r and
+    the next pass_k[r] entries are the passed ones; all are distinct per row.
+    """
+    stop = num_users if stop is None else stop
+    rows = stop - start
+    num_candidates = num_users * posts_per_user - posts_per_user
+    if num_candidates <= 0:
+        empty = np.zeros(rows, dtype=np.int64)
+        return np.zeros((rows, 0), dtype=np.int64), empty, empty.copy()
+
+    like_k = rng.integers(1, min(max_likes, num_candidates) + 1, size=rows)
+    pass_hi = np.minimum(max_passes, num_candidates - like_k)
+    pass_k = np.where(pass_hi > 0, rng.integers(1, np.maximum(pass_hi, 1) + 1), 0)
+
+    width = min(max_likes + max_passes, num_candidates)
+    if num_candidates < 4 * width:
+        # Tiny pools: collisions would dominate, sample each row exactly.
+        picks = np.stack([rng.choice(num_candidates, size=width, replace=False) for _ in range(rows)])
+    else:
+        picks = rng.integers(0, num_candidates, size=(rows, width))
+        while True:
+            ordered = np.sort(picks, axis=1)
+            dup = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+            if not dup.any():
+                break
+            picks[dup] = rng.integers(0, num_candidates, size=(int(dup.sum()), width))
+
+    # Shift candidate slots past the user's own block of posts.
+    own_start = np.arange(start, stop, dtype=np.int64)[:, None] * posts_per_user
+    picks = picks + (picks >= own_start) * posts_per_user
+    return picks, like_k, pass_k
+
+def shard_bounds(num_users, shard, shard_size=SHARD_SIZE):
+    start = shard * shard_size
+    return start, min(num_users, start + shard_size)
+
+def num_shards(num_users, shard_size=SHARD_SIZE):
+    return max(1, -(-num_users // shard_size))
+
+def sample_shard_interactions(num_users, posts_per_user, seed, shard, shard_size=SHARD_SIZE):
+    """sample_interactions() for one shard of users, from an RNG stream derived from (seed, shard).
+
+    Shards are fixed ranges of user indices, so a seed's interactions are
+    the same whether the shards are drawn in one process or spread over
+    a pool (see sharded_seed.py).
+    """
+    start, stop = shard_bounds(num_users, shard, shard_size)
+    return sample_interactions(num_users, posts_per_user, np.random.default_rng([seed, shard]),
+                               start=start, stop=stop)
+
+def geo_fields(location):
+    """GeoPoint + geohash fields shared by a user and their posts."""
+    return {"locationGeo": firestore.GeoPoint(location["latitude"], location["longitude"]),
+            **geohash_fields(location["latitude"], location["longitude"])}
+
+def interaction_fields(liked, passed, liked_users, passed_users):
+    """The user-document fields written for a user's likes and passes."""
+    return {
+        "likedPosts": liked,
+        "passedPosts": passed,
+        "dismissedPosts": passed,  
+        "likedUsers": liked_users,
+        "passedUsers": passed_users,
+        "liked": liked_users, 
+    }
+
+def add_dummy_users_and_posts(db, num_users=NUM_USERS, posts_per_user=POSTS_PER_USER, seed=None,
+                              distribution=LOCATION_DISTRIBUTION, max_extended=MAX_EXTENDED_CONNECTIONS,
+                              export_path=None, report_path=None, progress=True, resumable=False,
+                              chunk_size=CHECKPOINT_CHUNK, num_events=0):
+    """Generate and write a synthetic dataset to `db`; with `export_path`, write a
+    snapshot file (see snapshot.py) instead of touching Firestore.
+
+    Every user and post ID is derived from (seed, user index), so rerunning
+    the same parameters overwrites the same documents. With `resumable`, a
+    checkpoint (<run id>.checkpoint.json) records each phase's committed
+    chunks of `chunk_size` users/posts and a rerun skips them, and an ID
+    manifest (<run id>.manifest) is written up front for
+    `delete_dummies.py --manifest`.
+
+    `num_events` synthetic events hosted by the generated users are added
+    to `events` (see population.generate_events).
+
+    Phase timings (and RPC metrics when `db` is an InstrumentedClient) are
+    printed at the end and, with `report_path`, written as a JSON run report.
+    """
+    metrics = getattr(db, "metrics", None) or Metrics()
+    if seed is None:
+        if resumable:
+            raise ValueError("a resumable run needs an explicit seed")
+        seed = random.randrange(2**31)
+    if resumable and export_path:
+        raise ValueError("--resumable applies to Firestore writes, not --export")
+    if num_events and num_users < 1:
+        raise ValueError("--events needs at least one user to host them")
+    params = {"seed": seed, "users": num_users, "postsPerUser": posts_per_user,
+              "locations": distribution, "maxExtended": max_extended}
+    if num_events:
+        params["events"] = num_events
+    run = run_id(params)
+    print(f"🌱 Seeding {num_users} users x {posts_per_user} posts (seed={seed}, locations={distribution}, run={run})")
+
+    checkpoint = SeedCheckpoint(f"{run}.checkpoint.json" if resumable else None, params,
+                                int(time.time() * 1000))
+    if export_path:
+        writer = SnapshotWriter(export_path, meta=params)
+    else:
+        writer = BatchWriter(db)
+    created_at = checkpoint.created_at
+
+    # Every ID is known up front. Posts are author-major, so post index //
+    # posts_per_user is the author index.
+    user_ids = [identity_for(seed, i)[0] for i in range(num_users)]
+    post_ids = [post_id_for(seed, i, k) for i in range(num_users) for k in range(posts_per_user)]
+    post_author = np.repeat(np.arange(num_users, dtype=np.int64), posts_per_user)
+    if resumable:
+        manifest = f"{run}.manifest"
+        if not os.path.exists(manifest):
+            write_manifest(manifest, params, user_ids, post_ids, (event_id_for(seed, j) for j in range(num_events)))
+        resumed = {p: checkpoint.completed(p) for p in SEED_PHASES if checkpoint.completed(p)}
+        resumed.update({p: "done" for p in SEED_PHASES if checkpoint.is_done(p)})
+        print(f"💾 Checkpoint {checkpoint.path}, manifest {manifest}" + (f", resuming {resumed}" if resumed else ""))
+
+    def commit_chunk(phase, chunk):
+        # A chunk is recorded only after all of its writes have landed.
+        if checkpoint.enabled:
+            writer.flush()
+            checkpoint.mark(phase, chunk)
+
+    def finish_phase(phase):
+        if checkpoint.enabled:
+            writer.flush()
+            checkpoint.finish(phase)
+
+    # Step 1: Users and their posts, streamed from the generator one chunk at a time.
+    with metrics.phase("users+posts"), Progress("users", num_users, enabled=progress) as bar:
+        for chunk, lo in enumerate(range(0, num_users, chunk_size)):
+            hi = min(num_users, lo + chunk_size)
+            if checkpoint.is_done("users", chunk):
+                bar.advance(hi - lo)
                 continue
-            conn_by_user[u].add(v)
-            conn_by_user[v].add(u)
-
-    extended_by_user = {uid: set() for uid in user_ids}
-    for u in user_ids:
-        first = conn_by_user[u]
-        second = set()
-        for v in first:
-            second.update(conn_by_user[v])
-        second.discard(u)
-        second.difference_update(first)
-        extended_by_user[u] = second
-
-    for u in user_ids:
-        db.collection("users").document(u).update({
-            "connections": sorted(list(conn_by_user[u])),
-            "extendedConnections": sorted(list(extended_by_user[u])),
-            "extended": sorted(list(extended_by_user[u])),  
-            "connectionsGraph": {
-                "direct": sorted(list(conn_by_user[u])),
-                "extended": sorted(list(extended_by_user[u]))
-            }
-        })
-        print(f"🔗 {u}: {len(conn_by_user[u])} direct, {len(extended_by_user[u])} extended")
-
-    for pid in post_ids:
-        db.collection("posts").document(pid).update({
-            "likedBy": post_liked_by.get(pid, []),
-            "passedBy": post_passed_by.get(pid, [])
-        })
-
-    print(f"\n🎉 Done! {NUM_USERS} users + {NUM_USERS*POSTS_PER_USER} posts added, with likes/passes and connections.")
+            population = generate_population(hi, posts_per_user, seed, distribution, created_at, start=lo)
+            for i, (user_id, user_data, posts) in enumerate(population, start=lo):
+                geo = geo_fields(user_data["location"])
+                user_data.update(geo)
+                writer.set(db.collection("users").document(user_id), user_data)
+
+                for k, post_data in enumerate(posts):
+                    post_data["createdAt"] = firestore.SERVER_TIMESTAMP
+                    post_data.update(geo)
+                    writer.set(db.collection("posts").document(post_ids[i * posts_per_user + k]), post_data)
+                bar.advance()
+            commit_chunk("users", chunk)
+        finish_phase("users")
+
+    # Step 2: Likes/passes, sampled a shard of users at a time. Sampling and the
+    # likedBy/passedBy tallies are recomputed on resume; only writes are skipped.
+    with metrics.phase("interactions"), Progress("likes/passes", num_users, enabled=progress) as bar:
+        shards = [sample_shard_interactions(num_users, posts_per_user, seed, shard)
+                  for shard in range(num_shards(num_users))]
+        picks, like_k, pass_k = (np.concatenate(parts) for parts in zip(*shards))
+        post_liked_by = defaultdict(list)
+        post_passed_by = defaultdict(list)
+        phase_done = checkpoint.is_done("interactions")
+
+        for i, user_id in enumerate(user_ids):
+            row = picks[i]
+            liked_idx = row[:like_k[i]]
+            passed_idx = row[like_k[i]:like_k[i] + pass_k[i]]
+            liked = [post_ids[p] for p in liked_idx]
+            passed = [post_ids[p] for p in passed_idx]
+
+            if not phase_done and not checkpoint.is_done("interactions", i // chunk_size):
+                liked_users = [user_ids[a] for a in np.unique(post_author[liked_idx])]
+                passed_users = [user_ids[a] for a in np.unique(post_author[passed_idx])]
+                writer.update(db.collection("users").document(user_id),
+                              interaction_fields(liked, passed, liked_users, passed_users))
+                if (i + 1) % chunk_size == 0 or i + 1 == num_users:
+                    commit_chunk("interactions", i // chunk_size)
+
+            for pid in liked:
+                post_liked_by[pid].append(user_id)
+            for pid in passed:
+                post_passed_by[pid].append(user_id)
+            bar.advance()
+        finish_phase("interactions")
+
+    # Step 3: Direct + 2-hop connections. A user is directly connected to
+    # the author of every post they liked or passed (and vice versa).
+    with metrics.phase("graph"):
+        interacted = np.arange(picks.shape[1]) < (like_k + pass_k)[:, None]
+        src = np.nonzero(interacted)[0]
+        dst = post_author[picks[interacted]]
+        graph = ConnectionGraph.from_edges(user_ids, src, dst)
+
+    # Extended connections are computed block by block as this loop pulls
+    # them; chunks here follow the graph's (ID-sorted) row order.
+    with metrics.phase("connections"), Progress("connections", num_users, enabled=progress) as bar:
+        if not checkpoint.is_done("connections"):
+            for j, (u, direct, extended) in enumerate(graph.iter_user_connections(max_extended)):
+                if not checkpoint.is_done("connections", j // chunk_size):
+                    writer.update(db.collection("users").document(u), connection_fields(direct, extended))
+                    if (j + 1) % chunk_size == 0 or j + 1 == num_users:
+                        commit_chunk("connections", j // chunk_size)
+                bar.advance()
+            finish_phase("connections")
+
+    # Step 4: likedBy / passedBy on the posts, from the interactions sampled in step 2.
+    with metrics.phase("post updates"), Progress("posts", len(post_ids), enabled=progress) as bar:
+        for chunk, lo in enumerate(range(0, len(post_ids), chunk_size)):
+            hi = min(len(post_ids), lo + chunk_size)
+            if not checkpoint.is_done("posts", chunk):
+                for pid in post_ids[lo:hi]:
+                    writer.update(db.collection("posts").document(pid), {
+                        "likedBy": post_liked_by.get(pid, []),
+                        "passedBy": post_passed_by.get(pid, [])
+                    })
+                commit_chunk("posts", chunk)
+            bar.advance(hi - lo)
+        finish_phase("posts")
+
+    # Step 5: Events, generated and written in checkpoint-sized chunks.
+    with metrics.phase("events"), Progress("events", num_events, enabled=progress) as bar:
+        for chunk, lo in enumerate(range(0, num_events, chunk_size)):
+            hi = min(num_events, lo + chunk_size)
+            if not checkpoint.is_done("events", chunk):
+                for event_id, event_data in generate_events(hi, num_users, seed, distribution, created_at, start=lo):
+                    event_data["createdAt"] = datetime.datetime.fromtimestamp(event_data["createdAt"] / 1000,
+                                                                              datetime.timezone.utc)
+                    event_data.update(geo_fields(event_data["location"]))
+                    writer.set(db.collection("events").document(event_id), event_data)
+                commit_chunk("events", chunk)
+            bar.advance(hi - lo)
+        finish_phase("events")
+
+    with metrics.phase("flush"):
+        writer.close()
+    print(f"✅ All writes {'exported' if export_path else 'committed'}: {writer.summary()}")
+    print(f"📊 {metrics.summary()}")
+    if report_path:
+        metrics.write_report(report_path, job="seed", run=run, writer=writer.stats(),
+                             params={**params, "export": export_path, "resumable": resumable})
+        print(f"📝 Run report written to {report_path}")
+
+    print(f"\n🎉 Done! {num_users} users + {num_users*posts_per_user} posts"
+          f"{f' + {num_events} events' if num_events else ''} added, with likes/passes and connections.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed Firestore with synthetic Tava users and posts.")
+    parser.add_argument("--users", type=int, default=NUM_USERS, help="number of users to generate")
+    parser.add_argument("--posts-per-user", type=int, default=POSTS_PER_USER)
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed (random if omitted; printed either way)")
+    parser.add_argument("--locations", choices=sorted(LOCATION_DISTRIBUTIONS), default=LOCATION_DISTRIBUTION,
+                        help="location distribution for generated users")
+    parser.add_argument("--events", type=int, default=0,
+                        help="also generate this many synthetic events hosted by the generated users")
+    parser.add_argument("--max-extended", type=int, default=MAX_EXTENDED_CONNECTIONS,
+                        help="keep at most this many extendedConnections per user (most mutual connections first)")
+    parser.add_argument("--export", metavar="PATH",
+                        help="write the dataset to a snapshot file for load_snapshot.py instead of Firestore")
+    parser.add_argument("--resumable", action="store_true",
+                        help="checkpoint committed chunks and write an ID manifest; rerun to resume (needs --seed)")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="generate and write in N processes, sharded by user index (see sharded_seed.py)")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON run report (RPCs, latencies, phases)")
+    parser.add_argument("--no-progress", action="store_true", help="don't draw progress lines")
+    add_client_arguments(parser)
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    add_dummy_users_and_posts()
-    print(f"\n🎉 Done! {NUM_USERS} users + {NUM_USERS*POSTS_PER_USER} posts added, with likes/passes linked.")
+    args = parse_args()
+    if args.events and args.users < 1:
+        raise SystemExit("--events needs at least one user (--users) to host them")
+    if args.workers:
+        if args.export or args.backend == "memory":
+            raise SystemExit("--workers writes from several processes; use the firebase or emulator backend")
+        if args.events:
+            raise SystemExit("--events is written by the single-process seeder; run it without --workers")
+        from sharded_seed import add_dummy_users_sharded
+
+        factory = functools.partial(get_client, args.backend, args.project, args.latency_ms,
+                                    args.service_account_key)
+        seed = args.seed if args.seed is not None else random.randrange(2**31)
+        add_dummy_users_sharded(factory, args.users, args.posts_per_user, seed, args.locations, args.max_extended,
+                                args.workers, args.report, not args.no_progress, args.resumable)
+    else:
+        # An export only needs document references, which the memory backend can mint offline.
+        db = get_client("memory") if args.export else client_from_args(args)
+        add_dummy_users_and_posts(InstrumentedClient(db), args.users, args.posts_per_user, args.seed, args.locations,
+                                  args.max_extended, args.export, args.report, not args.no_progress, args.resumable,
+                                  num_events=args.events)
@@ -0,0 +1,119 @@
+"""
+Backfill `geohash` / `geohashPrefixes` on existing located documents.
+
+Each collection is split into fixed document-ID ranges (scanner.py's
+"id-range" partitions, so the split is the same on every run) and the
+ranges are processed in parallel. After each page's updates are
+committed, the last document ID of that range is saved to a checkpoint
+file; a rerun resumes every range after its checkpoint, and finished
+ranges are skipped. Documents whose fields are already correct are not
+rewritten, so rerunning from scratch is also safe.
+
+    python backfill_geohash.py                         # users, posts, events
+    python backfill_geohash.py --collections events --reset
+"""
+
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_writer import BatchWriter
+from firestore_client import add_client_arguments, client_from_args
+from geohash import geohash_fields, location_of
+from scanner import iter_pages, partition_queries
+
+
+COLLECTIONS = ("users", "posts", "events")
+CHECKPOINT_FILE = "geohash_backfill.checkpoint.json"
+PARTITIONS = 16
+PAGE_SIZE = 500
+DONE = "__done__"
+
+
+class Checkpoint:
+    def __init__(self, path, partitions):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {"partitions": partitions, "ranges": {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("partitions") != partitions:
+                raise SystemExit(f"{path} was written with {saved.get('partitions')} partitions; "
+                                 f"rerun with --partitions {saved.get('partitions')} or --reset")
+            self.state = saved
+
+    def get(self, collection, index):
+        return self.state["ranges"].get(collection, {}).get(str(index))
+
+    def set(self, collection, index, value):
+        with self._lock:
+            self.state["ranges"].setdefault(collection, {})[str(index)] = value
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.state, f)
+            os.replace(tmp, self.path)
+
+
+def _changes(data):
+    point = location_of(data)
+    if point is None:
+        return None
+    fields = geohash_fields(*point)
+    if all(data.get(k) == v for k, v in fields.items()):
+        return None
+    return fields
+
+
+def backfill_range(db, collection_name, index, query, checkpoint, page_size=PAGE_SIZE):
+    resume_after = checkpoint.get(collection_name, index)
+    if resume_after == DONE:
+        return 0, 0
+    collection = db.collection(collection_name)
+    if resume_after is not None:
+        query = query.where("__name__", ">", collection.document(resume_after))
+
+    scanned = updated = 0
+    with BatchWriter(db) as writer:
+        for page in iter_pages(query, page_size, fields=["location", "locationGeo", "geohash", "geohashPrefixes"]):
+            for doc in page:
+                scanned += 1
+                changes = _changes(doc.to_dict() or {})
+                if changes:
+                    writer.update(collection.document(doc.id), changes)
+                    updated += 1
+            writer.flush()
+            checkpoint.set(collection_name, index, page[-1].id)
+    checkpoint.set(collection_name, index, DONE)
+    return scanned, updated
+
+
+def backfill(db, collections=COLLECTIONS, partitions=PARTITIONS, checkpoint_path=CHECKPOINT_FILE):
+    checkpoint = Checkpoint(checkpoint_path, partitions)
+    for name in collections:
+        queries = partition_queries(db.collection(name), partitions, mode="id-range")
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            futures = [pool.submit(backfill_range, db, name, i, q, checkpoint) for i, q in enumerate(queries)]
+            results = [f.result() for f in futures]
+        scanned = sum(r[0] for r in results)
+        updated = sum(r[1] for r in results)
+        print(f"🧭 {name}: scanned {scanned}, wrote geohash on {updated}")
+    print("✅ Geohash backfill complete")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collections", nargs="+", default=list(COLLECTIONS))
+    parser.add_argument("--partitions", type=int, default=PARTITIONS)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--reset", action="store_true", help="ignore and delete an existing checkpoint")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    db = client_from_args(args)
+    backfill(db, args.collections, args.partitions, args.checkpoint)
@@ -0,0 +1,263 @@
+"""
+Batched, pipelined Firestore writes for the generate/ scripts.
+
+Writes are queued per document and coalesced before they are sent: a
+`set` followed by any number of `update`s becomes a single `set`, and
+repeated `update`s are merged into one; `set(..., merge=True)` writes are
+deep-merged into whatever is pending for the document. Pending writes are committed as
+WriteBatch commits of up to 500 operations and MAX_BATCH_BYTES of
+document data (Firestore rejects requests over 10 MiB, and a few large
+documents reach that long before 500 do), with a bounded number of
+commits in flight, and commits rejected with a throttling / transient
+error are retried with exponential backoff and jitter (the same policy
+BulkWriter uses).
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from google.api_core import exceptions as gexc
+from google.cloud.firestore import DELETE_FIELD
+from google.cloud.firestore_v1.transforms import Increment
+
+from storage_size import MAX_REQUEST_BYTES, document_size
+
+MAX_BATCH_SIZE = 500          # Firestore hard limit per commit
+MAX_BATCH_BYTES = MAX_REQUEST_BYTES - 1024 * 1024  # headroom for request encoding overhead
+MAX_IN_FLIGHT = 8             # concurrent commits
+MAX_PENDING = 50_000          # coalescing window before oldest docs are flushed
+MAX_RETRIES = 6
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 30.0
+
+RETRYABLE_ERRORS = (
+    gexc.ResourceExhausted,
+    gexc.Aborted,
+    gexc.DeadlineExceeded,
+    gexc.ServiceUnavailable,
+    gexc.InternalServerError,
+)
+
+_SET = "set"
+_UPDATE = "update"
+_DELETE = "delete"
+_MERGE = "merge"
+
+
+def _copy_maps(value):
+    return {k: _copy_maps(v) for k, v in value.items()} if isinstance(value, dict) else value
+
+
+def _merge(target, data):
+    """Deep-merge a `set(..., merge=True)` payload into `target` (later values win)."""
+    for key, value in data.items():
+        current = target.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            _merge(current, value)
+        elif isinstance(value, Increment) and isinstance(current, Increment):
+            target[key] = Increment(current.value + value.value)
+        elif isinstance(value, Increment) and isinstance(current, (int, float)) and not isinstance(current, bool):
+            target[key] = current + value.value
+        else:
+            target[key] = _copy_maps(value)
+
+
+def _as_set(data):
+    """A merge folded into a full `set`: deleted fields are absent, increments start from 0."""
+    return {k: _as_set(v) if isinstance(v, dict) else v.value if isinstance(v, Increment) else v
+            for k, v in data.items() if v is not DELETE_FIELD}
+
+
+class BatchWriter:
+    """Coalescing, concurrent write engine around `db.batch()`.
+
+    Usage:
+        with BatchWriter(db) as writer:
+            writer.set(db.collection("users").document(uid), data)
+            writer.update(db.collection("users").document(uid), {"likedPosts": liked})
+    """
+
+    def __init__(self, db, batch_size=MAX_BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT,
+                 max_pending=MAX_PENDING, max_retries=MAX_RETRIES, batch_bytes=MAX_BATCH_BYTES):
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+        self.db = db
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.max_pending = max(max_pending, batch_size)
+        self.max_retries = max_retries
+
+        self._pending = OrderedDict()  # doc path -> [op, ref, data]
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._futures = []
+        self._inflight = {}            # doc path -> future of the commit carrying it
+        self._lock = threading.Lock()
+
+        self.ops_queued = 0
+        self.writes_committed = 0
+        self.commits = 0
+        self.retries = 0
+        self.wait_s = 0.0              # time callers spent blocked on in-flight commits
+        self._started = time.perf_counter()
+
+    # -- queueing ---------------------------------------------------------
+
+    def set(self, ref, data, merge=False):
+        if merge:
+            self._queue(ref, _MERGE, _copy_maps(data))
+        else:
+            self._queue(ref, _SET, dict(data))
+
+    def update(self, ref, data):
+        self._queue(ref, _UPDATE, dict(data))
+
+    def delete(self, ref):
+        self._queue(ref, _DELETE, None)
+
+    def _queue(self, ref, op, data):
+        self.ops_queued += 1
+        key = ref.path
+        current = self._pending.get(key)
+        if current is None or op in (_SET, _DELETE):
+            # A set/delete replaces whatever was pending for the document.
+            self._pending[key] = [op, ref, data]
+        elif op == _MERGE:
+            if current[0] == _UPDATE:
+                raise ValueError(f"cannot merge into {key}: it has a pending update")
+            if current[0] == _DELETE:
+                current[:] = [_SET, ref, _as_set(data)]
+            else:
+                _merge(current[2], data)
+                if current[0] == _SET:
+                    current[2] = _as_set(current[2])
+        elif current[0] == _DELETE:
+            raise ValueError(f"cannot update {key}: it is queued for deletion")
+        elif current[0] == _MERGE:
+            raise ValueError(f"cannot update {key}: it has a pending merge")
+        else:
+            # Top-level keys only; the generate/ scripts never use dotted
+            # field paths, so a plain dict merge matches Firestore semantics.
+            current[2].update(data)
+        if len(self._pending) > self.max_pending:
+            self._submit_oldest(self.batch_size)
+
+    # -- committing -------------------------------------------------------
+
+    def _submit_oldest(self, count):
+        ops = []
+        nbytes = 0
+        while self._pending and len(ops) < count:
+            path, (op, ref, data) = next(iter(self._pending.items()))
+            size = document_size(path, data)
+            if ops and nbytes + size > self.batch_bytes:
+                break
+            nbytes += size
+            ops.append(self._pending.popitem(last=False)[1])
+        if not ops:
+            return
+        paths = [ref.path for _, ref, _ in ops]
+        # A document already in an in-flight commit (flushed out of the
+        # coalescing window earlier) must land before its next write does.
+        with self._lock:
+            blockers = {self._inflight[p] for p in paths if p in self._inflight}
+        waited = time.perf_counter()
+        for blocker in blockers:
+            blocker.result()
+        self._slots.acquire()
+        self.wait_s += time.perf_counter() - waited
+        future = self._executor.submit(self._commit, ops)
+        with self._lock:
+            for p in paths:
+                self._inflight[p] = future
+        future.add_done_callback(lambda f: self._release(paths, f))
+        self._futures.append(future)
+
+    def _release(self, paths, future):
+        with self._lock:
+            for p in paths:
+                if self._inflight.get(p) is future:
+                    del self._inflight[p]
+
+    def _commit(self, ops):
+        try:
+            attempt = 0
+            while True:
+                batch = self.db.batch()
+                for op, ref, data in ops:
+                    if op == _SET:
+                        batch.set(ref, data)
+                    elif op == _MERGE:
+                        batch.set(ref, data, merge=True)
+                    elif op == _UPDATE:
+                        batch.update(ref, data)
+                    else:
+                        batch.delete(ref)
+                try:
+                    batch.commit()
+                    break
+                except RETRYABLE_ERRORS:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = min(BACKOFF_MAX_S, BACKOFF_BASE_S * (2 ** attempt))
+                    time.sleep(delay * random.uniform(0.5, 1.0))
+                    attempt += 1
+                    with self._lock:
+                        self.retries += 1
+            with self._lock:
+                self.commits += 1
+                self.writes_committed += len(ops)
+        finally:
+            self._slots.release()
+
+    def flush(self):
+        """Commit everything queued so far and wait for it to land."""
+        while self._pending:
+            self._submit_oldest(self.batch_size)
+        futures, self._futures = self._futures, []
+        waited = time.perf_counter()
+        for f in futures:
+            f.result()
+        self.wait_s += time.perf_counter() - waited
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True)
+        return False
+
+    # -- reporting --------------------------------------------------------
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def stats(self):
+        return {
+            "opsQueued": self.ops_queued,
+            "writesCommitted": self.writes_committed,
+            "commits": self.commits,
+            "retries": self.retries,
+            "backpressureWaitS": round(self.wait_s, 3),
+            "elapsedS": round(self.elapsed, 3),
+        }
+
+    def summary(self):
+        elapsed = self.elapsed
+        rate = self.writes_committed / elapsed if elapsed > 0 else 0.0
+        return (f"{self.writes_committed} docs in {self.commits} commits "
+                f"({self.ops_queued} ops queued, {self.retries} retries) "
+                f"in {elapsed:.2f}s → {rate:,.0f} docs/sec")
@@ -0,0 +1,115 @@
+"""
+Benchmark the seed and cleanup hot paths against the in-memory Firestore.
+
+For each size, a fresh MemoryFirestore is seeded with
+add_dummy_users_and_posts() and then emptied with
+delete_dummy_users_and_posts(). Each phase reports wall time, RPCs by
+kind, documents written, docs/sec and peak Python memory (tracemalloc,
+which includes NumPy buffers):
+
+    python bench_suite.py                                   # 1k, 10k, 100k users
+    python bench_suite.py --sizes 1000 10000 --latency-ms 2 --json bench.json
+    python bench_suite.py --events-per-user 10              # also seed events and time event_digest.py
+
+With --events-per-user the seed also writes that many events per user and
+a "digest" phase times a full event_digest.rebuild() before the delete.
+
+tracemalloc slows allocation-heavy code down; pass --no-trace-memory for
+timings that are comparable to real runs. With --latency-ms every RPC
+sleeps, so the numbers also show how well a phase overlaps round trips.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+from add_dummy_users import add_dummy_users_and_posts
+from delete_dummies import delete_dummy_users_and_posts
+from event_digest import rebuild as rebuild_event_digest
+from memory_firestore import MemoryFirestore
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def run_phase(db, size, phase, fn, trace_memory=True, quiet=True):
+    rpcs_before = dict(db.rpcs)
+    written_before = db.documents_written
+    if trace_memory:
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        fn()
+    seconds = time.perf_counter() - started
+    rpcs = {kind: count - rpcs_before.get(kind, 0) for kind, count in db.rpcs.items()}
+    written = db.documents_written - written_before
+    return {
+        "users": size,
+        "phase": phase,
+        "seconds": round(seconds, 3),
+        "rpcs": sum(rpcs.values()),
+        "rpcsByKind": rpcs,
+        "docsWritten": written,
+        "docsPerSec": round(written / seconds) if seconds > 0 else 0,
+        "peakMemoryMb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1) if trace_memory else None,
+    }
+
+
+def run(sizes=SIZES, posts_per_user=1, latency_ms=0.0, seed=0, trace_memory=True, quiet=True, events_per_user=0):
+    results = []
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        for size in sizes:
+            db = MemoryFirestore(latency_s=latency_ms / 1000.0)
+            seed_run = lambda: add_dummy_users_and_posts(db, size, posts_per_user, seed, progress=False,
+                                                         num_events=size * events_per_user)
+            results.append(run_phase(db, size, "seed", seed_run, trace_memory, quiet))
+            print(format_row(results[-1]))
+            if events_per_user:
+                results.append(run_phase(db, size, "digest", lambda: rebuild_event_digest(db), trace_memory, quiet))
+                print(format_row(results[-1]))
+            delete_run = lambda: delete_dummy_users_and_posts(db, progress=False)
+            results.append(run_phase(db, size, "delete", delete_run, trace_memory, quiet))
+            print(format_row(results[-1]))
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return results
+
+
+HEADER = f"{'users':>8} {'phase':<7} {'seconds':>9} {'rpcs':>8} {'docs':>9} {'docs/sec':>10} {'peak MB':>8}"
+
+
+def format_row(row):
+    peak = f"{row['peakMemoryMb']:8.1f}" if row["peakMemoryMb"] is not None else f"{'-':>8}"
+    return (f"{row['users']:>8,} {row['phase']:<7} {row['seconds']:>9.2f} {row['rpcs']:>8,} "
+            f"{row['docsWritten']:>9,} {row['docsPerSec']:>10,} {peak}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="user counts to benchmark")
+    parser.add_argument("--posts-per-user", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency per RPC")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--events-per-user", type=int, default=0,
+                        help="also seed this many events per user and benchmark the event digest")
+    parser.add_argument("--no-trace-memory", action="store_true", help="skip tracemalloc (faster, no peak memory)")
+    parser.add_argument("--verbose", action="store_true", help="show the seeder's and cleanup's own output")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    print(f"⏱️ Benchmarking against MemoryFirestore (latency {args.latency_ms}ms/RPC)")
+    print(HEADER)
+    results = run(args.sizes, args.posts_per_user, args.latency_ms, args.seed,
+                  not args.no_trace_memory, not args.verbose, args.events_per_user)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"latencyMs": args.latency_ms, "postsPerUser": args.posts_per_user,
+                       "eventsPerUser": args.events_per_user, "seed": args.seed, "results": results}, f, indent=2)
+        print(f"📝 Wrote {args.json}")
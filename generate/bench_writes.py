@@ -0,0 +1,99 @@
+"""
+Measure seeder write throughput against the Firestore emulator.
+
+Replays the write pattern of `add_dummy_users_and_posts` (one user set,
+one post create, two user updates and one post update per user) twice:
+once as individual RPCs, the way the seeder used to write, and once
+through `BatchWriter`. Prints docs/sec for both.
+
+Usage (from generate/):
+    firebase emulators:start --only firestore
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python bench_writes.py --users 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from google.cloud import firestore
+
+from batch_writer import BatchWriter
+
+
+def _user_doc(i):
+    return {
+        "displayName": f"Bench User {i}",
+        "email": f"bench_{i}@purdue.edu",
+        "createdAt": int(time.time() * 1000),
+        "likedPosts": [],
+        "passedPosts": [],
+        "skillsNeeded": ["AI/ML", "Data Science"],
+        "connections": [],
+        "location": {"label": "Purdue Memorial Union", "latitude": 40.4236, "longitude": -86.9113},
+    }
+
+
+def _post_doc(i):
+    return {
+        "authorId": f"bench_user_{i}",
+        "createdAt": firestore.SERVER_TIMESTAMP,
+        "title": f"Bench Project {i}",
+        "description": "Throughput benchmark post.",
+        "peopleNeeded": 2,
+    }
+
+
+def run_sequential(db, prefix, num_users):
+    users = db.collection(f"{prefix}_users")
+    posts = db.collection(f"{prefix}_posts")
+    start = time.perf_counter()
+    for i in range(num_users):
+        user_ref = users.document(f"bench_user_{i}")
+        user_ref.set(_user_doc(i))
+        post_ref = posts.add(_post_doc(i))[1]
+        user_ref.update({"likedPosts": [post_ref.id], "passedPosts": []})
+        user_ref.update({"connections": [], "extendedConnections": []})
+        post_ref.update({"likedBy": [], "passedBy": []})
+    elapsed = time.perf_counter() - start
+    return elapsed, num_users * 5
+
+
+def run_batched(db, prefix, num_users):
+    users = db.collection(f"{prefix}_users")
+    posts = db.collection(f"{prefix}_posts")
+    with BatchWriter(db) as writer:
+        for i in range(num_users):
+            user_ref = users.document(f"bench_user_{i}")
+            writer.set(user_ref, _user_doc(i))
+            post_ref = posts.document()
+            writer.set(post_ref, _post_doc(i))
+            writer.update(user_ref, {"likedPosts": [post_ref.id], "passedPosts": []})
+            writer.update(user_ref, {"connections": [], "extendedConnections": []})
+            writer.update(post_ref, {"likedBy": [], "passedBy": []})
+    return writer.elapsed, writer.commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--project", default="demo-tava")
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set; refusing to benchmark against a live project.")
+
+    db = firestore.Client(project=args.project)
+    docs = args.users * 2  # one user + one post document each
+
+    print(f"⏱️ Benchmarking {args.users} users ({docs} documents) against {os.environ['FIRESTORE_EMULATOR_HOST']}")
+    if not args.skip_sequential:
+        elapsed, rpcs = run_sequential(db, "bench_seq", args.users)
+        print(f"  before (one RPC per write): {docs / elapsed:,.0f} docs/sec, {rpcs} RPCs, {elapsed:.2f}s")
+    elapsed, rpcs = run_batched(db, "bench_batch", args.users)
+    print(f"  after  (BatchWriter):       {docs / elapsed:,.0f} docs/sec, {rpcs} RPCs, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
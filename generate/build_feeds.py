@@ -0,0 +1,308 @@
+"""
+Batch job that precomputes a bounded swipe feed per user.
+
+swipe-full.tsx currently subscribes to every post and user and filters
+out liked / passed / own posts on the device. This job does that work
+once, server-side, and writes `userFeeds/{uid}`:
+
+    {"postIds": [...], "scores": [...], "basis": "<hash>", "generatedAt": <ms>}
+
+Each user is scored only against a bounded candidate set:
+
+  - the CELL_CANDIDATES newest posts in each geohash cell (at
+    CANDIDATE_PRECISION) around the user's own cell,
+  - the TERM_CANDIDATES newest posts carrying each of the user's terms,
+  - the CELL_CANDIDATES newest posts overall,
+
+so the work per user is independent of the number of posts. Candidate
+(user, post) pairs are scored in float32 blocks of at most
+MAX_BLOCK_PAIRS pairs, which bounds memory regardless of dataset size:
+
+    score = W_OVERLAP  * |user terms ∩ post terms| / |user terms|
+          + W_DISTANCE * exp(-distance_km / DISTANCE_SCALE_KM)
+          + W_RECENCY  * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+where user terms are the user's skillsNeeded + interests and post terms
+are the post's skillsNeeded + its author's interests. Own, liked, passed
+and dismissed posts are dropped, and the top FEED_SIZE survive.
+
+`basis` is a hash of the user's likedPosts/passedPosts/dismissedPosts.
+With --incremental only users whose basis changed, whose feed lists a
+post that no longer exists, or who have no feed yet are rescored. Both
+modes delete the feeds of users that no longer exist.
+"""
+
+import argparse
+import hashlib
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+
+from batch_writer import BatchWriter
+from firestore_client import add_client_arguments, client_from_args
+from geohash import EARTH_RADIUS_KM, encode, location_of, neighbours
+from scanner import scan
+
+FEEDS_COLLECTION = "userFeeds"
+FEED_SIZE = 50
+MAX_BLOCK_PAIRS = 2_000_000      # (user, post) pairs scored per block
+
+CANDIDATE_PRECISION = 5          # ~4.9 km cells; the user's cell and its neighbours are searched
+CELL_CANDIDATES = 256            # newest posts kept per cell (and overall)
+TERM_CANDIDATES = 256            # newest posts kept per term
+
+W_OVERLAP = 1.0
+W_DISTANCE = 0.5
+W_RECENCY = 0.25
+DISTANCE_SCALE_KM = 5.0
+RECENCY_HALF_LIFE_DAYS = 14.0
+
+INTERACTION_FIELDS = ("likedPosts", "passedPosts", "dismissedPosts")
+
+
+@dataclass
+class PostTable:
+    ids: np.ndarray          # object array of post IDs
+    author: np.ndarray       # int64 user index, -1 if author unknown
+    terms: sp.csr_matrix     # float32 (posts x vocab) multi-hot
+    lat: np.ndarray          # float32 radians, NaN if unknown
+    lon: np.ndarray
+    created_s: np.ndarray    # epoch seconds
+    cell: list               # geohash cell at CANDIDATE_PRECISION, None if unknown
+
+
+@dataclass
+class CandidateIndex:
+    by_cell: dict            # geohash cell -> int64 post indices, newest first
+    by_term: list            # term column -> int64 post indices, newest first
+    newest: np.ndarray       # newest posts overall
+
+
+def _terms(values):
+    return {str(v).strip().lower() for v in values or [] if str(v).strip()}
+
+
+def _epoch_seconds(value, default):
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return value / 1000.0  # the seeder and app store epoch milliseconds
+    if hasattr(value, "timestamp"):
+        return value.timestamp()
+    return default
+
+
+def interaction_basis(user):
+    digest = hashlib.blake2b(digest_size=8)
+    for field in INTERACTION_FIELDS:
+        for pid in sorted(user.get(field) or []):
+            digest.update(pid.encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def load_users(db):
+    users = {}
+    for doc in scan(db.collection("users"), fields=[
+            "skillsNeeded", "interests", "location", "locationGeo", *INTERACTION_FIELDS]):
+        users[doc.id] = doc.to_dict() or {}
+    return users
+
+
+def _multi_hot(term_sets, vocab_size):
+    rows = np.repeat(np.arange(len(term_sets)), [len(cols) for cols in term_sets])
+    cols = [c for term_cols in term_sets for c in term_cols]
+    return sp.csr_matrix((np.ones(len(cols), dtype=np.float32), (rows, cols)),
+                         shape=(len(term_sets), max(vocab_size, 1)))
+
+
+def build_post_table(db, user_index, users, vocab):
+    now = time.time()
+    ids, author, term_sets, lat, lon, created, cells = [], [], [], [], [], [], []
+    # ID order, so ties (equal createdAt, equal score) break the same way on every run.
+    docs = sorted(scan(db.collection("posts"), fields=["authorId", "skillsNeeded", "location", "locationGeo", "createdAt"]),
+                  key=lambda doc: doc.id)
+    for doc in docs:
+        data = doc.to_dict() or {}
+        author_id = data.get("authorId")
+        ids.append(doc.id)
+        author.append(user_index.get(author_id, -1))
+        terms = _terms(data.get("skillsNeeded")) | _terms(users.get(author_id, {}).get("interests"))
+        term_sets.append([vocab.setdefault(t, len(vocab)) for t in terms])
+        point = location_of(data)
+        lat.append(point[0] if point else np.nan)
+        lon.append(point[1] if point else np.nan)
+        cells.append(encode(point[0], point[1], CANDIDATE_PRECISION) if point else None)
+        created.append(_epoch_seconds(data.get("createdAt"), now))
+
+    return PostTable(np.array(ids, dtype=object), np.array(author, dtype=np.int64), _multi_hot(term_sets, len(vocab)),
+                     np.radians(np.array(lat, dtype=np.float64)).astype(np.float32),
+                     np.radians(np.array(lon, dtype=np.float64)).astype(np.float32),
+                     np.array(created, dtype=np.float64), cells)
+
+
+def build_candidate_index(posts, cell_limit=CELL_CANDIDATES, term_limit=TERM_CANDIDATES):
+    newest = np.argsort(-posts.created_s, kind="stable")
+    by_cell = defaultdict(list)
+    for p in newest.tolist():
+        cell = posts.cell[p]
+        if cell is not None and len(by_cell[cell]) < cell_limit:
+            by_cell[cell].append(p)
+
+    rank = np.empty(len(newest), dtype=np.int64)
+    rank[newest] = np.arange(len(newest))
+    by_column = posts.terms.tocsc()
+    by_term = []
+    for col in range(by_column.shape[1]):
+        members = by_column.indices[by_column.indptr[col]:by_column.indptr[col + 1]]
+        by_term.append(members[np.argsort(rank[members], kind="stable")][:term_limit].astype(np.int64))
+    return CandidateIndex({cell: np.array(ps, dtype=np.int64) for cell, ps in by_cell.items()},
+                          by_term, newest[:cell_limit].astype(np.int64))
+
+
+def candidates_for(row, term_cols, cell, excluded, posts, index):
+    """Unique candidate post indices for one user, minus own and already-seen posts."""
+    parts = [index.newest]
+    if cell is not None:
+        parts.extend(index.by_cell[c] for c in neighbours(cell) if c in index.by_cell)
+    parts.extend(index.by_term[t] for t in term_cols)
+    cols = np.unique(np.concatenate(parts))
+    keep = posts.author[cols] != row
+    if len(excluded):
+        keep &= ~np.isin(cols, excluded)
+    return cols[keep]
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    """Element-wise distances between coordinates in radians, in float32."""
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return np.float32(2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def rank_block(pair_rows, pair_cols, user_terms, user_lat, user_lon, posts, recency, feed_size=FEED_SIZE):
+    """Score candidate pairs for a block of users; return [(post_indices, scores), ...] per user.
+
+    `pair_rows` index the block's users (0..B-1) and must be non-decreasing;
+    `user_terms` is the block's (B x vocab) multi-hot CSR; `recency` is the
+    per-post recency term, precomputed once.
+    """
+    num_users = user_terms.shape[0]
+    shared = np.asarray(user_terms[pair_rows].multiply(posts.terms[pair_cols]).sum(axis=1), dtype=np.float32).ravel()
+    term_counts = np.maximum(np.diff(user_terms.indptr), 1).astype(np.float32)
+    dist = _haversine_km(user_lat[pair_rows], user_lon[pair_rows], posts.lat[pair_cols], posts.lon[pair_cols])
+    proximity = np.exp(-dist / np.float32(DISTANCE_SCALE_KM))
+    np.nan_to_num(proximity, copy=False, nan=0.0)
+    scores = (np.float32(W_OVERLAP) * shared / term_counts[pair_rows]
+              + np.float32(W_DISTANCE) * proximity
+              + np.float32(W_RECENCY) * recency[pair_cols])
+
+    # Row ascending, then score descending; keep each row's first feed_size.
+    order = np.lexsort((pair_cols, -scores, pair_rows))
+    starts = np.searchsorted(pair_rows, np.arange(num_users + 1))
+    rank = np.arange(len(order)) - starts[pair_rows[order]]
+    keep = order[rank < feed_size]
+    bounds = np.searchsorted(pair_rows[keep], np.arange(num_users + 1))
+    return [(pair_cols[keep[bounds[r]:bounds[r + 1]]], scores[keep[bounds[r]:bounds[r + 1]]])
+            for r in range(num_users)]
+
+
+def stored_bases(db, post_index):
+    """{uid: basis} of every stored feed; None for feeds listing a post that no longer exists."""
+    stored = {}
+    for doc in scan(db.collection(FEEDS_COLLECTION), fields=["basis", "postIds"]):
+        data = doc.to_dict() or {}
+        live = all(pid in post_index for pid in data.get("postIds") or [])
+        stored[doc.id] = data.get("basis") if live else None
+    return stored
+
+
+def stale_users(users, stored):
+    """Users whose interaction basis differs from their stored feed (or who have none)."""
+    return [uid for uid, data in users.items() if stored.get(uid) != interaction_basis(data)]
+
+
+def _iter_blocks(targets, users, user_index, vocab, post_index, posts, index, max_pairs):
+    """Group users into blocks of at most `max_pairs` candidate pairs (a lone user may exceed it)."""
+    block, rows, cols, term_sets, lat, lon = [], [], [], [], [], []
+    pairs = 0
+    for uid in targets:
+        data = users[uid]
+        term_cols = [vocab[t] for t in _terms(data.get("skillsNeeded")) | _terms(data.get("interests")) if t in vocab]
+        point = location_of(data)
+        cell = encode(point[0], point[1], CANDIDATE_PRECISION) if point else None
+        seen = {pid for field in INTERACTION_FIELDS for pid in data.get(field) or []}
+        excluded = np.fromiter((post_index[p] for p in seen if p in post_index), dtype=np.int64)
+        candidates = candidates_for(user_index[uid], term_cols, cell, excluded, posts, index)
+        if block and pairs + len(candidates) > max_pairs:
+            yield block, rows, cols, term_sets, lat, lon
+            block, rows, cols, term_sets, lat, lon = [], [], [], [], [], []
+            pairs = 0
+        rows.append(np.full(len(candidates), len(block), dtype=np.int64))
+        cols.append(candidates)
+        block.append(uid)
+        term_sets.append(term_cols)
+        lat.append(np.radians(point[0]) if point else np.nan)
+        lon.append(np.radians(point[1]) if point else np.nan)
+        pairs += len(candidates)
+    if block:
+        yield block, rows, cols, term_sets, lat, lon
+
+
+def build_feeds(db, incremental=False, feed_size=FEED_SIZE, max_pairs=MAX_BLOCK_PAIRS):
+    started = time.perf_counter()
+    users = load_users(db)
+    user_ids = list(users)
+    user_index = {uid: i for i, uid in enumerate(user_ids)}
+    vocab = {}
+    posts = build_post_table(db, user_index, users, vocab)
+    post_index = {pid: i for i, pid in enumerate(posts.ids)}
+    index = build_candidate_index(posts)
+    print(f"📥 Loaded {len(users)} users and {len(posts.ids)} posts ({len(vocab)} terms, {len(index.by_cell)} cells)")
+
+    stored = stored_bases(db, post_index)
+    orphaned = [uid for uid in stored if uid not in user_index]
+    targets = stale_users(users, stored) if incremental else user_ids
+    print(f"🧮 Ranking feeds for {len(targets)} users" + (" (incremental)" if incremental else ""))
+
+    now = time.time()
+    age_days = np.maximum(now - posts.created_s, 0.0) / 86400.0
+    recency = (0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)).astype(np.float32)
+    written = scored = 0
+    with BatchWriter(db) as writer:
+        for block, rows, cols, term_sets, lat, lon in _iter_blocks(
+                targets, users, user_index, vocab, post_index, posts, index, max_pairs):
+            pair_rows, pair_cols = np.concatenate(rows), np.concatenate(cols)
+            scored += len(pair_rows)
+            ranked = rank_block(pair_rows, pair_cols, _multi_hot(term_sets, len(vocab)),
+                                np.array(lat, dtype=np.float32), np.array(lon, dtype=np.float32),
+                                posts, recency, feed_size)
+            for uid, (top, vals) in zip(block, ranked):
+                writer.set(db.collection(FEEDS_COLLECTION).document(uid), {
+                    "postIds": posts.ids[top].tolist(),
+                    "scores": [round(float(v), 4) for v in vals],
+                    "basis": interaction_basis(users[uid]),
+                    "generatedAt": int(now * 1000),
+                })
+                written += 1
+        for uid in orphaned:
+            writer.delete(db.collection(FEEDS_COLLECTION).document(uid))
+
+    print(f"✅ Wrote {written} feeds ({scored / max(len(targets), 1):,.0f} candidates/user) and removed "
+          f"{len(orphaned)} orphaned ones in {time.perf_counter() - started:.2f}s ({writer.summary()})")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rebuild feeds for users whose likes/passes changed since their last build")
+    parser.add_argument("--feed-size", type=int, default=FEED_SIZE)
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    db = client_from_args(args)
+    build_feeds(db, args.incremental, args.feed_size)
@@ -0,0 +1,140 @@
+"""
+Batch job that ranks "people you may know" for every user.
+
+`extendedConnections` is every 2-hop user in ID order: it grows without
+bound for popular users and says nothing about who matters. This job
+takes the same like/pass-derived adjacency (each user's `connections`)
+and keeps, per user, the SUGGESTIONS_SIZE best 2-hop candidates:
+
+    score = mutual * (1 + W_INTERESTS * shared interests
+                        + W_SKILLS * shared skillsNeeded)
+
+where `mutual` is the number of mutual connections. Mutual counts come
+from the blocked sparse product A·A (ConnectionGraph.iter_extended);
+shared interests / skills are row-wise products of sparse multi-hot
+feature matrices over the candidate pairs only, and a per-row top-K
+selection is done with one lexsort over the block. The result is written
+to a bounded `suggestions` field, best first:
+
+    "suggestions": [{"userId": "...", "mutual": 3, "score": 7.5}, ...]
+
+Users whose suggestions are unchanged are not rewritten.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from batch_writer import BatchWriter
+from connection_graph import EXTENDED_BLOCK_ROWS, ConnectionGraph
+from firestore_client import add_client_arguments, client_from_args
+from scanner import scan
+
+
+SUGGESTIONS_SIZE = 20
+
+W_INTERESTS = 0.5
+W_SKILLS = 0.5
+
+FEATURE_FIELDS = ("interests", "skillsNeeded")
+
+
+def load_users(db):
+    users = {}
+    for doc in scan(db.collection("users"), fields=["connections", "suggestions", *FEATURE_FIELDS]):
+        users[doc.id] = doc.to_dict() or {}
+    return users
+
+
+def build_graph(users):
+    """ConnectionGraph over `users` from their `connections` lists (unknown IDs are dropped)."""
+    user_ids = list(users)
+    index = {uid: i for i, uid in enumerate(user_ids)}
+    src, dst = [], []
+    for i, uid in enumerate(user_ids):
+        for other in users[uid].get("connections") or []:
+            j = index.get(other)
+            if j is not None:
+                src.append(i)
+                dst.append(j)
+    return ConnectionGraph.from_edges(user_ids, np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64))
+
+
+def feature_matrix(users, user_ids, field):
+    """(users x vocab) CSR multi-hot of a list field, rows in `user_ids` order."""
+    vocab = {}
+    rows, cols = [], []
+    for r, uid in enumerate(user_ids):
+        values = {str(v).strip().lower() for v in users[uid].get(field) or [] if str(v).strip()}
+        for value in values:
+            rows.append(r)
+            cols.append(vocab.setdefault(value, len(vocab)))
+    return sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                         shape=(len(user_ids), max(len(vocab), 1)))
+
+
+def _shared(features, a, b):
+    """Number of features rows `a[i]` and `b[i]` have in common, for every pair i."""
+    return np.asarray(features[a].multiply(features[b]).sum(axis=1)).ravel()
+
+
+def rank_block(start, mutual, features, size=SUGGESTIONS_SIZE):
+    """Score a block of the 2-hop matrix; yield (row, cols, mutual, scores) best first.
+
+    `mutual` is the CSR block for rows start.. from iter_extended();
+    `features` maps a FEATURE_FIELDS name to its multi-hot matrix.
+    """
+    counts = np.diff(mutual.indptr)
+    rows = np.repeat(np.arange(mutual.shape[0], dtype=np.int64), counts)
+    cols = mutual.indices.astype(np.int64)
+    m = mutual.data.astype(np.float64)
+    boost = (1.0 + W_INTERESTS * _shared(features["interests"], start + rows, cols)
+             + W_SKILLS * _shared(features["skillsNeeded"], start + rows, cols))
+    scores = m * boost
+
+    # Row ascending, then score descending, ties by column (ID order).
+    order = np.lexsort((cols, -scores, rows))
+    rank = np.arange(len(order)) - mutual.indptr[rows[order]]
+    keep = order[rank < size]
+    bounds = np.searchsorted(rows[keep], np.arange(mutual.shape[0] + 1))
+    for r in range(mutual.shape[0]):
+        picked = keep[bounds[r]:bounds[r + 1]]
+        yield start + r, cols[picked], mutual.data[picked], scores[picked]
+
+
+def build_suggestions(db, size=SUGGESTIONS_SIZE, block_rows=EXTENDED_BLOCK_ROWS):
+    started = time.perf_counter()
+    users = load_users(db)
+    graph = build_graph(users)
+    user_ids = graph.user_ids
+    features = {field: feature_matrix(users, user_ids, field) for field in FEATURE_FIELDS}
+    print(f"📥 Loaded {len(users)} users with {graph.adjacency.nnz // 2} connections")
+
+    written = unchanged = 0
+    with BatchWriter(db) as writer:
+        for start, mutual in graph.iter_extended(block_rows=block_rows):
+            for row, cols, counts, scores in rank_block(start, mutual, features, size):
+                uid = user_ids[row]
+                suggestions = [{"userId": other, "mutual": int(n), "score": round(float(s), 4)}
+                               for other, n, s in zip(user_ids[cols].tolist(), counts, scores)]
+                if suggestions == users[uid].get("suggestions", []):
+                    unchanged += 1
+                    continue
+                writer.update(db.collection("users").document(uid), {"suggestions": suggestions})
+                written += 1
+
+    print(f"✅ Updated suggestions for {written} users ({unchanged} unchanged) in "
+          f"{time.perf_counter() - started:.2f}s ({writer.summary()})")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=SUGGESTIONS_SIZE, help="suggestions kept per user")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    db = client_from_args(args)
+    build_suggestions(db, args.size)
@@ -0,0 +1,135 @@
+"""
+Array-backed connection graph for seeding `connections` / `extendedConnections`.
+
+User IDs are mapped to integer indices (in lexicographic ID order, so
+sorted index rows are already sorted ID lists) and direct connections
+are stored as a symmetric CSR adjacency matrix. The 2-hop set is
+computed as A·A with the direct neighbours and the user itself masked
+out, one block of rows at a time so memory stays bounded on dense graphs.
+
+Building the graph is cheap; the 2-hop pass costs time in proportion to
+the entries it produces (roughly 0.15 µs each on one core). With 1M
+users, 10M random undirected edges take ~2.5s in from_edges, but they
+yield ~400M 2-hop entries and about a minute in iter_extended.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+EXTENDED_BLOCK_ROWS = 50_000
+
+
+def connection_fields(direct, extended):
+    """The derived user-document fields written for a user's connection sets."""
+    return {
+        "connections": direct,
+        "extendedConnections": extended,
+        "extended": extended,
+        "connectionsGraph": {
+            "direct": direct,
+            "extended": extended
+        }
+    }
+
+
+class ConnectionGraph:
+    def __init__(self, user_ids, adjacency):
+        self.user_ids = user_ids            # numpy object array, sorted
+        self.adjacency = adjacency          # symmetric CSR, int32 ones, no diagonal
+
+    @classmethod
+    def from_edges(cls, user_ids, src, dst):
+        """Build the graph from directed "u interacted with v" edges.
+
+        `src` / `dst` index into `user_ids`. Edges are symmetrised,
+        deduplicated and self-loops dropped, matching the set semantics of
+        the original dict-of-sets builder.
+        """
+        ids = np.asarray(user_ids, dtype=object)
+        order = np.argsort(ids.astype(str), kind="stable")
+        relabel = np.empty(len(ids), dtype=np.int64)
+        relabel[order] = np.arange(len(ids))
+
+        src = relabel[np.asarray(src, dtype=np.int64)]
+        dst = relabel[np.asarray(dst, dtype=np.int64)]
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+
+        n = len(ids)
+        rows = np.concatenate([src, dst])
+        cols = np.concatenate([dst, src])
+        adjacency = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n, n))
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1
+        adjacency.sort_indices()
+        return cls(ids[order], adjacency)
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def iter_extended(self, max_extended=None, block_rows=EXTENDED_BLOCK_ROWS):
+        """Yield (first_row, block) where block is the CSR 2-hop matrix for those rows.
+
+        Entries hold the number of mutual connections. With `max_extended`,
+        each row keeps only its `max_extended` candidates with the most
+        mutual connections (ties broken by ID order).
+        """
+        n = len(self)
+        for start in range(0, n, block_rows):
+            stop = min(n, start + block_rows)
+            yield start, self._two_hop(slice(start, stop), np.arange(start, stop), max_extended)
+
+    def _two_hop(self, rows, row_ids, max_extended=None):
+        a = self.adjacency
+        block = a[rows]
+        two_hop = (block @ a).tocsr()
+        # Drop direct neighbours and the user itself.
+        exclude = block + sp.csr_matrix(
+            (np.ones(len(row_ids), dtype=np.int32), (np.arange(len(row_ids)), row_ids)),
+            shape=block.shape,
+        )
+        two_hop = two_hop - two_hop.multiply(exclude > 0)
+        two_hop.eliminate_zeros()
+        if max_extended is not None:
+            two_hop = _cap_rows(two_hop, max_extended)
+        two_hop.sort_indices()
+        return two_hop
+
+    def iter_user_connections(self, max_extended=None, block_rows=EXTENDED_BLOCK_ROWS):
+        """Yield (user_id, direct_ids, extended_ids) with both lists sorted by ID."""
+        a = self.adjacency
+        for start, block in self.iter_extended(max_extended, block_rows):
+            for r in range(block.shape[0]):
+                i = start + r
+                direct = self.user_ids[a.indices[a.indptr[i]:a.indptr[i + 1]]].tolist()
+                extended = self.user_ids[block.indices[block.indptr[r]:block.indptr[r + 1]]].tolist()
+                yield self.user_ids[i], direct, extended
+
+    def connections_for(self, user_ids, max_extended=None):
+        """Yield (user_id, direct_ids, extended_ids) for just `user_ids`, in the order given.
+
+        Used by sharded seeding, where each worker derives the fields for
+        its own range of users from the shared graph.
+        """
+        rows = np.searchsorted(self.user_ids, np.asarray(user_ids, dtype=object))
+        block = self._two_hop(rows, rows, max_extended)
+        a = self.adjacency
+        for r, i in enumerate(rows):
+            direct = self.user_ids[a.indices[a.indptr[i]:a.indptr[i + 1]]].tolist()
+            extended = self.user_ids[block.indices[block.indptr[r]:block.indptr[r + 1]]].tolist()
+            yield self.user_ids[i], direct, extended
+
+
+def _cap_rows(matrix, cap):
+    """Keep the `cap` largest entries of each CSR row (ties broken by column)."""
+    counts = np.diff(matrix.indptr)
+    if counts.size == 0 or counts.max() <= cap:
+        return matrix
+    matrix.sort_indices()
+    rows = np.repeat(np.arange(matrix.shape[0], dtype=np.int64), counts)
+    # One stable int64 sort: row ascending, then mutual count descending.
+    top = int(matrix.data.max()) + 1
+    order = np.argsort(rows * top + (top - 1 - matrix.data), kind="stable")
+    rank = np.arange(len(order)) - matrix.indptr[rows[order]]
+    keep = order[rank < cap]
+    return sp.csr_matrix((matrix.data[keep], (rows[keep], matrix.indices[keep])), shape=matrix.shape)
@@ -0,0 +1,253 @@
+"""
+Keep `connections` / `extendedConnections` current as users like and pass.
+
+The app only appends to `liked`, `likedPosts` and `dismissedPosts`
+(swipe-full.tsx, search-projects.tsx); nothing recomputes the derived
+connection fields after seeding. This process listens to the `users` and
+`posts` collections (works the same against the emulator when
+FIRESTORE_EMULATOR_HOST is set), keeps the interaction graph in memory,
+and keeps, per user, the number of mutual connections with every 2-hop
+user. An edge a–b appearing or disappearing only changes the counts
+along the paths through it:
+
+    for x in neighbours(a) - {b}:  mutual[x][b] ±= 1, mutual[b][x] ±= 1
+    for x in neighbours(b) - {a}:  mutual[x][a] ±= 1, mutual[a][x] ±= 1
+
+so a like costs O(degree), and only users whose direct set or 2-hop set
+(with --max-extended: 2-hop counts) changed are rebuilt. Documents whose
+derived fields are unchanged are not written back.
+
+Usage (from generate/):
+    python connection_maintainer.py            # listen until Ctrl-C
+    python connection_maintainer.py --once     # reconcile every user, then exit
+"""
+
+import argparse
+import threading
+from collections import Counter, defaultdict
+
+from batch_writer import BatchWriter
+from connection_graph import connection_fields
+from firestore_client import add_client_arguments, client_from_args
+from scanner import scan
+
+# Fields holding user IDs the user interacted with.
+USER_INTERACTION_FIELDS = ("liked", "likedUsers", "passedUsers")
+# Fields holding post IDs; the interaction is with the post's author.
+POST_INTERACTION_FIELDS = ("likedPosts", "passedPosts", "dismissedPosts")
+
+
+class ConnectionMaintainer:
+    def __init__(self, db, max_extended=None):
+        self.db = db
+        self.max_extended = max_extended
+        self.writer = BatchWriter(db)
+        self.exists = set()
+        self.out = defaultdict(set)        # uid -> users they interacted with
+        self.inc = defaultdict(set)        # uid -> users who interacted with them
+        self.adj = defaultdict(set)        # uid -> direct connections (both users exist)
+        self.mutual = defaultdict(Counter) # uid -> {2-hop uid: mutual connections}, zero counts dropped
+        self.post_refs = {}                # uid -> post IDs they interacted with
+        self.post_author = {}
+        self.waiting_on_post = defaultdict(set)  # post ID -> users whose edge needs its author
+        self.stored = {}                   # uid -> (connections, extendedConnections) as last seen
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    # -- graph ------------------------------------------------------------
+
+    def neighbours(self, uid):
+        return set(self.adj[uid])
+
+    def extended(self, uid):
+        direct = self.adj[uid]
+        counts = {v: n for v, n in self.mutual[uid].items() if v not in direct}
+        if self.max_extended is not None and len(counts) > self.max_extended:
+            ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:self.max_extended]
+            return sorted(v for v, _ in ranked)
+        return sorted(counts)
+
+    def _bump(self, x, y, delta, dirty):
+        counts = self.mutual[x]
+        counts[y] += delta
+        if not counts[y]:
+            del counts[y]
+            dirty.add(x)
+        elif (delta > 0 and counts[y] == 1) or self.max_extended is not None:
+            dirty.add(x)
+
+    def _sync_edge(self, a, b, dirty):
+        """Make the a–b edge match out/inc/exists, updating mutual counts by the delta."""
+        want = (a != b and a in self.exists and b in self.exists
+                and (b in self.out[a] or a in self.out[b]))
+        if want == (b in self.adj[a]):
+            return
+        delta = 1 if want else -1
+        if not want:
+            self.adj[a].discard(b)
+            self.adj[b].discard(a)
+        for x, y in ((a, b), (b, a)):
+            for v in self.adj[x]:
+                if v != y:
+                    self._bump(v, y, delta, dirty)
+                    self._bump(y, v, delta, dirty)
+        if want:
+            self.adj[a].add(b)
+            self.adj[b].add(a)
+        dirty.update((a, b))
+
+    def _targets(self, uid, data):
+        targets = set()
+        for field in USER_INTERACTION_FIELDS:
+            targets.update(data.get(field) or [])
+        posts = set()
+        for field in POST_INTERACTION_FIELDS:
+            posts.update(data.get(field) or [])
+        for pid in posts:
+            author = self.post_author.get(pid)
+            if author is None:
+                self.waiting_on_post[pid].add(uid)
+            else:
+                targets.add(author)
+        return targets, posts
+
+    # -- change handling --------------------------------------------------
+
+    def apply_post(self, post_id, data):
+        """Record a post's author; returns the users that were waiting on it."""
+        if data is None or not data.get("authorId"):
+            return set()
+        self.post_author[post_id] = data["authorId"]
+        return self.waiting_on_post.pop(post_id, set())
+
+    def apply_user(self, uid, data):
+        """Apply one user document change (None = deleted); returns the dirty user set."""
+        was_present = uid in self.exists
+
+        if data is None:
+            self.exists.discard(uid)
+            self.stored.pop(uid, None)
+            targets, posts = set(), set()
+        else:
+            self.exists.add(uid)
+            self.stored[uid] = (data.get("connections") or [], data.get("extendedConnections") or [])
+            targets, posts = self._targets(uid, data)
+        self.post_refs[uid] = posts
+
+        added = targets - self.out[uid]
+        removed = self.out[uid] - targets
+        for v in added:
+            self.inc[v].add(uid)
+        for v in removed:
+            self.inc[v].discard(uid)
+        self.out[uid] = targets
+
+        touched = added | removed
+        if was_present != (data is not None):
+            # Appearing or disappearing toggles every edge the user has.
+            touched |= self.out[uid] | self.inc[uid]
+        # The stored fields may be stale even if the graph is not, so the user is always rechecked.
+        dirty = {uid} if data is not None else set()
+        for v in touched:
+            self._sync_edge(uid, v, dirty)
+        return dirty
+
+    def apply_user_targets(self, uid, extra_targets):
+        """Add edges discovered late (a liked post whose author arrived after the like)."""
+        added = extra_targets - self.out[uid]
+        if not added:
+            return set()
+        for v in added:
+            self.inc[v].add(uid)
+        self.out[uid] |= added
+        dirty = set()
+        for v in added:
+            self._sync_edge(uid, v, dirty)
+        return dirty
+
+    def refresh(self, dirty):
+        """Recompute derived fields for `dirty` users and queue writes for the ones that changed."""
+        for uid in dirty:
+            if uid not in self.exists:
+                continue
+            direct = sorted(self.neighbours(uid))
+            extended = self.extended(uid)
+            if self.stored.get(uid) == (direct, extended):
+                continue
+            self.stored[uid] = (direct, extended)
+            self.writer.update(self.db.collection("users").document(uid), connection_fields(direct, extended))
+            self.writes += 1
+        self.writer.flush()
+
+    # -- listeners --------------------------------------------------------
+
+    def on_posts(self, _snapshot, changes, _read_time):
+        with self._lock:
+            dirty = set()
+            for change in changes:
+                doc = change.document
+                waiting = self.apply_post(doc.id, None if change.type.name == "REMOVED" else doc.to_dict())
+                for uid in waiting:
+                    if uid in self.exists:
+                        # Re-resolve the user's post references now that this author is known.
+                        targets, _ = self._targets(uid, {"likedPosts": list(self.post_refs.get(uid, ()))})
+                        dirty |= self.apply_user_targets(uid, targets)
+            if dirty:
+                self.refresh(dirty)
+
+    def on_users(self, _snapshot, changes, _read_time):
+        with self._lock:
+            dirty = set()
+            for change in changes:
+                doc = change.document
+                dirty |= self.apply_user(doc.id, None if change.type.name == "REMOVED" else doc.to_dict())
+            if dirty:
+                self.refresh(dirty)
+            print(f"🔄 {len(changes)} user change(s) → {len(dirty)} recomputed, {self.writes} writes so far")
+
+    def load(self):
+        """Read both collections once and reconcile every user."""
+        for doc in scan(self.db.collection("posts"), fields=["authorId"]):
+            self.apply_post(doc.id, doc.to_dict())
+        for doc in scan(self.db.collection("users")):
+            self.apply_user(doc.id, doc.to_dict())
+        self.refresh(set(self.exists))
+        print(f"✅ Reconciled {len(self.exists)} users ({self.writes} writes)")
+
+    def listen(self):
+        """Subscribe to posts and users; the initial snapshot reconciles everything."""
+        return [
+            self.db.collection("posts").on_snapshot(self.on_posts),
+            self.db.collection("users").on_snapshot(self.on_users),
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="reconcile all users and exit instead of listening")
+    parser.add_argument("--max-extended", type=int, default=None)
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    db = client_from_args(args)
+
+    maintainer = ConnectionMaintainer(db, args.max_extended)
+    if args.once:
+        maintainer.load()
+        maintainer.writer.close()
+        return
+
+    watches = maintainer.listen()
+    print("👂 Listening for user changes (Ctrl-C to stop)...")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for watch in watches:
+            watch.unsubscribe()
+        maintainer.writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,255 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-
-SERVICE_ACCOUNT_KEY = "serviceAccountKey.json"
-
-cred = credentials.Certificate(SERVICE_ACCOUNT_KEY)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
-
 """
-This script deletes dummy users and their posts.
+This script deletes dummy users, their posts and the events they host,
+and scrubs every reference to them from the documents that remain.
 
-Previously, dummy users were assumed to have IDs that start with
-"dummyUser", but our data used IDs derived from names like
-"cathy_wright", "alice_johnson", etc. We now detect dummy users by
-matching against the set of expected IDs generated from the same
-SAMPLE_NAMES list used to create them, while still supporting the old
+Dummy users are recognised by ID alone: any ID the population generator
+can produce for some seed ("cathy_wright_<tag>" for the SAMPLE_NAMES
+users, "first_last_<index>_<tag>" past them, where <tag> is derived from
+the seed), the untagged SAMPLE_NAMES IDs older seeders wrote, and the old
 "dummyUser" prefix as a fallback.
+
+The work is set-based rather than per user:
+  1. one keys-only scan of `users` finds the dummy IDs,
+  2. their posts are resolved with chunked `authorId in [...]` queries,
+     WORKERS of them in flight at a time,
+  3. one partitioned, paginated pass (scanner.scan) over each of `users`,
+     `posts` and `events` deletes the dummy documents and issues a single
+     merged update per document that still references a dummy user or post;
+     deleted posts are dropped from `searchIndex` (search_index.reindex_posts)
+     as they go, if an index has been built, and the surviving events are
+     re-digested into `eventDigests` if digests exist,
+  4. one pass over `userFeeds` deletes the dummy users' feeds and drops
+     deleted posts from the others (build_feeds.py refills them),
+with every write going through BatchWriter (500-op commits, in parallel).
+
+With --manifest (written by `add_dummy_users.py --resumable`), exactly the
+users, posts and events listed for that one seed run are removed instead:
+steps 1 and 2 are skipped and documents that merely look generated are
+left alone.
 """
 
-SAMPLE_NAMES = [
-    "Alice Johnson", "Bob Smith", "Carol Williams", "David Brown", "Eva Davis",
-    "Frank Miller", "Grace Wilson", "Hank Moore", "Ivy Taylor", "Jack Anderson",
-    "Kara Thomas", "Liam Jackson", "Mia White", "Noah Harris", "Olivia Martin",
-    "Paul Thompson", "Quinn Garcia", "Rachel Martinez", "Sam Robinson", "Tina Clark",
-    "Uma Rodriguez", "Victor Lewis", "Wendy Lee", "Xander Walker", "Yara Hall",
-    "Zane Allen", "Amy Young", "Ben King", "Cathy Wright", "Derek Scott",
-    "Ella Green", "Fred Adams", "Gina Baker", "Harry Nelson", "Isla Carter",
-    "Jake Mitchell", "Kylie Perez", "Leo Roberts", "Maya Turner", "Nate Phillips",
-    "Opal Campbell", "Pete Parker", "Queen Simmons", "Ray Evans", "Sara Edwards",
-    "Tom Collins", "Ursula Stewart", "Vince Morris", "Will Rogers", "Xenia Reed",
-    "Yusuf Cook", "Zara Morgan", "Aaron Bell", "Bella Murphy", "Caleb Bailey",
-    "Diana Rivera", "Ethan Cooper", "Fiona Richardson", "Gabe Cox", "Holly Howard",
-    "Ian Ward", "Jade Brooks", "Kyle Bennett", "Lara Gray", "Mark James",
-    "Nina Watson", "Owen Brooks", "Penny Kelly", "Quincy Sanders", "Rose Price"
-]
-
-NUM_USERS = 70
-
-def _expected_dummy_ids():
-    """Generate the set of expected dummy user IDs from SAMPLE_NAMES."""
-    ids = set()
-    for name in SAMPLE_NAMES[:NUM_USERS]:
-        ids.add(name.lower().replace(" ", "_"))
-    return ids
-
-def delete_dummy_users_and_posts():
-    print("🗑️ Deleting dummy users and their posts...")
-
-    users_ref = db.collection("users").stream()
-    expected_ids = _expected_dummy_ids()
-
-    dummy_user_ids = [u.id for u in users_ref if (u.id in expected_ids or u.id.startswith("dummyUser"))]
-
-    if not dummy_user_ids:
-        print("ℹ️ No dummy users found.")
-        return
-
-    for user_id in dummy_user_ids:
-        posts = db.collection("posts").where("authorId", "==", user_id).stream()
-        for post in posts:
-            db.collection("posts").document(post.id).delete()
-            print(f"Deleted post {post.id} from {user_id}")
-
-    all_users = db.collection("users").stream()
-    for user in all_users:
-        user_doc = db.collection("users").document(user.id)
-        data = user.to_dict()
-        if "connections" in data:
-            updated_connections = [uid for uid in data["connections"] if uid not in dummy_user_ids]
-            if updated_connections != data["connections"]:
-                user_doc.update({"connections": updated_connections})
-                print(f"🔗 Updated connections for {user.id}, removed dummy users")
-
-    for user_id in dummy_user_ids:
-        db.collection("users").document(user_id).delete()
-        print(f"Deleted user {user_id}")
-
-    print(f"\nFinished deleting {len(dummy_user_ids)} dummy users and their posts.")
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_writer import BatchWriter
+from build_feeds import FEEDS_COLLECTION
+from event_digest import DIGEST_COLLECTION, SUMMARY_DOC, EventDigest, replace_documents
+from firestore_client import add_client_arguments, client_from_args
+from instrumentation import InstrumentedClient, Metrics, Progress
+from population import is_generated_user_id
+from scanner import WORKERS, scan
+from search_index import INDEX_COLLECTION, STATS_DOC, reindex_posts
+from seed_run import read_manifest
+
+
+IN_QUERY_LIMIT = 30      # Firestore cap on values in an `in` filter
+UNINDEX_CHUNK = 5_000    # deleted posts handed to search_index.reindex_posts at a time
+
+# user-document fields holding user IDs / post IDs
+USER_REF_FIELDS = ("connections", "extendedConnections", "extended", "likedUsers", "passedUsers", "liked")
+USER_POST_REF_FIELDS = ("likedPosts", "passedPosts", "dismissedPosts")
+# post-document fields holding user IDs
+POST_REF_FIELDS = ("likedBy", "passedBy")
+# event-document fields holding user IDs
+EVENT_REF_FIELDS = ("rsvps",)
+
+def is_dummy_user_id(user_id):
+    return is_generated_user_id(user_id) or user_id.startswith("dummyUser")
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _posts_by(db, author_ids):
+    query = db.collection("posts").where("authorId", "in", author_ids).select([])
+    return [doc.id for doc in query.stream()]
+
+def find_dummy_posts(db, dummy_user_ids, workers=WORKERS):
+    """Post IDs authored by any of `dummy_user_ids`, via chunked `in` queries run in parallel."""
+    post_ids = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ids in pool.map(lambda chunk: _posts_by(db, chunk), _chunks(sorted(dummy_user_ids), IN_QUERY_LIMIT)):
+            post_ids.update(ids)
+    return post_ids
+
+def _scrub(data, fields, dead):
+    """Return {field: filtered list} for every list field that references something in `dead`."""
+    changes = {}
+    for field in fields:
+        values = data.get(field)
+        if isinstance(values, list) and any(v in dead for v in values):
+            changes[field] = [v for v in values if v not in dead]
+    return changes
+
+def _scrub_connections_graph(data, dead):
+    graph = data.get("connectionsGraph")
+    if not isinstance(graph, dict):
+        return {}
+    scrubbed = _scrub(graph, ("direct", "extended"), dead)
+    if not scrubbed:
+        return {}
+    return {"connectionsGraph": {**graph, **scrubbed}}
+
+def _scrub_suggestions(data, dead):
+    suggestions = data.get("suggestions")
+    if not isinstance(suggestions, list) or not any(s.get("userId") in dead for s in suggestions):
+        return {}
+    return {"suggestions": [s for s in suggestions if s.get("userId") not in dead]}
+
+def _scrub_feed(data, dead):
+    """Drop dead posts from a feed's parallel postIds / scores lists."""
+    post_ids = data.get("postIds")
+    if not isinstance(post_ids, list) or not any(pid in dead for pid in post_ids):
+        return {}
+    scores = data.get("scores") or []
+    keep = [i for i, pid in enumerate(post_ids) if pid not in dead]
+    return {"postIds": [post_ids[i] for i in keep], "scores": [scores[i] for i in keep if i < len(scores)]}
+
+def delete_dummy_users_and_posts(db, dry_run=False, report_path=None, progress=True, manifest=None):
+    metrics = getattr(db, "metrics", None) or Metrics()
+    print("🗑️ Deleting dummy users and their posts..." + (" (dry run)" if dry_run else ""))
+    counts = {"users_deleted": 0, "posts_deleted": 0, "events_deleted": 0,
+              "users_scrubbed": 0, "posts_scrubbed": 0, "events_scrubbed": 0,
+              "feeds_deleted": 0, "feeds_scrubbed": 0, "posts_unindexed": 0}
+
+    if manifest:
+        run, dummy_user_ids, dummy_post_ids, dummy_event_ids = read_manifest(manifest)
+        is_dummy_author = dummy_user_ids.__contains__
+        print(f"Manifest {manifest} lists {len(dummy_user_ids)} users, {len(dummy_post_ids)} posts and "
+              f"{len(dummy_event_ids)} events (run {run})")
+    else:
+        with metrics.phase("find dummies"):
+            dummy_user_ids = {
+                doc.id for doc in scan(db.collection("users"), fields=[])
+                if is_dummy_user_id(doc.id)
+            }
+        if not dummy_user_ids:
+            print("ℹ️ No dummy users found.")
+            return counts
+
+        with metrics.phase("find dummy posts"):
+            dummy_post_ids = find_dummy_posts(db, dummy_user_ids)
+        dummy_event_ids = set()
+        is_dummy_author = is_dummy_user_id
+        print(f"Found {len(dummy_user_ids)} dummy users and {len(dummy_post_ids)} dummy posts")
+
+    writer = BatchWriter(db)
+
+    with metrics.phase("users pass"), Progress("users scanned", enabled=progress) as bar:
+        for doc in scan(db.collection("users")):
+            bar.advance()
+            ref = db.collection("users").document(doc.id)
+            if doc.id in dummy_user_ids:
+                counts["users_deleted"] += 1
+                if not dry_run:
+                    writer.delete(ref)
+                continue
+            data = doc.to_dict() or {}
+            changes = _scrub(data, USER_REF_FIELDS, dummy_user_ids)
+            changes.update(_scrub(data, USER_POST_REF_FIELDS, dummy_post_ids))
+            changes.update(_scrub_connections_graph(data, dummy_user_ids))
+            changes.update(_scrub_suggestions(data, dummy_user_ids))
+            if changes:
+                counts["users_scrubbed"] += 1
+                if not dry_run:
+                    writer.update(ref, changes)
+
+    deleted_post_ids = set(dummy_post_ids)
+    indexed = not dry_run and db.collection(INDEX_COLLECTION).document(STATS_DOC).get().exists
+    unindex = {}  # postId -> {"searchTokens": [...]} of deleted posts still in searchIndex
+
+    def flush_unindex():
+        counts["posts_unindexed"] += reindex_posts(db, unindex, writer, removed=set(unindex))
+        unindex.clear()
+
+    with metrics.phase("posts pass"), Progress("posts scanned", enabled=progress) as bar:
+        for doc in scan(db.collection("posts")):
+            bar.advance()
+            ref = db.collection("posts").document(doc.id)
+            data = doc.to_dict() or {}
+            if doc.id in dummy_post_ids or is_dummy_author(data.get("authorId") or ""):
+                counts["posts_deleted"] += 1
+                deleted_post_ids.add(doc.id)
+                if not dry_run:
+                    writer.delete(ref)
+                if indexed and data.get("searchTokens"):
+                    unindex[doc.id] = {"searchTokens": data["searchTokens"]}
+                    if len(unindex) >= UNINDEX_CHUNK:
+                        flush_unindex()
+                continue
+            changes = _scrub(data, POST_REF_FIELDS, dummy_user_ids)
+            if changes:
+                counts["posts_scrubbed"] += 1
+                if not dry_run:
+                    writer.update(ref, changes)
+        if unindex:
+            flush_unindex()
+
+    # The digests keep no per-event state to patch, so rebuild them from the surviving events.
+    digested = not dry_run and db.collection(DIGEST_COLLECTION).document(SUMMARY_DOC).get().exists
+    digest = EventDigest() if digested else None
+    with metrics.phase("events pass"), Progress("events scanned", enabled=progress) as bar:
+        for doc in scan(db.collection("events")):
+            bar.advance()
+            ref = db.collection("events").document(doc.id)
+            data = doc.to_dict() or {}
+            if doc.id in dummy_event_ids or is_dummy_author(data.get("creatorId") or ""):
+                counts["events_deleted"] += 1
+                if not dry_run:
+                    writer.delete(ref)
+                continue
+            if digest is not None:
+                digest.apply(doc.id, data)
+            changes = _scrub(data, EVENT_REF_FIELDS, dummy_user_ids)
+            if changes:
+                counts["events_scrubbed"] += 1
+                if not dry_run:
+                    writer.update(ref, changes)
+        if digest is not None and counts["events_deleted"]:
+            replace_documents(db, digest, writer)
+            print(f"🗓️ Re-digested the {len(digest.events)} remaining events into {DIGEST_COLLECTION}")
+
+    with metrics.phase("feeds pass"), Progress("feeds scanned", enabled=progress) as bar:
+        for doc in scan(db.collection(FEEDS_COLLECTION), fields=["postIds", "scores"]):
+            bar.advance()
+            ref = db.collection(FEEDS_COLLECTION).document(doc.id)
+            if doc.id in dummy_user_ids or is_dummy_author(doc.id):
+                counts["feeds_deleted"] += 1
+                if not dry_run:
+                    writer.delete(ref)
+                continue
+            changes = _scrub_feed(doc.to_dict() or {}, deleted_post_ids)
+            if changes:
+                counts["feeds_scrubbed"] += 1
+                if not dry_run:
+                    writer.update(ref, changes)
+
+    with metrics.phase("flush"):
+        writer.close()
+    verb = "Would delete" if dry_run else "Deleted"
+    print(f"\n{verb} {counts['users_deleted']} dummy users, {counts['posts_deleted']} posts and "
+          f"{counts['events_deleted']} events; {'would scrub' if dry_run else 'scrubbed'} references from "
+          f"{counts['users_scrubbed']} users, {counts['posts_scrubbed']} posts and {counts['events_scrubbed']} events; "
+          f"{counts['feeds_deleted']} feeds {'would be' if dry_run else 'were'} removed and {counts['feeds_scrubbed']} trimmed.")
+    if counts["posts_unindexed"]:
+        print(f"🔎 Dropped {counts['posts_unindexed']} deleted posts from {INDEX_COLLECTION}")
+    if not dry_run:
+        print(f"✅ {writer.summary()}")
+    print(f"📊 {metrics.summary()}")
+    if report_path:
+        metrics.write_report(report_path, job="delete", dryRun=dry_run, manifest=manifest, counts=counts,
+                             writer=writer.stats())
+        print(f"📝 Run report written to {report_path}")
+    return counts
 
 if __name__ == "__main__":
-    delete_dummy_users_and_posts()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help="delete exactly the users/posts/events listed in a seed run's ID manifest")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON run report (RPCs, latencies, phases)")
+    parser.add_argument("--no-progress", action="store_true", help="don't draw progress lines")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+    delete_dummy_users_and_posts(InstrumentedClient(client_from_args(args)), args.dry_run, args.report,
+                                 not args.no_progress, args.manifest)
@@ -0,0 +1,365 @@
+"""
+Materialize small digest documents over the `events` collection.
+
+ChatbotService.getAllEvents() reads every event and getEventsByType /
+getEventsNearLocation filter the result on the device; map.tsx also
+subscribes to the whole collection. This job compacts events into a few
+documents under `eventDigests/` instead:
+
+    summary            {"total", "byType": [{"eventType", "count"}, ...],
+                        "cells", "cellPrecision",
+                        "recent": [...], "recentText": "...", "updatedAt"}
+    cell~<geohash>     one per CELL_PRECISION geohash cell holding events:
+                       {"cell", "count", "byType", "center",
+                        "recent": [...], "recentText": "..."}
+
+`recent` holds the newest RECENT_EVENTS (CELL_RECENT_EVENTS per cell)
+events as {"id", "eventType", "numPeople", "location", "createdAt"}, and
+`recentText` is the same list already formatted the way
+formatEventsForAI() does it ("Event: ..., People: ..., Location: (lat, lon)"
+per line). Event types are counted case- and whitespace-insensitively,
+the same way getEventsByType() compares them.
+
+A chatbot request reads `summary`, plus the cell documents covering a
+point (geohash.cover_circle at CELL_PRECISION, usually 1-4 cells) for
+"near me" questions, instead of the whole event history.
+
+    python event_digest.py --rebuild               # one full pass
+    python event_digest.py --rebuild --every 300   # periodic full passes
+    python event_digest.py --listen                # incremental, from a snapshot listener
+"""
+
+import argparse
+import heapq
+import threading
+import time
+from collections import Counter
+
+from batch_writer import BatchWriter
+from firestore_client import add_client_arguments, client_from_args
+from geohash import encode, location_of
+from scanner import scan
+
+DIGEST_COLLECTION = "eventDigests"
+SUMMARY_DOC = "summary"
+CELL_PREFIX = "cell~"
+CELL_PRECISION = 4           # ~39 x 20 km cells; a 10 km radius touches a handful
+RECENT_EVENTS = 50
+CELL_RECENT_EVENTS = 20
+NO_EVENTS_TEXT = "No events found."
+
+EVENT_FIELDS = ["eventType", "numPeople", "location", "locationGeo", "createdAt"]
+
+
+def _js_number(value):
+    """Render a number the way a JS template literal does (40.0 -> "40")."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def format_event(event):
+    """One formatEventsForAI() line for a digest event record."""
+    location = event.get("location")
+    where = f"({_js_number(location['latitude'])}, {_js_number(location['longitude'])})" if location else "unknown"
+    return f"Event: {event.get('eventType')}, People: {event.get('numPeople')}, Location: {where}"
+
+
+def format_events(events):
+    if not events:
+        return NO_EVENTS_TEXT
+    return "\n".join(format_event(event) for event in events)
+
+
+def type_key(event_type):
+    return " ".join(str(event_type or "").lower().split()) or "unknown"
+
+
+def _created_s(value):
+    if isinstance(value, (int, float)):
+        return value / 1000.0  # epoch milliseconds
+    if hasattr(value, "timestamp"):
+        return value.timestamp()
+    return 0.0
+
+
+def _by_type(counts):
+    return [{"eventType": key, "count": n} for key, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+
+class _Entry:
+    __slots__ = ("created", "event_id")
+
+    def __init__(self, created, event_id):
+        self.created = created
+        self.event_id = event_id
+
+    def __lt__(self, other):
+        # "Older" sorts first: older timestamp, or the same timestamp and a later ID.
+        return (self.created, other.event_id) < (other.created, self.event_id)
+
+
+class _NewestEvents:
+    """The newest `size` events of a changing set, without rescanning the set per change.
+
+    `members` always holds the newest len(members) events of the set, up
+    to 2 * size of them so that removals rarely run it dry; a min-heap
+    over them (oldest at the root, stale entries skipped lazily) decides
+    which member drops out when a newer event arrives. The set is only
+    rescanned when removals leave fewer than `size` members while other
+    events exist.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.capacity = 2 * size
+        self.members = {}            # event ID -> _Entry
+        self._heap = []
+        self.total = 0
+
+    def _oldest(self):
+        while self._heap and self.members.get(self._heap[0].event_id) is not self._heap[0]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _push(self, entry):
+        self.members[entry.event_id] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self.members) > self.capacity:
+            self._oldest()  # drop stale entries so the root is the oldest member
+            del self.members[heapq.heappop(self._heap).event_id]
+        if len(self._heap) > 2 * self.capacity:
+            self._heap = list(self.members.values())
+            heapq.heapify(self._heap)
+
+    def add(self, event_id, created):
+        entry = _Entry(created, event_id)
+        outside = self.total - len(self.members)
+        self.total += 1
+        oldest = self._oldest()
+        # Every non-member is older than every member, so a newcomer joins
+        # only if it beats the oldest member (or nothing is left outside).
+        if outside == 0 or (oldest is not None and oldest < entry):
+            self._push(entry)
+
+    def discard(self, event_id):
+        self.total -= 1
+        self.members.pop(event_id, None)
+
+    def newest(self, ids, created_of):
+        """IDs of the newest `size` events, newest first. `ids` is the whole set, read only for a rescan."""
+        if len(self.members) < min(self.size, self.total):
+            top = heapq.nsmallest(self.capacity, ids, key=lambda i: (-created_of(i), i))
+            self.members = {i: _Entry(created_of(i), i) for i in top}
+            self._heap = list(self.members.values())
+            heapq.heapify(self._heap)
+        return [e.event_id for e in sorted(self.members.values(), reverse=True)[:self.size]]
+
+
+class _Cell:
+    def __init__(self, recent_size):
+        self.ids = set()
+        self.newest = _NewestEvents(recent_size)
+        self.types = Counter()
+        self.lat_sum = 0.0
+        self.lon_sum = 0.0
+
+
+class EventDigest:
+    """In-memory aggregates over events; documents() yields the digest docs that changed."""
+
+    def __init__(self, recent_size=RECENT_EVENTS, cell_recent_size=CELL_RECENT_EVENTS, precision=CELL_PRECISION):
+        self.recent_size = recent_size
+        self.cell_recent_size = cell_recent_size
+        self.precision = precision
+        self.events = {}             # event ID -> (created_s, type key, cell, point, record)
+        self.types = Counter()
+        self.cells = {}              # geohash cell -> _Cell
+        self._newest = _NewestEvents(recent_size)
+        self._summary_dirty = True
+        self._dirty_cells = set()
+
+    def apply(self, event_id, data):
+        """Add, replace or (with `data=None`) remove one event."""
+        if event_id in self.events:
+            self._remove(event_id)
+        if data is not None:
+            self._add(event_id, data)
+        self._summary_dirty = True
+
+    def _add(self, event_id, data):
+        point = location_of(data)
+        created = _created_s(data.get("createdAt"))
+        key = type_key(data.get("eventType"))
+        record = {
+            "id": event_id,
+            "eventType": data.get("eventType"),
+            "numPeople": data.get("numPeople"),
+            "location": {"latitude": point[0], "longitude": point[1]} if point else None,
+            "createdAt": data.get("createdAt"),
+        }
+        cell = encode(point[0], point[1], self.precision) if point else None
+        self.events[event_id] = (created, key, cell, point, record)
+        self.types[key] += 1
+        self._newest.add(event_id, created)
+        if cell is not None:
+            entry = self.cells.setdefault(cell, _Cell(self.cell_recent_size))
+            entry.ids.add(event_id)
+            entry.newest.add(event_id, created)
+            entry.types[key] += 1
+            entry.lat_sum += point[0]
+            entry.lon_sum += point[1]
+            self._dirty_cells.add(cell)
+
+    def _remove(self, event_id):
+        _, key, cell, point, _ = self.events.pop(event_id)
+        self.types[key] -= 1
+        if not self.types[key]:
+            del self.types[key]
+        self._newest.discard(event_id)
+        if cell is not None:
+            entry = self.cells[cell]
+            entry.ids.discard(event_id)
+            entry.newest.discard(event_id)
+            entry.types[key] -= 1
+            if not entry.types[key]:
+                del entry.types[key]
+            entry.lat_sum -= point[0]
+            entry.lon_sum -= point[1]
+            self._dirty_cells.add(cell)
+
+    def _recent(self, newest, ids):
+        # Newest first; equal timestamps fall back to ID order so output is stable.
+        return [self.events[i][4] for i in newest.newest(ids, lambda i: self.events[i][0])]
+
+    def documents(self, now_ms=None):
+        """Yield (doc ID, data or None to delete) for every digest doc that changed since the last call."""
+        for cell in sorted(self._dirty_cells):
+            entry = self.cells[cell]
+            if not entry.ids:
+                del self.cells[cell]
+                yield f"{CELL_PREFIX}{cell}", None
+                continue
+            recent = self._recent(entry.newest, entry.ids)
+            yield f"{CELL_PREFIX}{cell}", {
+                "cell": cell,
+                "count": len(entry.ids),
+                "byType": _by_type(entry.types),
+                # Rounded so incremental sums (which drift in the last bits) match a rebuild.
+                "center": {"latitude": round(entry.lat_sum / len(entry.ids), 6),
+                           "longitude": round(entry.lon_sum / len(entry.ids), 6)},
+                "recent": recent,
+                "recentText": format_events(recent),
+            }
+        self._dirty_cells.clear()
+
+        if self._summary_dirty:
+            recent = self._recent(self._newest, self.events)
+            yield SUMMARY_DOC, {
+                "total": len(self.events),
+                "byType": _by_type(self.types),
+                "cells": len(self.cells),
+                "cellPrecision": self.precision,
+                "recent": recent,
+                "recentText": format_events(recent),
+                "updatedAt": now_ms if now_ms is not None else int(time.time() * 1000),
+            }
+            self._summary_dirty = False
+
+
+def write_documents(db, digest, writer):
+    """Queue the changed digest docs on `writer`; returns how many were written or deleted."""
+    digests = db.collection(DIGEST_COLLECTION)
+    count = 0
+    for doc_id, data in digest.documents():
+        if data is None:
+            writer.delete(digests.document(doc_id))
+        else:
+            writer.set(digests.document(doc_id), data)
+        count += 1
+    return count
+
+
+def replace_documents(db, digest, writer):
+    """Queue every digest doc of a freshly built `digest` and delete the cell
+    docs it no longer has; returns (written, stale cells removed)."""
+    stale = {doc.id for doc in scan(db.collection(DIGEST_COLLECTION), fields=[])
+             if doc.id.startswith(CELL_PREFIX) and doc.id[len(CELL_PREFIX):] not in digest.cells}
+    written = write_documents(db, digest, writer)
+    for doc_id in stale:
+        writer.delete(db.collection(DIGEST_COLLECTION).document(doc_id))
+    return written, len(stale)
+
+
+def rebuild(db):
+    """Recompute every digest from a full scan of `events` and drop stale cell docs."""
+    started = time.perf_counter()
+    digest = EventDigest()
+    for doc in scan(db.collection("events"), fields=EVENT_FIELDS):
+        digest.apply(doc.id, doc.to_dict() or {})
+    scanned = time.perf_counter() - started
+
+    with BatchWriter(db) as writer:
+        written, stale = replace_documents(db, digest, writer)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Digested {len(digest.events)} events into {written} docs ({len(digest.cells)} cells, "
+          f"{stale} stale cells removed) in {elapsed:.2f}s (scan {scanned:.2f}s, "
+          f"{len(digest.events) / elapsed if elapsed > 0 else 0:,.0f} events/sec)")
+    return digest
+
+
+def listen(db):
+    """Keep the digests current from an `events` snapshot listener.
+
+    The initial snapshot delivers every event as ADDED, so the first
+    callback writes a complete digest; after that only the summary and
+    the cells touched by a change are rewritten.
+    """
+    digest = EventDigest()
+    writer = BatchWriter(db)
+    lock = threading.Lock()
+
+    def on_events(_snapshot, changes, _read_time):
+        with lock:
+            for change in changes:
+                removed = change.type.name == "REMOVED"
+                digest.apply(change.document.id, None if removed else change.document.to_dict() or {})
+            written = write_documents(db, digest, writer)
+            writer.flush()
+            print(f"🔄 {len(changes)} event change(s) → {written} digest doc(s) rewritten")
+
+    return writer, db.collection("events").on_snapshot(on_events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rebuild", action="store_true", help="recompute all digests from the events collection")
+    mode.add_argument("--listen", action="store_true", help="update digests as events change (Ctrl-C to stop)")
+    parser.add_argument("--every", type=float, metavar="SECONDS", help="with --rebuild, repeat on this interval")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    db = client_from_args(args)
+
+    if args.rebuild:
+        while True:
+            rebuild(db)
+            if not args.every:
+                break
+            time.sleep(args.every)
+    else:
+        writer, watch = listen(db)
+        print("👂 Listening for event changes (Ctrl-C to stop)...")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watch.unsubscribe()
+            writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Pick the Firestore client the generate/ tools talk to.
+
+    firebase   the real project, via serviceAccountKey.json (the default)
+    emulator   the local emulator at FIRESTORE_EMULATOR_HOST; no credentials
+    memory     memory_firestore.MemoryFirestore, optionally with simulated
+               per-RPC latency; nothing leaves the process
+
+Scripts add the flags with `add_client_arguments(parser)` and build the
+client with `client_from_args(args)`, so nothing connects at import time
+and the same functions can be driven by bench_suite.py. The default
+backend can also come from TAVA_FIRESTORE_BACKEND.
+"""
+
+import os
+
+SERVICE_ACCOUNT_KEY = "serviceAccountKey.json"
+BACKENDS = ("firebase", "emulator", "memory")
+DEFAULT_EMULATOR_PROJECT = "demo-tava"
+
+
+def default_backend():
+    backend = os.environ.get("TAVA_FIRESTORE_BACKEND")
+    if backend:
+        return backend
+    return "emulator" if os.environ.get("FIRESTORE_EMULATOR_HOST") else "firebase"
+
+
+def get_client(backend="firebase", project=None, latency_ms=0.0, service_account_key=SERVICE_ACCOUNT_KEY):
+    if backend == "firebase":
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        try:
+            firebase_admin.get_app()
+        except ValueError:
+            firebase_admin.initialize_app(credentials.Certificate(service_account_key))
+        return firestore.client()
+    if backend == "emulator":
+        if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+            raise SystemExit("Set FIRESTORE_EMULATOR_HOST (e.g. localhost:8080) to use the emulator backend.")
+        from google.cloud import firestore as cloud_firestore
+
+        return cloud_firestore.Client(project=project or DEFAULT_EMULATOR_PROJECT)
+    if backend == "memory":
+        from memory_firestore import MemoryFirestore
+
+        return MemoryFirestore(latency_s=latency_ms / 1000.0, project=project or "memory")
+    raise ValueError(f"unknown backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def add_client_arguments(parser):
+    group = parser.add_argument_group("Firestore client")
+    group.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                       help="where to read and write (default: %(default)s)")
+    group.add_argument("--project", help="project ID for the emulator backend")
+    group.add_argument("--latency-ms", type=float, default=0.0,
+                       help="simulated per-RPC latency for the memory backend")
+    group.add_argument("--service-account-key", default=SERVICE_ACCOUNT_KEY,
+                       help="credentials file for the firebase backend")
+    return group
+
+
+def client_from_args(args):
+    return get_client(args.backend, args.project, args.latency_ms, args.service_account_key)
@@ -0,0 +1,90 @@
+"""
+Radius queries over geohash-indexed collections, plus a validator.
+
+query_radius() covers the circle with geohash cells, runs one range query
+per cell on the `geohash` field and keeps the documents within the exact
+Haversine distance, so a lookup reads O(results) documents rather than
+the whole collection (what map.tsx and getEventsNearLocation do today).
+
+Run as a script to compare it against a full scan for one circle:
+
+    python geo_query.py --collection posts --lat 40.4236 --lon -86.9113 --radius-km 1
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field
+
+from firestore_client import add_client_arguments, client_from_args
+from geohash import cover_circle, haversine_km, location_of
+from scanner import scan
+
+
+@dataclass
+class RadiusQueryStats:
+    cells: list = field(default_factory=list)
+    queries: int = 0
+    docs_read: int = 0
+    matches: int = 0
+    seconds: float = 0.0
+
+
+def query_radius(collection, lat, lon, radius_km):
+    """Return ([snapshot, ...], RadiusQueryStats) for documents within `radius_km`."""
+    started = time.perf_counter()
+    stats = RadiusQueryStats(cells=cover_circle(lat, lon, radius_km))
+    results = []
+    for cell in stats.cells:
+        query = collection.where("geohash", ">=", cell).where("geohash", "<", cell + "~")
+        stats.queries += 1
+        for doc in query.stream():
+            stats.docs_read += 1
+            point = location_of(doc.to_dict() or {})
+            if point is not None and haversine_km(lat, lon, *point) <= radius_km:
+                results.append(doc)
+    stats.matches = len(results)
+    stats.seconds = time.perf_counter() - started
+    return results, stats
+
+
+def full_scan_radius(collection, lat, lon, radius_km):
+    """The unindexed baseline: read every document and filter client-side."""
+    started = time.perf_counter()
+    results, read = [], 0
+    for doc in scan(collection):
+        read += 1
+        point = location_of(doc.to_dict() or {})
+        if point is not None and haversine_km(lat, lon, *point) <= radius_km:
+            results.append(doc)
+    return results, read, time.perf_counter() - started
+
+
+def validate(collection, lat, lon, radius_km):
+    indexed, stats = query_radius(collection, lat, lon, radius_km)
+    baseline, read, seconds = full_scan_radius(collection, lat, lon, radius_km)
+    indexed_ids = {d.id for d in indexed}
+    baseline_ids = {d.id for d in baseline}
+    missing = baseline_ids - indexed_ids
+    print(f"📍 {collection.id}: r={radius_km}km around ({lat}, {lon})")
+    print(f"  geohash: {stats.matches} matches, {stats.docs_read} docs read, "
+          f"{stats.queries} queries over {len(stats.cells)} cells, {stats.seconds:.2f}s")
+    print(f"  full scan: {len(baseline)} matches, {read} docs read, {seconds:.2f}s")
+    if missing:
+        print(f"  ⚠️ {len(missing)} matches missing from the geohash query "
+              f"(documents without a geohash? run backfill_geohash.py)")
+    else:
+        print("  ✅ results identical")
+    return not missing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default="posts")
+    parser.add_argument("--lat", type=float, required=True)
+    parser.add_argument("--lon", type=float, required=True)
+    parser.add_argument("--radius-km", type=float, default=1.0)
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    db = client_from_args(args)
+    validate(db.collection(args.collection), args.lat, args.lon, args.radius_km)
@@ -0,0 +1,200 @@
+"""
+Geohash encoding and circle covering for location-indexed documents.
+
+Documents with a location get two derived fields:
+
+    geohash          full-precision cell (GEOHASH_PRECISION chars); a cell
+                     prefix P matches every document in it with the range
+                     query  P <= geohash < P + "~"
+    geohashPrefixes  the prefixes at GEOHASH_PREFIX_PRECISIONS, for
+                     equality / array-contains(-any) lookups on one cell
+
+The encoding is the standard base32 geohash, so values match
+geofire-common on the app side.
+"""
+
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+GEOHASH_PREFIX_PRECISIONS = (4, 5, 6, 7)
+EARTH_RADIUS_KM = 6371.0
+# Cover a circle with at most this many cells before dropping a precision level.
+MAX_COVER_CELLS = 16
+
+
+def encode(lat, lon, precision=GEOHASH_PRECISION):
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """(lat_degrees, lon_degrees) spanned by one cell at `precision`."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounds(cell):
+    """(lat_lo, lat_hi, lon_lo, lon_hi) of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for ch in cell:
+        value = BASE32.index(ch)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+
+def neighbours(cell):
+    """`cell` and the (up to) eight cells around it, wrapping longitude at ±180°."""
+    lat_lo, lat_hi, lon_lo, lon_hi = bounds(cell)
+    center_lat, center_lon = (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+    cells = set()
+    for i in (-1, 0, 1):
+        lat = center_lat + i * (lat_hi - lat_lo)
+        if not -90.0 < lat < 90.0:
+            continue
+        for j in (-1, 0, 1):
+            lon = (center_lon + j * (lon_hi - lon_lo) + 180.0) % 360.0 - 180.0
+            cells.add(encode(lat, lon, len(cell)))
+    return sorted(cells)
+
+
+def geohash_fields(lat, lon):
+    """The derived index fields stored on a located document."""
+    full = encode(lat, lon, GEOHASH_PRECISION)
+    return {
+        "geohash": full,
+        "geohashPrefixes": [full[:p] for p in GEOHASH_PREFIX_PRECISIONS],
+    }
+
+
+def location_of(data):
+    """(lat, lon) of a document's `location` map or `locationGeo` GeoPoint, or None."""
+    loc = data.get("location")
+    if isinstance(loc, dict) and loc.get("latitude") is not None and loc.get("longitude") is not None:
+        return float(loc["latitude"]), float(loc["longitude"])
+    geo = data.get("locationGeo")
+    if geo is not None:
+        return float(geo.latitude), float(geo.longitude)
+    return None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _bbox(lat, lon, radius_km):
+    """(lat_lo, lat_hi, lon_lo, lon_hi) enclosing the circle; every longitude
+    if the circle contains a pole."""
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    if abs(lat) + dlat >= 90.0:
+        return max(-90.0, lat - dlat), min(90.0, lat + dlat), -180.0, 180.0
+    # Widest longitude reached on the circle (tangent meridians), not r / (R cos lat).
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def _cells_in_bbox(lat_lo, lat_hi, lon_lo, lon_hi, precision):
+    cell_lat, cell_lon = cell_size(precision)
+    first_lat = math.floor((lat_lo + 90.0) / cell_lat)
+    last_lat = math.floor((min(lat_hi, 90.0 - 1e-12) + 90.0) / cell_lat)
+    first_lon = math.floor((lon_lo + 180.0) / cell_lon)
+    last_lon = math.floor((lon_hi + 180.0) / cell_lon)
+    cells = set()
+    for i in range(first_lat, last_lat + 1):
+        center_lat = -90.0 + (i + 0.5) * cell_lat
+        for j in range(first_lon, last_lon + 1):
+            center_lon = (-180.0 + (j + 0.5) * cell_lon + 180.0) % 360.0 - 180.0
+            cells.add(encode(center_lat, center_lon, precision))
+    return cells
+
+
+def _meridian_distance_km(lat, lon, meridian, lat_lo, lat_hi):
+    """Distance from (lat, lon) to the segment of `meridian` between lat_lo and lat_hi."""
+    # Foot of the perpendicular on the meridian's great circle; distance
+    # grows monotonically away from it, so the nearest point of the segment
+    # is the clamped foot or one of the ends.
+    phi = math.radians(lat)
+    foot = math.degrees(math.atan2(math.sin(phi), math.cos(phi) * math.cos(math.radians(lon - meridian))))
+    return min(haversine_km(lat, lon, near, meridian) for near in (min(max(foot, lat_lo), lat_hi), lat_lo, lat_hi))
+
+
+def _cell_distance_km(cell, lat, lon):
+    """Great-circle distance from (lat, lon) to the nearest point of `cell` (0 if inside).
+
+    Clamping latitude and longitude separately is not enough on a sphere:
+    the nearest point of a side edge usually lies at another latitude. The
+    distance is the minimum over the four edges; along a parallel the
+    nearest point is at the clamped longitude, taken the short way round
+    so a cell just across the antimeridian counts as near.
+    """
+    lat_lo, lat_hi, lon_lo, lon_hi = bounds(cell)
+    center_lon, half_lon = (lon_lo + lon_hi) / 2, (lon_hi - lon_lo) / 2
+    offset = (lon - center_lon + 180.0) % 360.0 - 180.0
+    if lat_lo <= lat <= lat_hi and abs(offset) <= half_lon:
+        return 0.0
+    near_lon = center_lon + min(max(offset, -half_lon), half_lon)
+    return min(haversine_km(lat, lon, lat_lo, near_lon),
+               haversine_km(lat, lon, lat_hi, near_lon),
+               _meridian_distance_km(lat, lon, lon_lo, lat_lo, lat_hi),
+               _meridian_distance_km(lat, lon, lon_hi, lat_lo, lat_hi))
+
+
+def cover_circle(lat, lon, radius_km, max_cells=MAX_COVER_CELLS):
+    """Geohash cells whose union contains the circle, at the finest precision
+    that needs no more than `max_cells` cells. Cells that only touch the
+    bounding box corners, not the circle itself, are dropped."""
+    box = _bbox(lat, lon, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lon = cell_size(precision)
+        estimate = (math.ceil((box[1] - box[0]) / cell_lat) + 1) * (math.ceil((box[3] - box[2]) / cell_lon) + 1)
+        if estimate > 4 * max_cells:
+            continue
+        cells = {c for c in _cells_in_bbox(*box, precision) if _cell_distance_km(c, lat, lon) <= radius_km}
+        if len(cells) <= max_cells:
+            return sorted(cells)
+    return [""]  # whole world
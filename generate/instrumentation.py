@@ -0,0 +1,509 @@
+"""
+RPC instrumentation, phase timing and progress reporting for the
+generate/ jobs.
+
+InstrumentedClient wraps any Firestore client (firebase_admin, the
+emulator client or MemoryFirestore) and records, per collection and
+operation (get, query, add, set, update, delete, commit):
+
+    count, errors, latency histogram (log2 ms buckets), documents, and
+    bytes for writes
+
+Write bytes follow Firestore's storage-size rules, so they match what a
+write counts against document and request limits. Commits that fail with
+RESOURCE_EXHAUSTED are counted as throttling events; failures of any
+retryable kind (BatchWriter backs off and retries them) as retries.
+
+Jobs wrap their phases in `metrics.phase(name)` and report per-item
+progress through Progress, which redraws at most a few times a second
+(or logs every few seconds when stderr is not a terminal) instead of
+printing a line per document. `metrics.write_report(path, ...)` dumps
+everything as JSON. Comparing phase wall times with the writer's
+backpressure wait tells whether a run is bound by generation CPU, graph
+computation or write throughput.
+
+    metrics = Metrics()
+    db = InstrumentedClient(client_from_args(args), metrics)
+    with metrics.phase("seed"):
+        ...
+    metrics.write_report("seed-report.json", writer=writer.stats())
+"""
+
+import datetime
+import json
+import math
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from google.api_core import exceptions as gexc
+
+from batch_writer import RETRYABLE_ERRORS
+from storage_size import document_size
+
+HISTOGRAM_BUCKETS_MS = tuple(2.0 ** i for i in range(-2, 15))  # 0.25ms .. ~16s, plus overflow
+PROGRESS_INTERVAL_S = 0.25
+PROGRESS_LOG_INTERVAL_S = 5.0
+
+
+def _collection_of(path):
+    parts = path.split("/")
+    return parts[-2] if len(parts) >= 2 else parts[0]
+
+
+# -- metrics --------------------------------------------------------------
+
+class _OpStats:
+    __slots__ = ("count", "errors", "documents", "bytes", "total_ms", "max_ms", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.documents = 0
+        self.bytes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def observe(self, ms):
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        bucket = 0 if ms <= 0 else max(0, math.ceil(math.log2(ms)) + 2)
+        self.histogram[min(bucket, len(HISTOGRAM_BUCKETS_MS))] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.errors += other.errors
+        self.documents += other.documents
+        self.bytes += other.bytes
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    def percentile(self, q):
+        observed = sum(self.histogram)
+        if not observed:
+            return 0.0
+        rank = q * observed
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if seen >= rank:
+                return HISTOGRAM_BUCKETS_MS[i] if i < len(HISTOGRAM_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        observed = sum(self.histogram)
+        labels = [f"<={b:g}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]:g}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "latencyMs": {
+                "mean": round(self.total_ms / observed, 3) if observed else 0.0,
+                "p50": self.percentile(0.50),
+                "p90": self.percentile(0.90),
+                "p99": self.percentile(0.99),
+                "max": round(self.max_ms, 3),
+            },
+            "histogram": {label: n for label, n in zip(labels, self.histogram) if n},
+        }
+
+
+class Metrics:
+    """Thread-safe RPC, phase and error counters for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops = defaultdict(_OpStats)   # (collection, op) -> stats
+        self.phases = {}                    # name -> seconds, in start order
+        self.errors = defaultdict(int)      # exception class name -> count
+        self.throttled = 0
+        self.retries = 0
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._started = time.perf_counter()
+
+    def record(self, collection, op, ms=None, documents=0, nbytes=0, count=1):
+        with self._lock:
+            stats = self._ops[(collection, op)]
+            stats.count += count
+            stats.documents += documents
+            stats.bytes += nbytes
+            if ms is not None:
+                stats.observe(ms)
+
+    def record_error(self, collection, op, exc, ms=None):
+        with self._lock:
+            stats = self._ops[(collection, op)]
+            stats.errors += 1
+            if ms is not None:
+                stats.observe(ms)
+            self.errors[type(exc).__name__] += 1
+            if isinstance(exc, gexc.ResourceExhausted):
+                self.throttled += 1
+            if isinstance(exc, RETRYABLE_ERRORS):
+                self.retries += 1
+
+    def drain(self):
+        """Return the RPC counters recorded so far (picklable) and reset them.
+
+        Worker processes ship these to the coordinator, which folds them
+        into its own Metrics with merge(); phases stay per process.
+        """
+        with self._lock:
+            ops, self._ops = dict(self._ops), defaultdict(_OpStats)
+            errors, self.errors = dict(self.errors), defaultdict(int)
+            throttled, retries = self.throttled, self.retries
+            self.throttled = self.retries = 0
+        return {"ops": ops, "errors": errors, "throttled": throttled, "retries": retries}
+
+    def merge(self, state):
+        """Add counters returned by another Metrics' drain()."""
+        with self._lock:
+            for key, stats in state["ops"].items():
+                self._ops[key].merge(stats)
+            for name, n in state["errors"].items():
+                self.errors[name] += n
+            self.throttled += state["throttled"]
+            self.retries += state["retries"]
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def totals(self):
+        with self._lock:
+            ops = list(self._ops.items())
+        # Every timed call is one round trip; per-document ops inside a batch are not timed.
+        rpcs = sum(sum(s.histogram) for _, s in ops)
+        writes = sum(s.documents for (_, op), s in ops if op in ("set", "update", "delete", "add"))
+        written = sum(s.bytes for (_, op), s in ops if op in ("set", "update", "add"))
+        read = sum(s.documents for (_, op), s in ops if op in ("get", "query"))
+        return {"rpcs": rpcs, "writes": writes, "bytesWritten": written, "documentsRead": read}
+
+    def report(self, **extra):
+        with self._lock:
+            collections = defaultdict(dict)
+            for (collection, op), stats in sorted(self._ops.items()):
+                collections[collection][op] = stats.to_dict()
+            phases = {name: round(seconds, 3) for name, seconds in self.phases.items()}
+            errors = dict(self.errors)
+        return {
+            "startedAt": self.started_at.isoformat(),
+            "elapsedS": round(self.elapsed, 3),
+            "phasesS": phases,
+            "totals": self.totals(),
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "errors": errors,
+            "collections": collections,
+            **extra,
+        }
+
+    def write_report(self, path, **extra):
+        report = self.report(**extra)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        return report
+
+    def summary(self):
+        totals = self.totals()
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())
+        return (f"{totals['rpcs']:,} RPCs, {totals['writes']:,} writes "
+                f"({totals['bytesWritten'] / 2**20:.1f} MiB), {totals['documentsRead']:,} docs read, "
+                f"{self.throttled} throttled, {self.retries} retries | {phases}")
+
+
+# -- client wrappers ------------------------------------------------------
+
+def _unwrap(value):
+    return value._target if isinstance(value, _Proxy) else value
+
+
+class _Proxy:
+    def __init__(self, target, metrics):
+        self._target = target
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class InstrumentedQuery(_Proxy):
+    def __init__(self, target, metrics, collection):
+        super().__init__(target, metrics)
+        self._collection = collection
+
+    def _chain(self, name, *args, **kwargs):
+        result = getattr(self._target, name)(*[_unwrap(a) for a in args],
+                                             **{k: _unwrap(v) for k, v in kwargs.items()})
+        return InstrumentedQuery(result, self._metrics, self._collection)
+
+    def where(self, *args, **kwargs):
+        return self._chain("where", *args, **kwargs)
+
+    def order_by(self, *args, **kwargs):
+        return self._chain("order_by", *args, **kwargs)
+
+    def limit(self, *args, **kwargs):
+        return self._chain("limit", *args, **kwargs)
+
+    def select(self, *args, **kwargs):
+        return self._chain("select", *args, **kwargs)
+
+    def start_after(self, *args, **kwargs):
+        return self._chain("start_after", *args, **kwargs)
+
+    def start_at(self, *args, **kwargs):
+        return self._chain("start_at", *args, **kwargs)
+
+    def end_before(self, *args, **kwargs):
+        return self._chain("end_before", *args, **kwargs)
+
+    def stream(self, *args, **kwargs):
+        # Reads are counted but not sized: sizing every streamed document
+        # would cost more than the scan itself on the in-memory backend.
+        started = time.perf_counter()
+        documents = 0
+        try:
+            for snapshot in self._target.stream(*args, **kwargs):
+                documents += 1
+                yield snapshot
+        except Exception as exc:
+            self._metrics.record_error(self._collection, "query", exc, (time.perf_counter() - started) * 1000)
+            raise
+        self._metrics.record(self._collection, "query", (time.perf_counter() - started) * 1000, documents)
+
+    def get(self, *args, **kwargs):
+        return list(self.stream(*args, **kwargs))
+
+
+class InstrumentedCollection(InstrumentedQuery):
+    def __init__(self, target, metrics, client):
+        super().__init__(target, metrics, target.id)
+        self._instrumented_client = client
+
+    @property
+    def _client(self):
+        return self._instrumented_client
+
+    def document(self, *args, **kwargs):
+        return InstrumentedDocument(self._target.document(*args, **kwargs), self._metrics)
+
+    def add(self, document_data, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result, ref = self._target.add(document_data, *args, **kwargs)
+        except Exception as exc:
+            self._metrics.record_error(self._collection, "add", exc)
+            raise
+        self._metrics.record(self._collection, "add", (time.perf_counter() - started) * 1000, 1,
+                             document_size(ref.path, document_data))
+        return result, InstrumentedDocument(ref, self._metrics)
+
+
+class InstrumentedDocument(_Proxy):
+    @property
+    def _collection(self):
+        return _collection_of(self._target.path)
+
+    def _call(self, op, data, nbytes_data, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = getattr(self._target, op)(*([data] if data is not None else []), *args, **kwargs)
+        except Exception as exc:
+            self._metrics.record_error(self._collection, op, exc, (time.perf_counter() - started) * 1000)
+            raise
+        self._metrics.record(self._collection, op, (time.perf_counter() - started) * 1000, 1,
+                             document_size(self._target.path, nbytes_data) if nbytes_data is not None else 0)
+        return result
+
+    def get(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            snapshot = self._target.get(*args, **kwargs)
+        except Exception as exc:
+            self._metrics.record_error(self._collection, "get", exc, (time.perf_counter() - started) * 1000)
+            raise
+        self._metrics.record(self._collection, "get", (time.perf_counter() - started) * 1000,
+                             1 if snapshot.exists else 0)
+        return snapshot
+
+    def set(self, data, *args, **kwargs):
+        return self._call("set", data, data, *args, **kwargs)
+
+    def update(self, data, *args, **kwargs):
+        return self._call("update", data, data, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call("delete", None, None, *args, **kwargs)
+
+
+class InstrumentedBatch(_Proxy):
+    def __init__(self, target, metrics):
+        super().__init__(target, metrics)
+        self._ops = []  # (collection, op, bytes)
+
+    def set(self, reference, data, *args, **kwargs):
+        ref = _unwrap(reference)
+        self._ops.append((_collection_of(ref.path), "set", document_size(ref.path, data)))
+        return self._target.set(ref, data, *args, **kwargs)
+
+    def update(self, reference, data, *args, **kwargs):
+        ref = _unwrap(reference)
+        self._ops.append((_collection_of(ref.path), "update", document_size(ref.path, data)))
+        return self._target.update(ref, data, *args, **kwargs)
+
+    def delete(self, reference, *args, **kwargs):
+        ref = _unwrap(reference)
+        self._ops.append((_collection_of(ref.path), "delete", 0))
+        return self._target.delete(ref, *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._target.commit(*args, **kwargs)
+        except Exception as exc:
+            self._metrics.record_error("*", "commit", exc, (time.perf_counter() - started) * 1000)
+            raise
+        ms = (time.perf_counter() - started) * 1000
+        grouped = defaultdict(lambda: [0, 0])
+        for collection, op, nbytes in self._ops:
+            grouped[(collection, op)][0] += 1
+            grouped[(collection, op)][1] += nbytes
+        for (collection, op), (count, nbytes) in grouped.items():
+            self._metrics.record(collection, op, None, count, nbytes, count=count)
+        self._metrics.record("*", "commit", ms, len(self._ops), sum(n for _, _, n in self._ops))
+        return result
+
+
+class _InstrumentedCollectionGroup(InstrumentedQuery):
+    def get_partitions(self, *args, **kwargs):
+        for partition in self._target.get_partitions(*args, **kwargs):
+            yield _InstrumentedPartition(partition, self._metrics, self._collection)
+
+
+class _InstrumentedPartition(_Proxy):
+    def __init__(self, target, metrics, collection):
+        super().__init__(target, metrics)
+        self._collection = collection
+
+    def query(self):
+        return InstrumentedQuery(self._target.query(), self._metrics, self._collection)
+
+
+class InstrumentedClient(_Proxy):
+    """Drop-in Firestore client that records every RPC into `metrics`."""
+
+    def __init__(self, target, metrics=None):
+        super().__init__(target, metrics or Metrics())
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    def collection(self, *args, **kwargs):
+        return InstrumentedCollection(self._target.collection(*args, **kwargs), self._metrics, self)
+
+    def get_all(self, references, *args, **kwargs):
+        references = [_unwrap(ref) for ref in references]
+        collection = _collection_of(references[0].path) if references else "*"
+        started = time.perf_counter()
+        found = 0
+        try:
+            for snapshot in self._target.get_all(references, *args, **kwargs):
+                found += 1 if snapshot.exists else 0
+                yield snapshot
+        except Exception as exc:
+            self._metrics.record_error(collection, "getAll", exc, (time.perf_counter() - started) * 1000)
+            raise
+        self._metrics.record(collection, "getAll", (time.perf_counter() - started) * 1000, found)
+
+    def document(self, *args, **kwargs):
+        return InstrumentedDocument(self._target.document(*args, **kwargs), self._metrics)
+
+    def batch(self):
+        return InstrumentedBatch(self._target.batch(), self._metrics)
+
+    def collection_group(self, collection_id):
+        return _InstrumentedCollectionGroup(self._target.collection_group(collection_id),
+                                            self._metrics, collection_id)
+
+
+# -- progress -------------------------------------------------------------
+
+def _format_duration(seconds):
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Progress:
+    """Rate-limited single-line progress with throughput and ETA.
+
+    On a terminal the line is redrawn in place at most every
+    PROGRESS_INTERVAL_S; otherwise (CI, redirected output) a line is
+    logged every PROGRESS_LOG_INTERVAL_S.
+    """
+
+    def __init__(self, label, total=None, stream=None, enabled=True):
+        self.label = label
+        self.total = total
+        self.count = 0
+        self.stream = stream or sys.stderr
+        self.enabled = enabled
+        self._tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self._interval = PROGRESS_INTERVAL_S if self._tty else PROGRESS_LOG_INTERVAL_S
+        self._started = time.perf_counter()
+        self._last_draw = self._started
+
+    def advance(self, n=1):
+        self.count += n
+        now = time.perf_counter()
+        if self.enabled and now - self._last_draw >= self._interval:
+            self._last_draw = now
+            self._draw(now)
+
+    def line(self, now=None):
+        elapsed = (now or time.perf_counter()) - self._started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        if self.total:
+            eta = (self.total - self.count) / rate if rate > 0 else float("inf")
+            eta_text = _format_duration(eta) if math.isfinite(eta) else "--:--:--"
+            return (f"  {self.label} {self.count:,}/{self.total:,} ({100 * self.count / self.total:5.1f}%)  "
+                    f"{rate:,.0f}/s  ETA {eta_text}")
+        return f"  {self.label} {self.count:,}  {rate:,.0f}/s  {_format_duration(elapsed)} elapsed"
+
+    def _draw(self, now):
+        if self._tty:
+            self.stream.write("\r\033[K" + self.line(now))
+        else:
+            self.stream.write(self.line(now) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self._started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        final = f"  {self.label} {self.count:,} done in {_format_duration(elapsed)} ({rate:,.0f}/s)"
+        self.stream.write(("\r\033[K" if self._tty else "") + final + "\n")
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,48 @@
+"""
+Replay a seed snapshot (see snapshot.py) into Firestore or the emulator.
+
+The file is streamed from a memory map and every record goes through
+BatchWriter, so the load runs at batched, parallel write throughput with
+no generation work: export a large dataset once with
+
+    python add_dummy_users.py --users 1000000 --seed 7 --export seed-1m.ndjson
+
+and load it into as many environments as needed with
+
+    python load_snapshot.py seed-1m.ndjson
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python load_snapshot.py seed-1m.ndjson --project demo-tava
+"""
+
+import argparse
+
+from batch_writer import MAX_IN_FLIGHT, BatchWriter
+from firestore_client import add_client_arguments, client_from_args
+from snapshot import read_header, read_snapshot
+
+
+def load_snapshot(db, path, max_in_flight=MAX_IN_FLIGHT):
+    header = read_header(path)
+    print(f"📦 Loading {path} ({header.get('meta', {})})")
+    with BatchWriter(db, max_in_flight=max_in_flight) as writer:
+        for op, doc_path, data in read_snapshot(path):
+            ref = db.document(doc_path)
+            if op == "set":
+                writer.set(ref, data)
+            elif op == "update":
+                writer.update(ref, data)
+            elif op == "delete":
+                writer.delete(ref)
+            else:
+                raise ValueError(f"unknown snapshot op {op!r} for {doc_path}")
+    print(f"✅ {writer.summary()}")
+    return writer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="concurrent batch commits")
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    load_snapshot(client_from_args(args), args.path, args.max_in_flight)
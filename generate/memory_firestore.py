@@ -0,0 +1,518 @@
+"""
+In-memory stand-in for the Firestore client, for running and timing the
+generate/ tools without credentials or an emulator.
+
+It implements the slice of google.cloud.firestore the tools use:
+top-level collections, document `set` / `update` / `get` / `delete`,
+`get_all`, `collection.add`, `where` (including `__name__`, `in` and array
+operators), `order_by`, `limit`, `select`, `start_after`, `stream`,
+WriteBatch, and the SERVER_TIMESTAMP / DELETE_FIELD / ArrayUnion /
+ArrayRemove / Increment sentinels. `collection_group().get_partitions()`
+is not supported, so scanner.py falls back to its ID-range partitions,
+and there is no `on_snapshot`. Batch commits enforce Firestore's limits
+of 500 writes and 10 MiB per request.
+
+Every round trip (a document get/set/update/delete, a batch commit, a
+query stream) sleeps `latency_s` and is counted in `rpcs`, so runs show
+how many RPCs a tool issues and roughly what they would cost over a
+network:
+
+    db = MemoryFirestore(latency_s=0.002)
+    ...
+    print(db.rpcs, db.documents_written)
+"""
+
+import bisect
+import datetime
+import random
+import string
+import threading
+import time
+from collections import Counter
+
+from google.api_core import exceptions as gexc
+from google.cloud.firestore import DELETE_FIELD, SERVER_TIMESTAMP
+from google.cloud.firestore_v1.transforms import ArrayRemove, ArrayUnion, Increment
+
+from storage_size import MAX_REQUEST_BYTES, document_size
+
+MAX_BATCH_SIZE = 500
+AUTO_ID_ALPHABET = string.ascii_letters + string.digits
+AUTO_ID_LENGTH = 20
+
+_MISSING = object()
+
+
+def _copy(value):
+    # Plain dict/list copy: much cheaper than deepcopy, and everything else
+    # stored (str, numbers, GeoPoint, datetime) is treated as immutable.
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _get_field(data, field_path):
+    value = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _resolve(value, current, now):
+    if value is SERVER_TIMESTAMP:
+        return now
+    if isinstance(value, ArrayUnion):
+        base = list(current) if isinstance(current, list) else []
+        return base + [v for v in value.values if v not in base]
+    if isinstance(value, ArrayRemove):
+        base = list(current) if isinstance(current, list) else []
+        return [v for v in base if v not in value.values]
+    if isinstance(value, Increment):
+        return (current if isinstance(current, (int, float)) else 0) + value.value
+    if isinstance(value, dict):
+        return {k: _resolve(v, None, now) for k, v in value.items() if v is not DELETE_FIELD}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _apply_update(data, updates, now):
+    for field_path, value in updates.items():
+        *parents, leaf = field_path.split(".")
+        target = data
+        for part in parents:
+            child = target.get(part)
+            if not isinstance(child, dict):
+                child = target[part] = {}
+            target = child
+        if value is DELETE_FIELD:
+            target.pop(leaf, None)
+        else:
+            target[leaf] = _resolve(value, target.get(leaf), now)
+
+
+def _flatten(data, prefix=""):
+    """Nested maps -> dotted field paths, for `set(..., merge=True)`."""
+    out = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            out.update(_flatten(value, path + "."))
+        else:
+            out[path] = value
+    return out
+
+
+def _compare(op, actual, expected):
+    if actual is _MISSING:
+        return False  # documents without the field never match
+    try:
+        if op == "==":
+            return actual == expected
+        if op == "!=":
+            return actual != expected
+        if op == "<":
+            return actual < expected
+        if op == "<=":
+            return actual <= expected
+        if op == ">":
+            return actual > expected
+        if op == ">=":
+            return actual >= expected
+        if op == "in":
+            return actual in expected
+        if op == "not-in":
+            return actual not in expected
+        if op == "array-contains":
+            return isinstance(actual, list) and expected in actual
+        if op == "array-contains-any":
+            return isinstance(actual, list) and any(v in actual for v in expected)
+    except TypeError:
+        return False  # Firestore never matches across value types
+    raise ValueError(f"unsupported operator {op!r}")
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self._data = data
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return _copy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return _copy(value)
+
+
+class DocumentReference:
+    def __init__(self, client, collection_id, document_id):
+        self._client = client
+        self.id = document_id
+        self._collection_id = collection_id
+
+    @property
+    def path(self):
+        return f"{self._collection_id}/{self.id}"
+
+    @property
+    def parent(self):
+        return self._client.collection(self._collection_id)
+
+    def get(self, field_paths=None):
+        self._client._rpc("get")
+        data = self._client._read(self._collection_id, self.id)
+        if data is not None and field_paths is not None:
+            data = {f: v for f in field_paths if (v := _get_field(data, f)) is not _MISSING}
+        return DocumentSnapshot(self, data)
+
+    def set(self, data, merge=False):
+        self._client._commit([("set", self, data, merge)])
+
+    def update(self, data):
+        self._client._commit([("update", self, data, False)])
+
+    def delete(self):
+        self._client._commit([("delete", self, None, False)])
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+
+class Query:
+    def __init__(self, client, collection_id, filters=(), orders=(), limit=None, fields=None, cursor=None):
+        self._client = client
+        self._collection_id = collection_id
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._fields = fields
+        self._cursor = cursor
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                     fields=self._fields, cursor=self._cursor)
+        state.update(changes)
+        return Query(self._client, self._collection_id, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if field_path == "__name__":
+            value = [v.id if isinstance(v, DocumentReference) else v for v in value] \
+                if op_string in ("in", "not-in") else (value.id if isinstance(value, DocumentReference) else value)
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self._orders + ((field_path, direction == "DESCENDING"),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def select(self, field_paths):
+        return self._copy(fields=list(field_paths))
+
+    def start_after(self, document):
+        return self._copy(cursor=document)
+
+    def _sort_key(self, doc_id, data):
+        key = []
+        for field, _ in self._orders:
+            key.append(doc_id if field == "__name__" else _get_field(data, field))
+        key.append(doc_id)
+        return tuple(key)
+
+    def _matches(self, doc_id, data):
+        for field, op, value in self._filters:
+            actual = doc_id if field == "__name__" else _get_field(data, field)
+            if not _compare(op, actual, value):
+                return False
+        return True
+
+    def _project(self, data):
+        if self._fields is None:
+            return _copy(data)
+        return {f: _copy(v) for f in self._fields if (v := _get_field(data, f)) is not _MISSING}
+
+    def _candidates(self):
+        """Yield (id, data) in query order.
+
+        Ordering by document ID walks the sorted ID index, or, when there is
+        an `==` / `in` filter, the matching IDs from an equality index, the
+        way Firestore serves such queries in O(matches).
+        """
+        ids, docs = self._client._index(self._collection_id)
+        by_name = all(field == "__name__" and not desc for field, desc in self._orders)
+        equality = next(((f, op, v) for f, op, v in self._filters if f != "__name__" and op in ("==", "in")), None)
+        if by_name and equality is not None:
+            field, op, value = equality
+            matched = self._client._lookup(self._collection_id, field, value if op == "in" else [value])
+            after = self._cursor.id if self._cursor is not None else None
+            for doc_id in matched:
+                if after is not None and doc_id <= after:
+                    continue
+                data = docs.get(doc_id)
+                if data is not None:
+                    yield doc_id, data
+            return
+        if by_name:
+            lo, hi = 0, len(ids)
+            for field, op, value in self._filters:
+                if field != "__name__":
+                    continue
+                if op == ">=":
+                    lo = max(lo, bisect.bisect_left(ids, value))
+                elif op == ">":
+                    lo = max(lo, bisect.bisect_right(ids, value))
+                elif op == "<":
+                    hi = min(hi, bisect.bisect_left(ids, value))
+                elif op == "<=":
+                    hi = min(hi, bisect.bisect_right(ids, value))
+            if self._cursor is not None:
+                lo = max(lo, bisect.bisect_right(ids, self._cursor.id))
+            for i in range(lo, hi):
+                data = docs.get(ids[i])
+                if data is not None:
+                    yield ids[i], data
+            return
+
+        rows = [(doc_id, docs[doc_id]) for doc_id in ids if doc_id in docs]
+        for field, desc in reversed(self._orders):
+            rows = [r for r in rows if field == "__name__" or _get_field(r[1], field) is not _MISSING]
+            rows.sort(key=lambda r: r[0] if field == "__name__" else _get_field(r[1], field), reverse=desc)
+        if self._cursor is not None:
+            cursor_id = self._cursor.id
+            position = next((i for i, r in enumerate(rows) if r[0] == cursor_id), None)
+            if position is None:
+                # Cursor document no longer in the result set: fall back to its sort key.
+                cursor_key = self._sort_key(cursor_id, self._cursor.to_dict() or {})
+                rows = [r for r in rows if self._sort_key(*r) > cursor_key]
+            else:
+                rows = rows[position + 1:]
+        yield from rows
+
+    def stream(self, transaction=None):
+        self._client._rpc("query")
+        with self._client._lock:
+            results = []
+            for doc_id, data in self._candidates():
+                if not self._matches(doc_id, data):
+                    continue
+                results.append((doc_id, self._project(data)))
+                if self._limit is not None and len(results) >= self._limit:
+                    break
+        for doc_id, data in results:
+            yield DocumentSnapshot(DocumentReference(self._client, self._collection_id, doc_id), data)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, client, collection_id):
+        super().__init__(client, collection_id)
+        self.id = collection_id
+
+    def document(self, document_id=None):
+        if document_id is None:
+            document_id = "".join(random.choices(AUTO_ID_ALPHABET, k=AUTO_ID_LENGTH))
+        return DocumentReference(self._client, self.id, document_id)
+
+    def add(self, document_data, document_id=None):
+        ref = self.document(document_id)
+        ref.set(document_data)
+        return datetime.datetime.now(datetime.timezone.utc), ref
+
+    def list_documents(self):
+        ids, docs = self._client._index(self.id)
+        return [self.document(doc_id) for doc_id in ids if doc_id in docs]
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append(("set", reference, document_data, merge))
+
+    def update(self, reference, field_updates):
+        self._ops.append(("update", reference, field_updates, False))
+
+    def delete(self, reference):
+        self._ops.append(("delete", reference, None, False))
+
+    def commit(self):
+        if len(self._ops) > MAX_BATCH_SIZE:
+            raise gexc.InvalidArgument(f"maximum {MAX_BATCH_SIZE} writes allowed per request")
+        nbytes = sum(document_size(ref.path, data) for _, ref, data, _ in self._ops)
+        if nbytes > MAX_REQUEST_BYTES:
+            raise gexc.InvalidArgument(f"request payload size exceeds the limit: {MAX_REQUEST_BYTES} bytes")
+        self._client._commit(self._ops)
+        self._ops = []
+
+    def __len__(self):
+        return len(self._ops)
+
+
+class _CollectionGroup:
+    def __init__(self, collection_id):
+        self.id = collection_id
+
+    def get_partitions(self, partition_count):
+        raise NotImplementedError("partitioned queries are not simulated; use id-range partitions")
+
+
+class MemoryFirestore:
+    """A thread-safe, single-process Firestore stand-in. See the module docstring."""
+
+    def __init__(self, latency_s=0.0, project="memory"):
+        self.project = project
+        self.latency_s = latency_s
+        self._collections = {}       # collection id -> {doc id: data}
+        self._sorted_ids = {}        # collection id -> sorted ids, built on first query
+        self._stale_ids = Counter()  # deleted ids still in _sorted_ids (skipped when read)
+        self._versions = Counter()   # collection id -> write count, invalidates _equality
+        self._equality = {}          # (collection id, field) -> (version, {value: [ids]})
+        self._lock = threading.RLock()
+        self.rpcs = Counter()
+        self.documents_written = 0
+
+    # -- public client surface --------------------------------------------
+
+    def collection(self, collection_id):
+        if "/" in collection_id:
+            raise ValueError("only top-level collections are supported")
+        return CollectionReference(self, collection_id)
+
+    def document(self, document_path):
+        collection_id, _, document_id = document_path.partition("/")
+        if not document_id or "/" in document_id:
+            raise ValueError(f"expected 'collection/doc', got {document_path!r}")
+        return DocumentReference(self, collection_id, document_id)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def get_all(self, references, field_paths=None):
+        """Snapshots for `references` in one round trip (missing documents have exists=False)."""
+        self._rpc("getAll")
+        for ref in references:
+            data = self._read(ref._collection_id, ref.id)
+            if data is not None and field_paths is not None:
+                data = {f: v for f in field_paths if (v := _get_field(data, f)) is not _MISSING}
+            yield DocumentSnapshot(ref, data)
+
+    def collection_group(self, collection_id):
+        return _CollectionGroup(collection_id)
+
+    def collections(self):
+        return [self.collection(name) for name, docs in self._collections.items() if docs]
+
+    # -- internals ----------------------------------------------------------
+
+    def _rpc(self, kind):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        with self._lock:
+            self.rpcs[kind] += 1
+
+    def _read(self, collection_id, document_id):
+        with self._lock:
+            data = self._collections.get(collection_id, {}).get(document_id)
+            return _copy(data) if data is not None else None
+
+    def _index(self, collection_id):
+        with self._lock:
+            docs = self._collections.get(collection_id, {})
+            ids = self._sorted_ids.get(collection_id)
+            if ids is None:
+                ids = self._sorted_ids[collection_id] = sorted(docs)
+            return ids, docs
+
+    def _lookup(self, collection_id, field_path, values):
+        """Sorted IDs of documents whose `field_path` equals any of `values`."""
+        with self._lock:
+            version = self._versions[collection_id]
+            cached = self._equality.get((collection_id, field_path))
+            if cached is None or cached[0] != version:
+                index = {}
+                for doc_id, data in self._collections.get(collection_id, {}).items():
+                    value = _get_field(data, field_path)
+                    try:
+                        index.setdefault(value, []).append(doc_id)
+                    except TypeError:
+                        pass  # unhashable (list / map) values are never equal to a filter scalar here
+                cached = self._equality[(collection_id, field_path)] = (version, index)
+            matched = []
+            for value in values:
+                try:
+                    matched.extend(cached[1].get(value, ()))
+                except TypeError:
+                    pass
+            return sorted(set(matched))
+
+    def _commit(self, ops):
+        self._rpc("commit")
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            # Validate first so a failing batch applies nothing.
+            for op, ref, _, _ in ops:
+                if op == "update" and self._collections.get(ref._collection_id, {}).get(ref.id) is None:
+                    raise gexc.NotFound(f"No document to update: {ref.path}")
+            for op, ref, data, merge in ops:
+                collection_id = ref._collection_id
+                docs = self._collections.setdefault(collection_id, {})
+                self._versions[collection_id] += 1
+                if op == "delete":
+                    if docs.pop(ref.id, None) is not None:
+                        self._forget_id(collection_id)
+                    continue
+                current = docs.get(ref.id)
+                if current is None:
+                    self._remember_id(collection_id, ref.id)
+                if op == "set" and not merge:
+                    docs[ref.id] = _resolve(dict(data), None, now)
+                else:
+                    updated = _copy(current) if current is not None else {}
+                    _apply_update(updated, _flatten(data) if merge else data, now)
+                    docs[ref.id] = updated
+            self.documents_written += len(ops)
+
+    def _remember_id(self, collection_id, document_id):
+        ids = self._sorted_ids.get(collection_id)
+        if ids is None:
+            return
+        i = bisect.bisect_left(ids, document_id)
+        if i < len(ids) and ids[i] == document_id:
+            self._stale_ids[collection_id] -= 1
+        else:
+            ids.insert(i, document_id)
+
+    def _forget_id(self, collection_id):
+        # Deleted ids stay in the sorted index (readers skip them) until
+        # they make up half of it; then the index is rebuilt on next use.
+        ids = self._sorted_ids.get(collection_id)
+        if ids is None:
+            return
+        self._stale_ids[collection_id] += 1
+        if self._stale_ids[collection_id] * 2 > len(ids):
+            del self._sorted_ids[collection_id]
+            self._stale_ids[collection_id] = 0
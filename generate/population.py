@@ -0,0 +1,369 @@
+"""
+Seeded, streaming generator for synthetic Tava users and posts.
+
+Every record is derived from (seed, user index) alone: names, projects,
+skills, interests and jittered campus locations are recombined from the
+fixed lists below, and each user draws from its own RNG stream. Users
+are yielded one at a time, so memory stays flat whether the population
+is 15 users or a million, and the same seed always produces the same
+population.
+"""
+
+import functools
+import hashlib
+import random
+import string
+
+SAMPLE_NAMES = [
+    "Alice Johnson", "Bob Smith", "Carol Williams", "David Brown", "Eva Davis",
+    "Frank Miller", "Grace Wilson", "Hank Moore", "Ivy Taylor", "Jack Anderson",
+    "Kara Thomas", "Liam Jackson", "Mia White", "Noah Harris", "Olivia Martin",
+    "Paul Thompson", "Quinn Garcia", "Rachel Martinez", "Sam Robinson", "Tina Clark",
+    "Uma Rodriguez", "Victor Lewis", "Wendy Lee", "Xander Walker", "Yara Hall",
+    "Zane Allen", "Amy Young", "Ben King", "Cathy Wright", "Derek Scott",
+    "Ella Green", "Fred Adams", "Gina Baker", "Harry Nelson", "Isla Carter",
+    "Jake Mitchell", "Kylie Perez", "Leo Roberts", "Maya Turner", "Nate Phillips",
+    "Opal Campbell", "Pete Parker", "Queen Simmons", "Ray Evans", "Sara Edwards",
+    "Tom Collins", "Ursula Stewart", "Vince Morris", "Will Rogers", "Xenia Reed",
+    "Yusuf Cook", "Zara Morgan", "Aaron Bell", "Bella Murphy", "Caleb Bailey",
+    "Diana Rivera", "Ethan Cooper", "Fiona Richardson", "Gabe Cox", "Holly Howard",
+    "Ian Ward", "Jade Brooks", "Kyle Bennett", "Lara Gray", "Mark James",
+    "Nina Watson", "Owen Brooks", "Penny Kelly", "Quincy Sanders", "Rose Price"
+]
+
+TECH_PROJECTS = [
+    ("AI-Powered Medical Diagnosis System", "Develop an AI/ML system that analyzes medical images and patient data to assist doctors in diagnosing diseases with high accuracy, leveraging deep learning and computer vision techniques."),
+    ("Smart Home Automation with Embedded Systems", "Design an embedded system-based smart home automation platform that integrates sensors and actuators to enable energy-efficient control and monitoring of household devices."),
+    ("Real-Time Traffic Prediction using Machine Learning", "Implement a software solution that collects and analyzes traffic data in real-time to predict congestion patterns, optimizing routing and reducing commute times."),
+    ("Low-Power IoT Sensor Network", "Create an embedded IoT sensor network optimized for low power consumption, capable of long-term environmental monitoring and data transmission using wireless protocols."),
+    ("Electrical Vehicle Battery Management System", "Develop an electrical engineering project focusing on the design and implementation of a battery management system to monitor and optimize EV battery performance and safety."),
+    ("Natural Language Processing Chatbot", "Build an AI-driven chatbot utilizing advanced NLP techniques to understand and respond to user queries in natural language, enhancing user interaction."),
+    ("Autonomous Drone Navigation", "Design and implement embedded software and control algorithms for autonomous drone navigation, including obstacle detection and path planning."),
+    ("Renewable Energy Grid Integration", "Engineer a system to integrate renewable energy sources into the electrical grid, managing load balancing and energy storage using smart grid technologies."),
+    ("Computer Vision-Based Quality Inspection", "Develop a computer vision system for automated quality inspection in manufacturing, detecting defects and ensuring product standards."),
+    ("Wearable Health Monitoring Device", "Create an embedded system wearable device that continuously monitors vital health parameters and provides real-time feedback to users and healthcare providers."),
+    ("Blockchain-Based Voting System", "Develop a secure and transparent blockchain voting platform to enhance election integrity and voter trust."),
+    ("Augmented Reality Educational App", "Design an AR app that enhances learning experiences by overlaying interactive 3D models onto real-world environments."),
+    ("Cybersecurity Threat Detection", "Implement a machine learning system to detect and respond to cybersecurity threats in real-time."),
+    ("Smart Agriculture Monitoring System", "Create an IoT-based system to monitor soil moisture, temperature, and crop health for precision farming."),
+    ("Autonomous Vehicle Control Algorithms", "Develop control algorithms for self-driving cars focusing on safety and efficiency."),
+    ("Cloud-Based Data Analytics Platform", "Build a scalable cloud platform for big data processing and visualization."),
+    ("3D Printing Optimization Software", "Design software to optimize 3D printing parameters for improved quality and speed."),
+    ("Energy Harvesting Wearable Device", "Develop a wearable device that harvests energy from body movements to power sensors."),
+    ("AI-Powered Financial Advisor", "Create an AI system that provides personalized financial advice based on user data."),
+    ("Smart Traffic Light Control System", "Implement an adaptive traffic light system that optimizes flow based on real-time data."),
+    ("Virtual Reality Therapy Platform", "Develop a VR platform for therapeutic applications such as phobia treatment and rehabilitation."),
+    ("IoT-Based Smart Parking System", "Design a system that detects available parking spots and guides drivers accordingly."),
+    ("Machine Learning for Predictive Maintenance", "Implement ML models to predict equipment failures and schedule maintenance."),
+    ("Robotic Arm Control System", "Develop control software for a robotic arm for manufacturing automation."),
+    ("AI-Driven Content Recommendation Engine", "Build a recommendation system that personalizes content based on user preferences."),
+    ("Embedded System for Wearable Fitness Tracker", "Create firmware for a fitness tracker that monitors physical activity and health metrics."),
+    ("Smart Energy Meter with Blockchain", "Design a blockchain-enabled smart meter for secure energy transactions."),
+    ("AI-Based Language Translation Device", "Develop a portable device that provides real-time language translation."),
+    ("IoT-Enabled Disaster Management System", "Build a system that uses IoT sensors to detect and respond to natural disasters."),
+    ("Autonomous Underwater Vehicle Navigation", "Design navigation algorithms for underwater drones."),
+    ("Smart Waste Management System", "Implement sensors and software to optimize waste collection routes."),
+    ("AI-Powered Resume Screening Tool", "Create a tool that automates the screening of job applications."),
+    ("Embedded System for Smart Glasses", "Develop software for smart glasses that provide augmented information."),
+    ("Cloud-Based Collaborative Coding Platform", "Build a platform that enables real-time collaborative coding."),
+    ("AI-Driven Personalized Learning Platform", "Design a platform that adapts educational content to individual learners."),
+    ("Smart Grid Demand Response System", "Implement a system to manage electricity demand in smart grids."),
+    ("IoT-Based Air Quality Monitoring", "Create a network of sensors to monitor and report air quality."),
+    ("AI-Powered Fraud Detection System", "Develop models to detect fraudulent transactions in financial systems."),
+    ("Embedded System for Autonomous Robots", "Design control software for robots performing autonomous tasks."),
+    ("Smart Inventory Management System", "Build a system that tracks inventory levels using IoT devices."),
+    ("AI-Based Traffic Sign Recognition", "Implement a computer vision system to recognize traffic signs for autonomous vehicles."),
+    ("Wearable Device for Sleep Monitoring", "Create a device that tracks sleep patterns and provides insights."),
+    ("Blockchain-Based Supply Chain Management", "Develop a blockchain solution to enhance supply chain transparency."),
+    ("AI-Powered Customer Support Chatbot", "Build a chatbot that handles customer queries with natural language understanding."),
+    ("Embedded System for Smart Thermostat", "Design firmware for a thermostat that learns user preferences."),
+    ("Machine Learning for Healthcare Diagnostics", "Implement ML models to assist in medical diagnosis."),
+    ("IoT-Enabled Smart Lighting System", "Create a lighting system that adjusts based on occupancy and daylight."),
+    ("AI-Based Image Captioning System", "Develop a system that generates captions for images automatically."),
+    ("Embedded System for Drone Delivery", "Design control software for drones delivering packages."),
+    ("Smart Water Management System", "Implement sensors and software to optimize water usage in agriculture."),
+    ("AI-Powered Social Media Analytics", "Build tools to analyze social media trends and sentiment."),
+    ("Embedded System for Industrial Automation", "Develop software for automating industrial processes."),
+    ("AI-Based Personalized Marketing Platform", "Create a platform that personalizes marketing campaigns."),
+    ("IoT-Enabled Smart Refrigerator", "Design a refrigerator that monitors contents and suggests shopping lists."),
+    ("Autonomous Lawn Mower Robot", "Develop control algorithms for a robot that mows lawns automatically."),
+    ("AI-Powered Speech Recognition System", "Implement a system that transcribes speech to text accurately."),
+    ("Embedded System for Smart Locks", "Create firmware for locks controlled via smartphones."),
+    ("Machine Learning for Stock Market Prediction", "Build models to predict stock price movements."),
+    ("IoT-Based Elderly Care System", "Design a system to monitor and assist elderly individuals at home."),
+    ("AI-Powered Video Surveillance", "Develop a system that detects suspicious activities in video feeds."),
+    ("Embedded System for Smart Bicycle", "Create software for a bicycle that tracks usage and location."),
+    ("Smart Retail Checkout System", "Implement a checkout system using computer vision and AI."),
+    ("AI-Based Disaster Response Coordination", "Build a platform to coordinate disaster response efforts."),
+    ("IoT-Enabled Smart Gym Equipment", "Design gym equipment that tracks workouts and provides feedback."),
+    ("Embedded System for Smart Agriculture Drone", "Develop control software for drones used in agriculture."),
+    ("AI-Powered Legal Document Analysis", "Create tools that analyze legal documents for key information."),
+    ("Smart City Traffic Management System", "Implement a system to optimize traffic flow in urban areas."),
+    ("AI-Based Personalized Nutrition App", "Build an app that provides nutrition advice based on user data."),
+    ("Embedded System for Smart Parking Meters", "Design firmware for parking meters that accept digital payments."),
+    ("IoT-Enabled Environmental Monitoring", "Create a sensor network to monitor environmental conditions."),
+    ("AI-Powered Music Recommendation System", "Develop a system that recommends music based on listening habits."),
+    ("Embedded System for Smart Alarm System", "Build software for an alarm system with remote monitoring."),
+    ("AI-Based Automated Essay Scoring", "Implement models that score essays automatically."),
+    ("IoT-Enabled Smart Trash Bins", "Design bins that monitor fill levels and optimize collection."),
+    ("AI-Powered Virtual Personal Trainer", "Create a virtual trainer that provides workout guidance."),
+    ("Embedded System for Smart Traffic Cameras", "Develop software for cameras that monitor traffic conditions.")
+]
+
+INTEREST_TOPICS = [
+    "AI", "Machine Learning", "Data Science", "Computer Vision", "Robotics",
+    "Natural Language Processing", "Cybersecurity", "Embedded Systems", "IoT",
+    "Cloud Computing", "AR/VR", "Mobile Apps", "Web Development", "Backend Systems",
+    "Frontend/UI", "Product Management", "Entrepreneurship", "Open Source",
+    "Education Tech", "Healthcare Tech", "Fintech", "Gaming", "Sustainability",
+    "Blockchain", "3D Printing"
+]
+
+WL_LOCATIONS = [
+    {"label": "Purdue Memorial Union", "latitude": 40.4236, "longitude": -86.9113},
+    {"label": "Engineering Fountain", "latitude": 40.4282, "longitude": -86.9136},
+    {"label": "France A. Cordova Recreational Sports Center (CoRec)", "latitude": 40.4276, "longitude": -86.9212},
+    {"label": "McCutcheon Hall", "latitude": 40.4248, "longitude": -86.9282},
+    {"label": "Cary Quadrangle", "latitude": 40.4287, "longitude": -86.9148},
+    {"label": "Earhart Hall", "latitude": 40.4302, "longitude": -86.9179},
+    {"label": "Windsor Halls", "latitude": 40.4241, "longitude": -86.9190},
+    {"label": "Hillenbrand Hall", "latitude": 40.4231, "longitude": -86.9280},
+    {"label": "First Street Towers", "latitude": 40.4210, "longitude": -86.9232},
+    {"label": "Honors College and Residences", "latitude": 40.4245, "longitude": -86.9215},
+    {"label": "Discovery Park", "latitude": 40.4189, "longitude": -86.9363},
+    {"label": "Neil Armstrong Hall of Engineering", "latitude": 40.4270, "longitude": -86.9147},
+    {"label": "Ross–Ade Stadium", "latitude": 40.4347, "longitude": -86.9165},
+    {"label": "Mackey Arena", "latitude": 40.4340, "longitude": -86.9160},
+    {"label": "Purdue University Airport", "latitude": 40.4123, "longitude": -86.9369},
+    {"label": "Tapawingo Park", "latitude": 40.4177, "longitude": -86.9023},
+    {"label": "Wabash Landing", "latitude": 40.4185, "longitude": -86.9054},
+    {"label": "Celery Bog Nature Area", "latitude": 40.4660, "longitude": -86.9365},
+    {"label": "Happy Hollow Park", "latitude": 40.4468, "longitude": -86.9111},
+    {"label": "Chauncey Village", "latitude": 40.4247, "longitude": -86.9086},
+    {"label": "Northwestern Ave & Stadium Ave", "latitude": 40.4315, "longitude": -86.9145},
+    {"label": "Village West Apartments", "latitude": 40.4309, "longitude": -86.9315},
+]
+
+def _jitter(lat, lon, max_delta=0.0008, rng=random):
+    return lat + rng.uniform(-max_delta, max_delta), lon + rng.uniform(-max_delta, max_delta)
+
+def _jittered(base, rng=random):
+    lat, lon = _jitter(base["latitude"], base["longitude"], rng=rng)
+    return {"label": base["label"], "latitude": lat, "longitude": lon}
+
+def _random_from_pool(pool, rng=random):
+    return _jittered(rng.choice(pool), rng)
+
+UIUC_LOCATIONS = [
+    {"label": "Grainger Engineering Library (UIUC)", "latitude": 40.1120, "longitude": -88.2262},
+    {"label": "Illini Union (UIUC)", "latitude": 40.1098, "longitude": -88.2272},
+    {"label": "Siebel Center for CS (UIUC)", "latitude": 40.1138, "longitude": -88.2249},
+]
+
+UMICH_LOCATIONS = [
+    {"label": "Michigan Union (UMich)", "latitude": 42.2767, "longitude": -83.7413},
+    {"label": "EECS Building (UMich)", "latitude": 42.2931, "longitude": -83.7133},
+]
+
+NORTHWESTERN_LOCATIONS = [
+    {"label": "Technological Institute (Northwestern)", "latitude": 42.0586, "longitude": -87.6751},
+    {"label": "Norris University Center (Northwestern)", "latitude": 42.0536, "longitude": -87.6773},
+]
+
+UCHICAGO_LOCATIONS = [
+    {"label": "Regenstein Library (UChicago)", "latitude": 41.7897, "longitude": -87.5997},
+    {"label": "Saieh Hall (UChicago)", "latitude": 41.7907, "longitude": -87.5988},
+]
+
+SKILL_OPTIONS = ["AI/ML", "Embedded Systems", "Electrical Engineering", "Full-Stack Development", "Data Science", "Computer Vision", "Cybersecurity", "Cloud Computing"]
+
+PERSON_TYPES = ["Dev", "Designer", "PM"]
+
+FIRST_NAMES = [name.split(" ")[0] for name in SAMPLE_NAMES]
+LAST_NAMES = list(dict.fromkeys(name.split(" ")[1] for name in SAMPLE_NAMES))
+
+# "campus" reproduces the original hand-placed layout (two UIUC users, one
+# each at UMich / Northwestern / UChicago, then West Lafayette spots without
+# replacement); the others are weighted draws over the campus pools.
+LOCATION_DISTRIBUTIONS = {
+    "campus": None,
+    "purdue": [(WL_LOCATIONS, 1.0)],
+    "midwest": [
+        (WL_LOCATIONS, 0.6),
+        (UIUC_LOCATIONS, 0.1),
+        (UMICH_LOCATIONS, 0.1),
+        (NORTHWESTERN_LOCATIONS, 0.1),
+        (UCHICAGO_LOCATIONS, 0.1),
+    ],
+}
+
+_CAMPUS_PREFIX = [UIUC_LOCATIONS, UIUC_LOCATIONS, UMICH_LOCATIONS, NORTHWESTERN_LOCATIONS, UCHICAGO_LOCATIONS]
+
+def user_rng(seed, index):
+    """Independent RNG stream for one user, so a record never depends on generation order."""
+    return random.Random((seed << 32) ^ index)
+
+SEED_TAG_LENGTH = 6
+_SEED_TAG_ALPHABET = string.digits + string.ascii_lowercase
+
+@functools.lru_cache(maxsize=None)
+def seed_tag(seed):
+    """Short lowercase tag derived from the seed, appended to every generated user ID."""
+    value = int.from_bytes(hashlib.blake2b(f"users/{seed}".encode(), digest_size=8).digest(), "big")
+    chars = []
+    for _ in range(SEED_TAG_LENGTH):
+        value, digit = divmod(value, len(_SEED_TAG_ALPHABET))
+        chars.append(_SEED_TAG_ALPHABET[digit])
+    return "".join(chars)
+
+def _base_identity(index):
+    if index < len(SAMPLE_NAMES):
+        name = SAMPLE_NAMES[index]
+        return name.lower().replace(" ", "_"), name
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return f"{first}_{last}_{index}".lower(), f"{first} {last}"
+
+def identity_for(seed, index):
+    """Deterministic (user_id, display name) for a population index.
+
+    The first len(SAMPLE_NAMES) users keep their original names; past
+    that, first and last names are recombined and the index is appended
+    to the ID so it stays unique. Every ID ends in the seed's tag, so
+    runs with different seeds never write (or delete) each other's users.
+    """
+    base, name = _base_identity(index)
+    return f"{base}_{seed_tag(seed)}", name
+
+_SAMPLE_IDS = {name.lower().replace(" ", "_") for name in SAMPLE_NAMES}
+
+def is_generated_user_id(user_id):
+    """True if `user_id` is one that identity_for() can produce for some seed
+    (or one of the untagged SAMPLE_NAMES IDs older seeders wrote)."""
+    if user_id in _SAMPLE_IDS:
+        return True
+    base, _, tag = user_id.rpartition("_")
+    if len(tag) != SEED_TAG_LENGTH or any(c not in _SEED_TAG_ALPHABET for c in tag):
+        return False
+    if base in _SAMPLE_IDS:
+        return True
+    _, _, suffix = base.rpartition("_")
+    if not suffix.isdigit():
+        return False
+    index = int(suffix)
+    return index >= len(SAMPLE_NAMES) and _base_identity(index)[0] == base
+
+POST_ID_ALPHABET = string.ascii_letters + string.digits
+POST_ID_LENGTH = 20
+
+def post_id_for(seed, index, k=0):
+    """Deterministic 20-character post ID (same shape as a Firestore auto-ID) for post k of user `index`."""
+    value = int.from_bytes(hashlib.blake2b(f"{seed}/{index}/{k}".encode(), digest_size=14).digest(), "big")
+    chars = []
+    for _ in range(POST_ID_LENGTH):
+        value, digit = divmod(value, len(POST_ID_ALPHABET))
+        chars.append(POST_ID_ALPHABET[digit])
+    return "".join(chars)
+
+def event_id_for(seed, index):
+    """Deterministic 20-character ID for synthetic event `index`."""
+    return post_id_for(seed, f"event{index}")
+
+def project_for(index):
+    """(title, description) for a user; repeats of a project get a topic edition suffix."""
+    title, description = TECH_PROJECTS[index % len(TECH_PROJECTS)]
+    edition = index // len(TECH_PROJECTS)
+    if edition:
+        title = f"{title} ({INTEREST_TOPICS[(edition - 1) % len(INTEREST_TOPICS)]} Edition)"
+    return title, description
+
+@functools.lru_cache(maxsize=None)
+def _wl_order(seed):
+    order = list(range(len(WL_LOCATIONS)))
+    random.Random(seed).shuffle(order)
+    return order
+
+def location_for(index, rng, distribution="campus", seed=0):
+    if distribution not in LOCATION_DISTRIBUTIONS:
+        raise ValueError(f"unknown location distribution {distribution!r}; "
+                         f"expected one of {sorted(LOCATION_DISTRIBUTIONS)}")
+    weighted = LOCATION_DISTRIBUTIONS[distribution]
+    if weighted is None:
+        if index < len(_CAMPUS_PREFIX):
+            return _random_from_pool(_CAMPUS_PREFIX[index], rng)
+        slot = index - len(_CAMPUS_PREFIX)
+        if slot < len(WL_LOCATIONS):
+            return _jittered(WL_LOCATIONS[_wl_order(seed)[slot]], rng)
+        return _random_from_pool(WL_LOCATIONS, rng)
+    pools, weights = zip(*weighted)
+    return _random_from_pool(rng.choices(pools, weights)[0], rng)
+
+def generate_population(num_users, posts_per_user=1, seed=0, distribution="campus", created_at=None, start=0):
+    """Yield (user_id, user_data, posts) for each synthetic user, in index order.
+
+    Records are plain dicts; Firestore-specific fields (GeoPoints, server
+    timestamps) are left to the caller. `start` skips the first users
+    without generating them, since each record depends only on its index.
+    """
+    for index in range(start, num_users):
+        rng = user_rng(seed, index)
+        user_id, name = identity_for(seed, index)
+        title, description = project_for(index)
+        location = location_for(index, rng, distribution, seed)
+        user_data = {
+            "displayName": name,
+            "email": f"{name}@purdue.edu",
+            "createdAt": created_at,
+            "ideaTitle": title,
+            "ideaDescription": description,
+            "likedPosts": [],
+            "passedPosts": [],
+            "lookingForCofounder": rng.choice([True, False]),
+            "numPeopleNeeded": rng.randint(1, 5),
+            "skillsNeeded": rng.sample(SKILL_OPTIONS, k=rng.randint(1, 3)),
+            "connections": [],
+            "location": location,
+            "interests": rng.sample(INTEREST_TOPICS, k=rng.randint(2, 4)),
+        }
+        posts = [{
+            "authorId": user_id,
+            "title": title,
+            "description": description,
+            "peopleNeeded": user_data["numPeopleNeeded"],
+            "lookingForCofounder": user_data["lookingForCofounder"],
+            "skillsNeeded": user_data["skillsNeeded"],
+            "location": location,
+            "personType": rng.choice(PERSON_TYPES),
+        } for _ in range(posts_per_user)]
+        yield user_id, user_data, posts
+
+EVENT_TYPES = ["Study Group", "Hackathon", "Pickup Basketball", "Coffee Chat", "Pitch Night", "Workshop",
+               "Networking Mixer", "Demo Day", "Board Games", "Career Fair Prep"]
+EVENT_HISTORY_DAYS = 30
+
+def generate_events(num_events, num_users, seed=0, distribution="campus", now_ms=None, start=0):
+    """Yield (event_id, event_data) for synthetic events hosted by generated users.
+
+    Fields mirror create-event.tsx (numPeople is a string, rsvps user
+    IDs); createdAt is epoch ms spread over the EVENT_HISTORY_DAYS before
+    `now_ms` (the caller converts it to a timestamp) and the location is
+    jittered around the host's own location.
+    """
+    if num_events > start and num_users < 1:
+        raise ValueError("events are hosted by generated users; num_users must be at least 1")
+    now_ms = now_ms if now_ms is not None else 0
+    for index in range(start, num_events):
+        rng = random.Random(f"{seed}/event/{index}")
+        host = rng.randrange(num_users)
+        host_id, _ = identity_for(seed, host)
+        place = _jittered(location_for(host, user_rng(seed, host), distribution, seed), rng)
+        rsvps = {identity_for(seed, rng.randrange(num_users))[0] for _ in range(rng.randint(0, 5))} - {host_id}
+        yield event_id_for(seed, index), {
+            "eventType": rng.choice(EVENT_TYPES),
+            "numPeople": str(rng.randint(2, 30)),
+            "location": {"latitude": place["latitude"], "longitude": place["longitude"]},
+            "locationName": place["label"],
+            "createdAt": now_ms - rng.randrange(EVENT_HISTORY_DAYS * 86_400_000),
+            "creatorId": host_id,
+            "rsvps": sorted(rsvps),
+        }
@@ -0,0 +1,150 @@
+"""
+Parallel, partitioned collection scanner for the generate/ maintenance jobs.
+
+A single `.stream()` is one serial cursor over the whole collection. This
+module splits a collection into key-range partitions and pages through
+each one on a thread pool:
+
+  - "partition" mode asks Firestore for split points (a PartitionQuery via
+    a collection-group query), which balances by actual document count;
+  - "id-range" mode splits the document-ID space on fixed character
+    boundaries, for backends without partition queries (the emulator);
+  - "auto" tries partition queries and falls back to ID ranges.
+
+Each partition is read in `page_size` pages with `start_after` cursors,
+and pages are handed to the caller through a bounded queue, so at most
+`max_buffered_pages` pages (plus one in flight per worker) are held in
+memory no matter how large the collection is. Documents come back in no
+particular order.
+
+    for doc in scan(db.collection("users"), fields=["likedPosts"]):
+        ...
+"""
+
+import queue
+import string
+import threading
+
+PAGE_SIZE = 500
+WORKERS = 8
+MAX_BUFFERED_PAGES = 4
+
+# Document IDs in this repo are auto-IDs ([0-9A-Za-z]) or snake_case names,
+# so boundaries drawn from this alphabet cover the ID space; the first and
+# last partitions are open-ended, so nothing outside it is missed either.
+ID_ALPHABET = "".join(sorted(string.digits + string.ascii_letters + "_"))
+
+_DONE = object()
+
+
+def id_range_bounds(partitions):
+    """Split the ID space into `partitions` [lo, hi) ranges; None means open-ended."""
+    partitions = max(1, min(partitions, len(ID_ALPHABET)))
+    step = len(ID_ALPHABET) / partitions
+    cuts = [ID_ALPHABET[round(i * step)] for i in range(1, partitions)]
+    bounds = [None] + cuts + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _id_range_queries(collection, partitions):
+    queries = []
+    for lo, hi in id_range_bounds(partitions):
+        query = collection.order_by("__name__")
+        if lo is not None:
+            query = query.where("__name__", ">=", collection.document(lo))
+        if hi is not None:
+            query = query.where("__name__", "<", collection.document(hi))
+        queries.append(query)
+    return queries
+
+
+def _partition_queries(collection, partitions):
+    group = collection._client.collection_group(collection.id)
+    return [p.query() for p in group.get_partitions(partitions)]
+
+
+def partition_queries(collection, partitions=WORKERS, mode="auto"):
+    """Return one query per key-range partition of `collection`."""
+    if mode not in ("auto", "partition", "id-range"):
+        raise ValueError(f"unknown partition mode {mode!r}")
+    if partitions <= 1:
+        return [collection.order_by("__name__")]
+    if mode == "id-range":
+        return _id_range_queries(collection, partitions)
+    try:
+        return _partition_queries(collection, partitions)
+    except Exception:
+        if mode == "partition":
+            raise
+        return _id_range_queries(collection, partitions)
+
+
+def iter_pages(query, page_size=PAGE_SIZE, fields=None):
+    """Yield lists of up to `page_size` snapshots, following `start_after` cursors."""
+    query = query.limit(page_size)
+    if fields is not None:
+        query = query.select(fields)
+    last = None
+    while True:
+        page = list((query.start_after(last) if last is not None else query).stream())
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+def scan(collection, page_size=PAGE_SIZE, workers=WORKERS, partitions=None, fields=None,
+         mode="auto", max_buffered_pages=MAX_BUFFERED_PAGES):
+    """Stream every document of `collection`, reading partitions in parallel.
+
+    `fields` is passed to `select()` (use [] for a keys-only scan). Stops
+    the workers cleanly if the caller abandons the iterator early.
+    """
+    queries = partition_queries(collection, partitions or workers, mode)
+    pages = queue.Queue(maxsize=max(1, max_buffered_pages))
+    stop = threading.Event()
+    pending = iter(queries)
+    pending_lock = threading.Lock()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            while not stop.is_set():
+                with pending_lock:
+                    query = next(pending, None)
+                if query is None:
+                    break
+                for page in iter_pages(query, page_size, fields):
+                    if not put(page):
+                        return
+        except BaseException as exc:  # surfaced to the consumer
+            put(exc)
+        finally:
+            put(_DONE)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(workers, len(queries)))]
+    for t in threads:
+        t.start()
+    try:
+        remaining = len(threads)
+        while remaining:
+            item = pages.get()
+            if item is _DONE:
+                remaining -= 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield from item
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
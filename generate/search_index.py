@@ -0,0 +1,416 @@
+"""
+Inverted search index over posts for search-projects.tsx.
+
+Every post is tokenized the way the client does it (lowercase, strip
+non-alphanumerics, drop stop words and 1-letter tokens) from its
+`title`, `description`, `skillsNeeded` and its author's `interests`.
+Each token is indexed under itself and under its prefixes of
+MIN_PREFIX..MAX_PREFIX characters, so a query for "reac" finds "react".
+
+The index lives in `searchIndex`, one document per (key, shard):
+
+    searchIndex/{key}~{shard:02d}  {"term": key, "shard": n, "postings": {postId: weight}}
+
+Each key gets its own shard count, the smallest power of two that keeps
+its shards near POSTINGS_PER_SHARD postings (at most MAX_SHARDS), chosen
+from its document frequency at rebuild time. Rare keys (almost all of
+them) live in one document; a key like "de" is spread over as many as
+it needs, so no shard approaches Firestore's 1 MiB document limit. A
+post lands in shard crc32(postId) % shards, which keeps the assignment
+stable for incremental updates; `searchIndex/_stats` holds the post
+count used for idf and the shard counts of the multi-shard keys. Only
+non-empty shards are written, so looking up a key with
+`where("term", "==", key)` reads min(df, shards) documents. `postings`
+is a large map read whole and never filtered on, so give it a
+single-field index exemption in the Firestore console.
+
+Incremental updates patch individual `postings.<postId>` fields with
+merge writes, so concurrent updates to one shard never overwrite each
+other. A shard emptied that way stays behind as an empty document until
+the next --rebuild.
+
+Each post also gets a compact `searchTokens` (its full tokens, heaviest
+first, capped at MAX_SEARCH_TOKENS; the index keys are derived from
+them) and a `searchVersion` hash of the (token, weight) pairs, so an
+unchanged post is never reindexed.
+
+Usage (from generate/):
+    python search_index.py --rebuild               # bulk (re)build from all posts
+    python search_index.py --posts ID [ID ...]     # reindex specific posts
+    python search_index.py --listen                # reindex posts as they change
+    python search_index.py --query "react native"  # ranked results + postings read
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from google.cloud.firestore import DELETE_FIELD
+from google.cloud.firestore_v1.transforms import Increment
+
+from batch_writer import BatchWriter
+from firestore_client import add_client_arguments, client_from_args
+from scanner import scan
+
+INDEX_COLLECTION = "searchIndex"
+STATS_DOC = "_stats"
+POSTINGS_PER_SHARD = 4000    # ~200 KB per shard doc, with room to grow until the next rebuild
+MAX_SHARDS = 256
+REBUILD_PARTITIONS = 16      # rebuild holds ~1/REBUILD_PARTITIONS of all postings in memory
+GET_ALL_CHUNK = 300
+MIN_PREFIX = 2
+MAX_PREFIX = 8
+PREFIX_DECAY = 0.5
+MAX_SEARCH_TOKENS = 100
+
+# Same stop words as search-projects.tsx.
+STOP = frozenset((
+    "the a an and or but if then else when at by for in of on to with from as is are was were be been "
+    "it this that these those i we you they he she them him her our your their my mine ours yours"
+).split())
+
+FIELD_WEIGHTS = {"title": 2.0, "description": 1.0, "skillsNeeded": 1.5, "interests": 0.5}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text):
+    return _SPACES.sub(" ", _NON_ALNUM.sub(" ", str(text).lower())).strip()
+
+
+def tokenize(text):
+    return [t for t in normalize(text).split(" ") if len(t) > 1 and t not in STOP]
+
+
+def token_weights(post, author_interests=()):
+    """{token: weight} for a post, heaviest first, capped at MAX_SEARCH_TOKENS."""
+    weights = defaultdict(float)
+    sources = {
+        "title": [post.get("title") or ""],
+        "description": [post.get("description") or ""],
+        "skillsNeeded": post.get("skillsNeeded") or [],
+        "interests": author_interests or [],
+    }
+    for field, values in sources.items():
+        for value in values:
+            for token in tokenize(value):
+                weights[token] += FIELD_WEIGHTS[field]
+    ranked = sorted(weights.items(), key=lambda kv: (-kv[1], kv[0]))[:MAX_SEARCH_TOKENS]
+    return {token: round(w, 3) for token, w in ranked}
+
+
+def index_keys(weights):
+    """Expand token weights to index-key weights: each token plus its prefixes."""
+    keys = {}
+    for token, w in weights.items():
+        keys[token] = max(keys.get(token, 0.0), w)
+        for n in range(MIN_PREFIX, min(len(token), MAX_PREFIX + 1)):
+            prefix = token[:n]
+            keys[prefix] = max(keys.get(prefix, 0.0), round(w * PREFIX_DECAY, 3))
+    return keys
+
+
+def search_version(weights):
+    digest = hashlib.blake2b(digest_size=8)
+    for token, w in weights.items():
+        digest.update(f"{token}={w};".encode())
+    return digest.hexdigest()
+
+
+def shard_count(df):
+    """Shards for a key with `df` postings: a power of two, at most MAX_SHARDS."""
+    shards = 1
+    while shards * POSTINGS_PER_SHARD < df and shards < MAX_SHARDS:
+        shards *= 2
+    return shards
+
+
+def shard_of(post_id, shards=1):
+    return zlib.crc32(post_id.encode()) % shards
+
+
+def shard_doc_id(key, shard):
+    return f"{key}~{shard:02d}"
+
+
+def _read_stats(index):
+    snap = index.document(STATS_DOC).get()
+    return (snap.to_dict() or {}) if snap.exists else {}
+
+
+# -- bulk rebuild ---------------------------------------------------------
+
+def _spill_postings(db, interests, writer, spills):
+    """Tokenize every post, append its (key, postId, weight) postings to the
+    spill file of the key's partition, and refresh stale searchTokens.
+    Returns (number of posts, document frequency per key)."""
+    df = Counter()
+    num_posts = 0
+    for doc in scan(db.collection("posts"), fields=[
+            "title", "description", "skillsNeeded", "authorId", "searchVersion"]):
+        data = doc.to_dict() or {}
+        weights = token_weights(data, interests.get(data.get("authorId"), ()))
+        for key, w in index_keys(weights).items():
+            df[key] += 1
+            spills[zlib.crc32(key.encode()) % len(spills)].write(f"{key}\t{doc.id}\t{w!r}\n")
+        version = search_version(weights)
+        if data.get("searchVersion") != version:
+            writer.update(db.collection("posts").document(doc.id),
+                          {"searchTokens": list(weights), "searchVersion": version})
+        num_posts += 1
+    return num_posts, df
+
+
+def rebuild(db, partitions=REBUILD_PARTITIONS):
+    """Rebuild the whole index.
+
+    Postings are spilled to temporary files partitioned by key, then each
+    partition is grouped into shard docs and written on its own, so only
+    one partition's postings are in memory at a time.
+    """
+    started = time.perf_counter()
+    interests = {doc.id: (doc.to_dict() or {}).get("interests") or []
+                 for doc in scan(db.collection("users"), fields=["interests"])}
+    index = db.collection(INDEX_COLLECTION)
+    stale = {doc.id for doc in scan(index, fields=[])} - {STATS_DOC}
+
+    written = 0
+    with tempfile.TemporaryDirectory(prefix="search-index-") as spill_dir, BatchWriter(db) as writer:
+        paths = [os.path.join(spill_dir, f"{p}.tsv") for p in range(partitions)]
+        spills = [open(path, "w") for path in paths]
+        try:
+            num_posts, df = _spill_postings(db, interests, writer, spills)
+        finally:
+            for spill in spills:
+                spill.close()
+        shard_counts = {key: n for key, d in df.items() if (n := shard_count(d)) > 1}
+        del df
+
+        for path in paths:
+            shards = defaultdict(dict)  # (key, shard) -> {postId: weight}
+            with open(path) as spill:
+                for line in spill:
+                    key, post_id, w = line.rstrip("\n").split("\t")
+                    shards[(key, shard_of(post_id, shard_counts.get(key, 1)))][post_id] = float(w)
+            os.remove(path)
+            for (key, shard), postings in shards.items():
+                doc_id = shard_doc_id(key, shard)
+                stale.discard(doc_id)
+                writer.set(index.document(doc_id), {"term": key, "shard": shard, "postings": postings})
+            written += len(shards)
+            del shards
+            writer.flush()
+
+        for doc_id in stale:
+            writer.delete(index.document(doc_id))
+        writer.set(index.document(STATS_DOC), {"numPosts": num_posts, "shardCounts": shard_counts})
+
+    print(f"🔎 Indexed {num_posts} posts into {written} shard docs ({len(shard_counts)} multi-shard keys, "
+          f"{len(stale)} stale removed) in {time.perf_counter() - started:.2f}s")
+    return num_posts, written
+
+
+# -- incremental updates --------------------------------------------------
+
+def _keys_holding(index, post_id, shard_counts):
+    """Index keys whose shard holds `post_id`, found by reading every shard it could be in (slow path)."""
+    candidates = sorted({shard_of(post_id, n) for n in {1, *shard_counts.values()}})
+    keys = set()
+    for doc in index.where("shard", "in", candidates).stream():
+        data = doc.to_dict() or {}
+        key = data.get("term")
+        if data.get("shard") == shard_of(post_id, shard_counts.get(key, 1)) and post_id in (data.get("postings") or {}):
+            keys.add(key)
+    return keys
+
+
+def load_interests(db, author_ids, author_interests):
+    """Fill `author_interests` for the `author_ids` it lacks, with batched get_all reads."""
+    users = db.collection("users")
+    missing = sorted({a for a in author_ids if a and a not in author_interests})
+    for start in range(0, len(missing), GET_ALL_CHUNK):
+        refs = [users.document(a) for a in missing[start:start + GET_ALL_CHUNK]]
+        for snap in db.get_all(refs, field_paths=["interests"]):
+            author_interests[snap.id] = ((snap.to_dict() or {}).get("interests") or []) if snap.exists else []
+    for author in missing:
+        author_interests.setdefault(author, [])
+
+
+def reindex_posts(db, posts, writer, removed=(), author_interests=None):
+    """Bring the index up to date for `posts` ({postId: data}).
+
+    Posts in `removed` are dropped from the index; their `data` is the
+    last known document (a REMOVED change still carries it) or None.
+    Authors missing from `author_interests` are loaded in batches first,
+    then posts whose `searchVersion` is current are skipped. Old keys
+    are derived from the stored `searchTokens`, and each changed posting
+    is written as a single merged `postings.<postId>` field (DELETE_FIELD
+    for dropped keys), without reading the shard docs. Returns the number
+    of posts whose index entries changed.
+    """
+    author_interests = {} if author_interests is None else author_interests
+    index = db.collection(INDEX_COLLECTION)
+    shard_counts = _read_stats(index).get("shardCounts") or {}
+    load_interests(db, (data.get("authorId") for pid, data in posts.items() if pid not in removed and data),
+                   author_interests)
+    changed = 0
+    count_delta = 0
+
+    for post_id, data in posts.items():
+        old_tokens = (data or {}).get("searchTokens")
+        old_keys = set(index_keys(dict.fromkeys(old_tokens or (), 1.0)))
+        if post_id in removed:
+            if data is None:
+                old_keys = _keys_holding(index, post_id, shard_counts)
+            if not old_keys:
+                continue
+            new_keys = {}
+            count_delta -= 1
+        else:
+            weights = token_weights(data, author_interests.get(data.get("authorId"), ()))
+            version = search_version(weights)
+            if data.get("searchVersion") == version:
+                continue
+            if old_tokens is None:
+                count_delta += 1
+            new_keys = index_keys(weights)
+            writer.update(db.collection("posts").document(post_id),
+                          {"searchTokens": list(weights), "searchVersion": version})
+
+        for key in old_keys - set(new_keys):
+            doc_id = shard_doc_id(key, shard_of(post_id, shard_counts.get(key, 1)))
+            writer.set(index.document(doc_id), {"postings": {post_id: DELETE_FIELD}}, merge=True)
+        for key, w in new_keys.items():
+            shard = shard_of(post_id, shard_counts.get(key, 1))
+            writer.set(index.document(shard_doc_id(key, shard)),
+                       {"term": key, "shard": shard, "postings": {post_id: w}}, merge=True)
+        changed += 1
+
+    if count_delta:
+        writer.set(index.document(STATS_DOC), {"numPosts": Increment(count_delta)}, merge=True)
+    writer.flush()
+    return changed
+
+
+def reindex_post_ids(db, post_ids):
+    posts, removed = {}, set()
+    for pid in post_ids:
+        snap = db.collection("posts").document(pid).get()
+        posts[pid] = snap.to_dict() if snap.exists else None
+        if not snap.exists:
+            removed.add(pid)
+    with BatchWriter(db) as writer:
+        changed = reindex_posts(db, posts, writer, removed)
+    print(f"🔎 Reindexed {changed} of {len(post_ids)} posts")
+    return changed
+
+
+def listen(db):
+    """Reindex posts as they change. Author `interests` edits are picked up by the next --rebuild."""
+    writer = BatchWriter(db)
+    lock = threading.Lock()
+
+    def on_posts(_snapshot, changes, _read_time):
+        with lock:
+            posts, removed = {}, set()
+            for change in changes:
+                posts[change.document.id] = change.document.to_dict()
+                if change.type.name == "REMOVED":
+                    removed.add(change.document.id)
+            changed = reindex_posts(db, posts, writer, removed)
+            if changed:
+                print(f"🔄 {len(changes)} post change(s) → {changed} reindexed")
+
+    return writer, db.collection("posts").on_snapshot(on_posts)
+
+
+# -- querying -------------------------------------------------------------
+
+@dataclass
+class QueryStats:
+    terms: int = 0
+    shard_docs_read: int = 0
+    postings_read: int = 0
+    elapsed_s: float = 0.0
+
+
+def _postings_for(index, key, stats):
+    postings = {}
+    for doc in index.where("term", "==", key).stream():
+        entries = (doc.to_dict() or {}).get("postings") or {}
+        stats.shard_docs_read += 1
+        stats.postings_read += len(entries)
+        postings.update(entries)
+    return postings
+
+
+def search(db, query, limit=20):
+    """Rank posts for `query` from the index; returns ([(postId, score), ...], QueryStats)."""
+    started = time.perf_counter()
+    index = db.collection(INDEX_COLLECTION)
+    stats = QueryStats()
+    stats_doc = index.document(STATS_DOC).get()
+    num_posts = max((stats_doc.to_dict() or {}).get("numPosts", 1) if stats_doc.exists else 1, 1)
+
+    scores = defaultdict(float)
+    for token in dict.fromkeys(tokenize(query)):
+        stats.terms += 1
+        postings = _postings_for(index, token, stats)
+        if not postings and len(token) > MAX_PREFIX:
+            # A partially typed long word only exists in the index as its longest prefix.
+            postings = _postings_for(index, token[:MAX_PREFIX], stats)
+        idf = math.log((num_posts + 1) / (len(postings) + 1)) + 1
+        for post_id, w in postings.items():
+            scores[post_id] += w * idf
+
+    ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+    stats.elapsed_s = time.perf_counter() - started
+    return ranked, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rebuild", action="store_true", help="rebuild the whole index from all posts")
+    mode.add_argument("--posts", nargs="+", metavar="ID", help="reindex these posts")
+    mode.add_argument("--listen", action="store_true", help="reindex posts as they change (Ctrl-C to stop)")
+    mode.add_argument("--query", help="run a query against the index and report postings read")
+    parser.add_argument("--limit", type=int, default=20)
+    add_client_arguments(parser)
+    args = parser.parse_args()
+
+    db = client_from_args(args)
+
+    if args.rebuild:
+        rebuild(db)
+    elif args.posts:
+        reindex_post_ids(db, args.posts)
+    elif args.query:
+        results, stats = search(db, args.query, args.limit)
+        for post_id, score in results:
+            print(f"  {score:7.3f}  {post_id}")
+        print(f"📊 {stats.terms} terms, {stats.shard_docs_read} shard docs, "
+              f"{stats.postings_read} postings read in {stats.elapsed_s * 1000:.1f}ms")
+    else:
+        writer, watch = listen(db)
+        print("👂 Listening for post changes (Ctrl-C to stop)...")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watch.unsubscribe()
+            writer.close()
+
+
+if __name__ == "__main__":
+    main()
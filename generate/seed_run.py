@@ -0,0 +1,125 @@
+"""
+Checkpoints and ID manifests for resumable seed runs.
+
+A run is identified by its generation parameters (seed, users, posts per
+user, locations, extended cap, events); because every user, post and
+event ID is derived from those (population.identity_for / post_id_for /
+event_id_for), rerunning the same parameters writes exactly the same
+documents.
+
+SeedCheckpoint records, per phase, which fixed-size chunks of work have
+been committed, plus the run's createdAt so a resumed run writes
+byte-identical user documents. A rerun skips committed chunks and
+rewrites the rest with `set` / `update`, which is idempotent.
+
+The manifest lists every document path a run writes, one per line after
+a JSON header:
+
+    {"format": "tava-seed-manifest", "version": 1, "run": {...}}
+    users/alice_johnson_bgg8fv
+    posts/3kT0aZ...
+    events/Qm81cV...
+    ...
+
+It is written before the first document, so even an interrupted run can
+be removed precisely with `delete_dummies.py --manifest`.
+"""
+
+import json
+import os
+
+MANIFEST_FORMAT = "tava-seed-manifest"
+MANIFEST_VERSION = 1
+
+
+def run_id(params):
+    run = f"seed{params['seed']}-u{params['users']}-p{params['postsPerUser']}-{params['locations']}"
+    if params.get("maxExtended") is not None:
+        run += f"-x{params['maxExtended']}"
+    if params.get("events"):
+        run += f"-e{params['events']}"
+    return run
+
+
+class SeedCheckpoint:
+    """Committed-chunk bookkeeping for one run; with `path=None` nothing is persisted."""
+
+    def __init__(self, path, params, created_at):
+        self.path = path
+        self.state = {"run": params, "createdAt": created_at, "phases": {}}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("run") != params:
+                raise SystemExit(f"{path} belongs to a different run ({saved.get('run')}); "
+                                 f"delete it or rerun with those parameters")
+            self.state = saved
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    @property
+    def created_at(self):
+        return self.state["createdAt"]
+
+    def _phase(self, phase):
+        return self.state["phases"].setdefault(phase, {"chunks": [], "done": False})
+
+    def is_done(self, phase, chunk=None):
+        entry = self.state["phases"].get(phase)
+        if entry is None:
+            return False
+        return entry["done"] or (chunk is not None and chunk in entry["chunks"])
+
+    def completed(self, phase):
+        entry = self.state["phases"].get(phase)
+        return 0 if entry is None else len(entry["chunks"])
+
+    def mark(self, phase, chunk):
+        self._phase(phase)["chunks"].append(chunk)
+        self._save()
+
+    def finish(self, phase):
+        entry = self._phase(phase)
+        entry["done"] = True
+        entry["chunks"] = []
+        self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+def write_manifest(path, params, user_ids, post_ids, event_ids=()):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"format": MANIFEST_FORMAT, "version": MANIFEST_VERSION, "run": params}) + "\n")
+        for uid in user_ids:
+            f.write(f"users/{uid}\n")
+        for pid in post_ids:
+            f.write(f"posts/{pid}\n")
+        for eid in event_ids:
+            f.write(f"events/{eid}\n")
+    os.replace(tmp, path)
+
+
+def read_manifest(path):
+    """Return (run params, user IDs, post IDs, event IDs) from a manifest file."""
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"{path} is not a {MANIFEST_FORMAT} file")
+        if header.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"{path} has manifest version {header.get('version')}, expected {MANIFEST_VERSION}")
+        ids = {"users": set(), "posts": set(), "events": set()}
+        for line in f:
+            collection, _, doc_id = line.rstrip("\n").partition("/")
+            if collection not in ids:
+                raise ValueError(f"{path}: unexpected manifest entry {line.strip()!r}")
+            ids[collection].add(doc_id)
+    return header["run"], ids["users"], ids["posts"], ids["events"]
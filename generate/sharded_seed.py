@@ -0,0 +1,237 @@
+"""
+Multi-process seeding for multi-million-user datasets.
+
+`add_dummy_users.py --workers N` lands here. The user index space is cut
+into fixed shards of SHARD_SIZE users; every shard's records come from
+per-user RNGs (population.user_rng) and its likes/passes from an RNG
+stream derived from (seed, shard) (sample_shard_interactions), so the
+dataset is identical for any worker count, and identical to the
+single-process seeder for the same seed. Shards are small and handed to
+the pool one at a time, so every worker stays busy even for a few
+hundred thousand users.
+
+  1. Workers generate each shard's users and posts and write them,
+     likes/passes included, straight from their own Firestore client.
+     They return only the shard's compact edge lists (liker index, liked
+     post index, and the same for passes).
+  2. The coordinator concatenates the edges, builds the global
+     ConnectionGraph and per-post liker/passer lists, and forks a second
+     pool that inherits them.
+  3. Workers write the derived fields for their shard: connections for
+     its users and likedBy / passedBy for its posts.
+
+Each process opens its own client, so the backend must be reachable from
+all of them (firebase or the emulator; not memory). The pools use fork,
+which the coordinator allows by never opening a client itself. Worker
+clients are InstrumentedClients; each task returns its RPC counters,
+which the coordinator merges into the run's metrics and report.
+"""
+
+import multiprocessing
+import os
+import time
+
+import numpy as np
+from firebase_admin import firestore
+
+from add_dummy_users import geo_fields, interaction_fields, num_shards, sample_shard_interactions, shard_bounds
+from batch_writer import BatchWriter
+from connection_graph import ConnectionGraph, connection_fields
+from instrumentation import InstrumentedClient, Metrics, Progress
+from population import generate_population, identity_for, post_id_for
+from seed_run import SeedCheckpoint, run_id, write_manifest
+
+# Per-process state, set by the pool initializers.
+_db = None
+_job = None
+_derived = None
+
+
+def _init_worker(client_factory, job):
+    global _db, _job
+    _db = InstrumentedClient(client_factory())
+    _job = job
+
+
+def _init_derived_worker(client_factory, job, derived):
+    global _derived
+    _init_worker(client_factory, job)
+    _derived = derived
+
+
+def _post_id(index, posts_per_user):
+    return post_id_for(_job["seed"], index // posts_per_user, index % posts_per_user)
+
+
+def seed_shard(shard, write=True):
+    """Write one shard's users and posts; return (shard, edges, writer stats, RPC metrics).
+
+    With `write=False` (a shard a resumed run already committed) only the
+    edges are recomputed.
+    """
+    job = _job
+    n, ppu = job["users"], job["postsPerUser"]
+    lo, hi = shard_bounds(n, shard)
+    picks, like_k, pass_k = sample_shard_interactions(n, ppu, job["seed"], shard)
+    slots = np.arange(picks.shape[1])
+    liked_mask = slots < like_k[:, None]
+    passed_mask = (slots >= like_k[:, None]) & (slots < (like_k + pass_k)[:, None])
+    rows = np.arange(lo, hi, dtype=np.int64)[:, None]
+    edges = {
+        "likeUser": np.broadcast_to(rows, picks.shape)[liked_mask],
+        "likePost": picks[liked_mask],
+        "passUser": np.broadcast_to(rows, picks.shape)[passed_mask],
+        "passPost": picks[passed_mask],
+    }
+    if not write:
+        return shard, edges, None, None
+
+    writer = BatchWriter(_db)
+    population = generate_population(hi, ppu, job["seed"], job["locations"], job["createdAt"], start=lo)
+    for r, (user_id, user_data, posts) in enumerate(population):
+        liked_idx = picks[r, :like_k[r]]
+        passed_idx = picks[r, like_k[r]:like_k[r] + pass_k[r]]
+        liked_users = [identity_for(job["seed"], a)[0] for a in np.unique(liked_idx // ppu)]
+        passed_users = [identity_for(job["seed"], a)[0] for a in np.unique(passed_idx // ppu)]
+        geo = geo_fields(user_data["location"])
+        user_data.update(geo)
+        user_data.update(interaction_fields([_post_id(p, ppu) for p in liked_idx],
+                                            [_post_id(p, ppu) for p in passed_idx],
+                                            liked_users, passed_users))
+        writer.set(_db.collection("users").document(user_id), user_data)
+        for k, post_data in enumerate(posts):
+            post_data["createdAt"] = firestore.SERVER_TIMESTAMP
+            post_data.update(geo)
+            writer.set(_db.collection("posts").document(post_id_for(job["seed"], lo + r, k)), post_data)
+    writer.close()
+    return shard, edges, writer.stats(), _db.metrics.drain()
+
+
+def write_derived(shard):
+    """Write connections for one shard's users and likedBy / passedBy for its posts;
+    return (shard, writer stats, RPC metrics)."""
+    job, derived = _job, _derived
+    n, ppu = job["users"], job["postsPerUser"]
+    lo, hi = shard_bounds(n, shard)
+    user_ids = derived["userIds"]
+    writer = BatchWriter(_db)
+    for u, direct, extended in derived["graph"].connections_for(user_ids[lo:hi], job["maxExtended"]):
+        writer.update(_db.collection("users").document(u), connection_fields(direct, extended))
+    liked_ptr, likers = derived["likedBy"]
+    passed_ptr, passers = derived["passedBy"]
+    for p in range(lo * ppu, hi * ppu):
+        writer.update(_db.collection("posts").document(_post_id(p, ppu)), {
+            "likedBy": user_ids[likers[liked_ptr[p]:liked_ptr[p + 1]]].tolist(),
+            "passedBy": user_ids[passers[passed_ptr[p]:passed_ptr[p + 1]]].tolist(),
+        })
+    writer.close()
+    return shard, writer.stats(), _db.metrics.drain()
+
+
+def _group_by_post(users, posts, num_posts):
+    """CSR-style (indptr, user indices) of each post's users, in user-index order."""
+    order = np.argsort(posts, kind="stable")
+    indptr = np.zeros(num_posts + 1, dtype=np.int64)
+    np.cumsum(np.bincount(posts, minlength=num_posts), out=indptr[1:])
+    return indptr, users[order]
+
+
+def _add_stats(total, stats):
+    for key, value in stats.items():
+        if key != "elapsedS":
+            total[key] = total.get(key, 0) + value
+
+
+def add_dummy_users_sharded(client_factory, num_users, posts_per_user, seed, distribution="campus",
+                            max_extended=None, workers=None, report_path=None, progress=True, resumable=False):
+    """Seed like add_dummy_users_and_posts(), spread over `workers` processes.
+
+    `client_factory` is a picklable callable returning a Firestore client;
+    each worker process calls it once.
+    """
+    workers = workers or os.cpu_count()
+    metrics = Metrics()
+    params = {"seed": seed, "users": num_users, "postsPerUser": posts_per_user,
+              "locations": distribution, "maxExtended": max_extended}
+    run = run_id(params)
+    shards = num_shards(num_users)
+    print(f"🌱 Seeding {num_users} users x {posts_per_user} posts (seed={seed}, locations={distribution}, run={run}) "
+          f"in {shards} shards on {workers} workers")
+
+    checkpoint = SeedCheckpoint(f"{run}.checkpoint.json" if resumable else None, params,
+                                int(time.time() * 1000))
+    if resumable:
+        manifest = f"{run}.manifest"
+        if not os.path.exists(manifest):
+            write_manifest(manifest, params, (identity_for(seed, i)[0] for i in range(num_users)),
+                           (post_id_for(seed, i, k) for i in range(num_users) for k in range(posts_per_user)))
+        print(f"💾 Checkpoint {checkpoint.path}, manifest {manifest}")
+    job = {**params, "createdAt": checkpoint.created_at}
+    writes = {}
+    # fork: the derived-field pool inherits the graph instead of pickling it per worker.
+    context = multiprocessing.get_context("fork")
+
+    with metrics.phase("users+posts"), Progress("users", num_users, enabled=progress) as bar:
+        parts = [None] * shards
+        tasks = [(shard, not checkpoint.is_done("shards", shard)) for shard in range(shards)]
+        with context.Pool(workers, _init_worker, (client_factory, job)) as pool:
+            for shard, edges, stats, rpcs in pool.imap_unordered(_seed_shard_task, tasks):
+                parts[shard] = edges
+                if stats is not None:
+                    _add_stats(writes, stats)
+                    metrics.merge(rpcs)
+                    if checkpoint.enabled:
+                        checkpoint.mark("shards", shard)
+                lo, hi = shard_bounds(num_users, shard)
+                bar.advance(hi - lo)
+        if checkpoint.enabled:
+            checkpoint.finish("shards")
+
+    with metrics.phase("graph"):
+        edges = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+        del parts
+        user_ids = np.array([identity_for(seed, i)[0] for i in range(num_users)], dtype=object)
+        src = np.concatenate([edges["likeUser"], edges["passUser"]])
+        dst = np.concatenate([edges["likePost"], edges["passPost"]]) // max(posts_per_user, 1)
+        derived = {
+            "userIds": user_ids,
+            "graph": ConnectionGraph.from_edges(user_ids, src, dst),
+            "likedBy": _group_by_post(edges["likeUser"], edges["likePost"], num_users * posts_per_user),
+            "passedBy": _group_by_post(edges["passUser"], edges["passPost"], num_users * posts_per_user),
+        }
+        del edges, src, dst
+
+    with metrics.phase("derived fields"), Progress("derived", num_users, enabled=progress) as bar:
+        pending = []
+        for shard in range(shards):
+            if checkpoint.is_done("derived", shard):
+                lo, hi = shard_bounds(num_users, shard)
+                bar.advance(hi - lo)
+            else:
+                pending.append(shard)
+        with context.Pool(workers, _init_derived_worker, (client_factory, job, derived)) as pool:
+            for shard, stats, rpcs in pool.imap_unordered(write_derived, pending):
+                _add_stats(writes, stats)
+                metrics.merge(rpcs)
+                if checkpoint.enabled:
+                    checkpoint.mark("derived", shard)
+                lo, hi = shard_bounds(num_users, shard)
+                bar.advance(hi - lo)
+        if checkpoint.enabled:
+            checkpoint.finish("derived")
+
+    elapsed = metrics.elapsed
+    written = writes.get("writesCommitted", 0)
+    print(f"✅ All writes committed: {written} docs in {writes.get('commits', 0)} commits "
+          f"({writes.get('retries', 0)} retries) in {elapsed:.2f}s → {written / elapsed:,.0f} docs/sec")
+    print(f"📊 {metrics.summary()}")
+    if report_path:
+        metrics.write_report(report_path, job="seed", run=run, workers=workers, shards=shards, writer=writes,
+                             params={**params, "resumable": resumable})
+        print(f"📝 Run report written to {report_path}")
+
+    print(f"\n🎉 Done! {num_users} users + {num_users*posts_per_user} posts added, with likes/passes and connections.")
+
+
+def _seed_shard_task(task):
+    return seed_shard(*task)
@@ -0,0 +1,165 @@
+"""
+Line-delimited snapshot files for seed datasets.
+
+A snapshot is a UTF-8 text file with one JSON object per line:
+
+    {"format": "tava-snapshot", "version": 1, "meta": {...}}     header
+    {"op": "set", "path": "users/alice_johnson", "data": {...}}
+    {"op": "update", "path": "posts/abc123", "data": {...}}
+    ...
+
+Records are replayed in file order. SnapshotWriter coalesces writes per
+document the same way BatchWriter does, so a seed run that sets a
+document and later updates it usually produces a single "set" line.
+Values Firestore can't express in JSON are tagged:
+
+    {"__geo__": [lat, lon]}          GeoPoint
+    {"__server_timestamp__": true}   SERVER_TIMESTAMP
+    {"__timestamp__": "<ISO 8601>"}  Timestamp (timezone-aware datetime)
+
+Files are uncompressed so read_snapshot() can memory-map them and
+stream records without loading the file.
+"""
+
+import datetime
+import json
+import mmap
+import time
+from collections import OrderedDict
+
+from google.cloud.firestore import SERVER_TIMESTAMP, GeoPoint
+
+FORMAT = "tava-snapshot"
+VERSION = 1
+MAX_PENDING = 50_000
+
+_GEO = "__geo__"
+_SERVER_TIMESTAMP = "__server_timestamp__"
+_TIMESTAMP = "__timestamp__"
+
+
+def _encode_value(value):
+    if isinstance(value, dict):
+        return {k: _encode_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    if isinstance(value, GeoPoint):
+        return {_GEO: [value.latitude, value.longitude]}
+    if value is SERVER_TIMESTAMP:
+        return {_SERVER_TIMESTAMP: True}
+    if isinstance(value, datetime.datetime):
+        return {_TIMESTAMP: value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if _GEO in value and len(value) == 1:
+            return GeoPoint(*value[_GEO])
+        if _SERVER_TIMESTAMP in value and len(value) == 1:
+            return SERVER_TIMESTAMP
+        if _TIMESTAMP in value and len(value) == 1:
+            return datetime.datetime.fromisoformat(value[_TIMESTAMP])
+        return {k: _decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+class SnapshotWriter:
+    """Drop-in replacement for BatchWriter that writes a snapshot file instead of Firestore."""
+
+    def __init__(self, path, meta=None, max_pending=MAX_PENDING):
+        self.path = path
+        self.max_pending = max_pending
+        self._file = open(path, "w", encoding="utf-8")
+        self._pending = OrderedDict()  # doc path -> [op, data]
+        self._file.write(json.dumps({"format": FORMAT, "version": VERSION, "meta": meta or {}}) + "\n")
+
+        self.ops_queued = 0
+        self.writes_committed = 0
+        self._started = time.perf_counter()
+
+    def set(self, ref, data):
+        self._queue(ref.path, "set", dict(data))
+
+    def update(self, ref, data):
+        self._queue(ref.path, "update", dict(data))
+
+    def delete(self, ref):
+        self._queue(ref.path, "delete", None)
+
+    def _queue(self, path, op, data):
+        self.ops_queued += 1
+        current = self._pending.get(path)
+        if current is None or op != "update":
+            self._pending[path] = [op, data]
+        elif current[0] == "delete":
+            raise ValueError(f"cannot update {path}: it is queued for deletion")
+        else:
+            current[1].update(data)
+        while len(self._pending) > self.max_pending:
+            self._emit(*self._pending.popitem(last=False))
+
+    def _emit(self, path, entry):
+        op, data = entry
+        record = {"op": op, "path": path}
+        if data is not None:
+            record["data"] = _encode_value(data)
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.writes_committed += 1
+
+    def flush(self):
+        while self._pending:
+            self._emit(*self._pending.popitem(last=False))
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def stats(self):
+        return {
+            "opsQueued": self.ops_queued,
+            "recordsWritten": self.writes_committed,
+            "path": self.path,
+            "elapsedS": round(self.elapsed, 3),
+        }
+
+    def summary(self):
+        return (f"{self.writes_committed} records ({self.ops_queued} ops queued) "
+                f"written to {self.path} in {self.elapsed:.2f}s")
+
+
+def read_header(path):
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+    if header.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a {FORMAT} file")
+    if header.get("version") != VERSION:
+        raise ValueError(f"{path} has snapshot version {header.get('version')}, expected {VERSION}")
+    return header
+
+
+def read_snapshot(path):
+    """Yield (op, doc_path, data) for every record, streaming from a memory map."""
+    read_header(path)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.readline()  # header
+        for line in iter(mm.readline, b""):
+            record = json.loads(line)
+            data = record.get("data")
+            if data is not None:
+                data = _decode_value(data)
+            yield record["op"], record["path"], data
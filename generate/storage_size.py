@@ -0,0 +1,43 @@
+"""
+Firestore storage sizes (https://firebase.google.com/docs/firestore/storage-size).
+
+Shared by InstrumentedClient (write bytes per operation), BatchWriter
+(cutting commits below the request size limit) and MemoryFirestore
+(enforcing that limit in-process).
+"""
+
+import datetime
+
+MAX_REQUEST_BYTES = 10 * 1024 * 1024   # Firestore / emulator limit per commit request
+
+
+def _str_size(value):
+    return (len(value) if value.isascii() else len(value.encode("utf-8"))) + 1
+
+
+def value_size(value):
+    """Storage size of a field value."""
+    kind = type(value)
+    if kind is str:
+        return _str_size(value)
+    if kind is list or kind is tuple:
+        return sum(map(value_size, value))
+    if kind is dict:
+        return sum(_str_size(str(k)) + value_size(v) for k, v in value.items())
+    if value is None or kind is bool:
+        return 1
+    if isinstance(value, (int, float, datetime.datetime)):
+        return 8
+    if isinstance(value, bytes):
+        return len(value)
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):
+        return 16
+    if hasattr(value, "path"):  # DocumentReference
+        return len(value.path.encode("utf-8")) + 16
+    return 8  # sentinels (SERVER_TIMESTAMP, DELETE_FIELD, transforms)
+
+
+def document_size(path, data):
+    """Document name + fields + the fixed 32 byte overhead."""
+    name = sum(len(part.encode("utf-8")) + 1 for part in path.split("/")) + 16
+    return name + (value_size(data) if data else 0) + 32
@@ -0,0 +1,87 @@
+"""
+ConnectionMaintainer's incremental fields must match a from-scratch ConnectionGraph.
+
+Run from generate/:  python -m pytest -q test_connection_maintainer.py
+"""
+
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from connection_graph import ConnectionGraph
+from connection_maintainer import ConnectionMaintainer
+from memory_firestore import MemoryFirestore
+
+NUM_USERS = 40
+NUM_POSTS = 60
+LATE_POSTS = 10
+STEPS = 400
+
+
+def _change(doc_id, data, kind="ADDED"):
+    document = SimpleNamespace(id=doc_id, to_dict=lambda: data)
+    return SimpleNamespace(document=document, type=SimpleNamespace(name=kind))
+
+
+def _expected(db, authors, max_extended):
+    """(connections, extendedConnections) per user, rebuilt from the stored documents."""
+    users = {doc.id: doc.to_dict() for doc in db.collection("users").stream()}
+    user_ids = sorted(users)
+    index = {uid: i for i, uid in enumerate(user_ids)}
+    src, dst = [], []
+    for uid, data in users.items():
+        targets = set(data.get("liked") or [])
+        targets |= {authors[pid] for pid in data.get("likedPosts") or [] if pid in authors}
+        for target in targets:
+            if target in index:
+                src.append(index[uid])
+                dst.append(index[target])
+    graph = ConnectionGraph.from_edges(np.array(user_ids, dtype=object), src, dst)
+    return {uid: (direct, extended) for uid, direct, extended in graph.iter_user_connections(max_extended)}
+
+
+@pytest.mark.parametrize("max_extended", [None, 3])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_incremental_matches_connection_graph(seed, max_extended):
+    rng = random.Random(seed)
+    db = MemoryFirestore()
+    maintainer = ConnectionMaintainer(db, max_extended)
+    user_ids = [f"user{i:02d}" for i in range(NUM_USERS)]
+    post_ids = [f"post{i:02d}" for i in range(NUM_POSTS)]
+    authors = {pid: rng.choice(user_ids) for pid in post_ids}
+    late = set(post_ids[-LATE_POSTS:])
+    for pid in post_ids:
+        if pid not in late:
+            maintainer.apply_post(pid, {"authorId": authors[pid]})
+
+    for step in range(STEPS):
+        if step == STEPS // 2:
+            # Authors that arrive after the likes on their posts.
+            maintainer.on_posts(None, [_change(pid, {"authorId": authors[pid]}) for pid in sorted(late)], None)
+        uid = rng.choice(user_ids)
+        ref = db.collection("users").document(uid)
+        snapshot = ref.get()
+        if snapshot.exists and rng.random() < 0.1:
+            ref.delete()
+            maintainer.on_users(None, [_change(uid, snapshot.to_dict(), "REMOVED")], None)
+            continue
+        data = snapshot.to_dict() or {"name": uid}
+        liked, liked_posts = set(data.get("liked") or []), set(data.get("likedPosts") or [])
+        if rng.random() < 0.7:
+            liked.add(rng.choice(user_ids)) if rng.random() < 0.5 else liked_posts.add(rng.choice(post_ids))
+        elif liked and rng.random() < 0.5:
+            liked.discard(rng.choice(sorted(liked)))
+        elif liked_posts:
+            liked_posts.discard(rng.choice(sorted(liked_posts)))
+        data.update(liked=sorted(liked), likedPosts=sorted(liked_posts))
+        ref.set(data)
+        maintainer.on_users(None, [_change(uid, data, "MODIFIED" if snapshot.exists else "ADDED")], None)
+
+    maintainer.writer.close()
+    known = {pid: author for pid, author in authors.items() if pid in maintainer.post_author}
+    expected = _expected(db, known, max_extended)
+    actual = {doc.id: ((doc.to_dict().get("connections") or []), (doc.to_dict().get("extendedConnections") or []))
+              for doc in db.collection("users").stream()}
+    assert actual == expected
@@ -0,0 +1,63 @@
+"""
+cover_circle / query_radius must find every point a brute-force haversine
+filter finds, including circles that cross the antimeridian or a pole.
+
+Run from generate/:  python -m pytest -q test_geohash.py
+"""
+
+import math
+import random
+
+import pytest
+
+from geo_query import full_scan_radius, query_radius
+from geohash import cover_circle, encode, geohash_fields, haversine_km
+from memory_firestore import MemoryFirestore
+
+NUM_POINTS = 20_000
+NUM_CIRCLES = 300
+RADII_KM = (0.5, 5, 50, 500, 1000, 3000, 8000)
+
+
+def _random_point(rng):
+    """Uniform on the sphere."""
+    return math.degrees(math.asin(rng.uniform(-1.0, 1.0))), rng.uniform(-180.0, 180.0)
+
+
+def _random_center(rng):
+    kind = rng.random()
+    if kind < 0.3:
+        lat = rng.choice((1, -1)) * rng.uniform(60.0, 90.0)   # near a pole
+    else:
+        lat = _random_point(rng)[0]
+    lon = rng.uniform(175.0, 180.0) * rng.choice((1, -1)) if kind > 0.8 else rng.uniform(-180.0, 180.0)
+    return lat, lon
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_cover_circle_contains_every_point_in_range(seed):
+    rng = random.Random(seed)
+    points = [(lat, lon, encode(lat, lon)) for lat, lon in (_random_point(rng) for _ in range(NUM_POINTS))]
+    for _ in range(NUM_CIRCLES):
+        lat, lon = _random_center(rng)
+        radius_km = rng.choice(RADII_KM)
+        cells = tuple(cover_circle(lat, lon, radius_km))
+        missing = [(p_lat, p_lon) for p_lat, p_lon, cell in points
+                   if haversine_km(lat, lon, p_lat, p_lon) <= radius_km and not cell.startswith(cells)]
+        assert not missing, f"r={radius_km}km around ({lat}, {lon}): {missing[:3]}"
+
+
+def test_query_radius_matches_full_scan():
+    rng = random.Random(7)
+    db = MemoryFirestore()
+    posts = db.collection("posts")
+    for i in range(2_000):
+        lat, lon = _random_point(rng)
+        posts.document(f"post{i:05d}").set({"location": {"latitude": lat, "longitude": lon},
+                                            **geohash_fields(lat, lon)})
+    for _ in range(40):
+        lat, lon = _random_center(rng)
+        radius_km = rng.choice(RADII_KM)
+        indexed, _ = query_radius(posts, lat, lon, radius_km)
+        baseline, _, _ = full_scan_radius(posts, lat, lon, radius_km)
+        assert sorted(d.id for d in indexed) == sorted(d.id for d in baseline)